@@ -1,6 +1,7 @@
 import contextlib
 import logging
 import os
+import threading
 
 from django.conf import settings
 from django.contrib.auth.models import Permission
@@ -8,6 +9,8 @@ from django.db.models import Q, Exists, OuterRef, CharField
 from django.db.models.functions import Cast
 from django.utils.translation import gettext_lazy as _
 from rest_framework.exceptions import NotFound, ValidationError
+from rest_access_policy import AccessPolicyException
+from rest_access_policy.access_policy import AccessEnforcement, AnonymousUser
 
 from pulpcore.plugin.util import extract_pk
 from pulpcore.plugin.access_policy import AccessPolicyFromDB
@@ -24,8 +27,8 @@ from galaxy_ng.app import models
 from galaxy_ng.app.api.v1.models import LegacyNamespace
 from galaxy_ng.app.api.v1.models import LegacyRole
 from galaxy_ng.app.constants import COMMUNITY_DOMAINS
-from galaxy_ng.app.utils.rbac import get_v3_namespace_owners
 
+from galaxy_ng.app.access_control.request_cache import get_rbac_cache
 from galaxy_ng.app.access_control.statements import PULP_VIEWSETS
 
 log = logging.getLogger(__name__)
@@ -101,6 +104,289 @@ class GalaxyStatements:
 
 GALAXY_STATEMENTS = GalaxyStatements()
 
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_DEFAULT_ACCESS_POLICY = {
+    "statements": [{"action": "*", "principal": "admin", "effect": "allow"}],
+}
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+def _resolve_condition(policy, name):
+    """
+    The function of a condition, called as function(policy, request, view, action, *args).
+
+    Methods of the policy are unbound so that the function can be kept across
+    requests, reusable conditions from DRF_ACCESS_POLICY do not take the policy.
+    """
+    condition = getattr(policy, name, None)
+    if condition is None:
+        condition = policy._get_condition_method(name)
+    if getattr(condition, "__self__", None) is policy:
+        return condition.__func__
+    return lambda policy, *args: condition(*args)
+
+
+def _check_condition_result(label, result):
+    if type(result) is not bool:
+        raise AccessPolicyException(
+            f"condition '{label}' must return true/false, not {type(result)}"
+        )
+    return result
+
+
+class CompiledStatement:
+    """
+    A policy statement normalized once, the way drf-access-policy normalizes
+    statements on every permission check.
+    """
+
+    __slots__ = (
+        "_condition_checks",
+        "actions",
+        "condition_expressions",
+        "conditions",
+        "effect",
+        "method_actions",
+        "principals",
+        "statement",
+    )
+
+    def __init__(self, statement):
+        principals = _as_list(statement["principal"])
+        actions = _as_list(statement["action"])
+        conditions = _as_list(statement.get("condition"))
+        condition_expressions = _as_list(statement.get("condition_expression"))
+
+        self.statement = {
+            **statement,
+            "principal": principals,
+            "action": actions,
+            "condition": conditions,
+            "condition_expression": condition_expressions,
+        }
+        self.effect = statement.get("effect", "deny")
+        self.principals = frozenset(principals)
+        self.actions = frozenset(actions)
+        self.method_actions = frozenset(a for a in actions if a.startswith("<"))
+        self.conditions = tuple(
+            tuple(condition.split(":", 1)) if ":" in condition else (condition, None)
+            for condition in conditions
+        )
+        self.condition_expressions = condition_expressions
+        self._condition_checks = {}
+
+    def get_condition_checks(self, policy):
+        """
+        The conditions as (label, function, args), with the functions resolved
+        once per policy class.
+        """
+        checks = self._condition_checks.get(type(policy))
+        if checks is None:
+            checks = tuple(
+                (
+                    name if arg is None else f"{name}:{arg}",
+                    _resolve_condition(policy, name),
+                    () if arg is None else (arg,),
+                )
+                for name, arg in self.conditions
+            )
+            self._condition_checks[type(policy)] = checks
+        return checks
+
+    def matches_action(self, action, method):
+        if action in self.actions or "*" in self.actions:
+            return True
+        if not self.method_actions:
+            return False
+        return f"<method:{method.lower()}>" in self.method_actions or (
+            "<safe_methods>" in self.method_actions and method in SAFE_METHODS
+        )
+
+    def matches_principal(self, policy, user, get_groups):
+        principals = self.principals
+        if "*" in principals:
+            return True
+        if "admin" in principals and user.is_superuser:
+            return True
+        if "staff" in principals and user.is_staff:
+            return True
+        if "authenticated" in principals and not user.is_anonymous:
+            return True
+        if "anonymous" in principals and user.is_anonymous:
+            return True
+        if policy.id_prefix + str(user.pk) in principals:
+            return True
+        return any(policy.group_prefix + group in principals for group in get_groups())
+
+
+class CompiledAccessPolicy(MockPulpAccessPolicy):
+    """
+    An access policy with compiled statements, evaluated with the same
+    semantics as `rest_access_policy.AccessPolicy._evaluate_statements`.
+    """
+
+    def __init__(self, access_policy):
+        super().__init__(access_policy)
+        self.compiled_statements = [
+            CompiledStatement(statement) for statement in self.statements or []
+        ]
+        self._has_method_actions = any(s.method_actions for s in self.compiled_statements)
+        self._by_action = {}
+
+    def statements_for(self, action, method):
+        """The statements matching the action, in policy order."""
+        if self._has_method_actions:
+            return [s for s in self.compiled_statements if s.matches_action(action, method)]
+        statements = self._by_action.get(action)
+        if statements is None:
+            statements = [s for s in self.compiled_statements if s.matches_action(action, method)]
+            self._by_action[action] = statements
+        return statements
+
+    def evaluate(self, policy, request, view, action):
+        user = request.user or AnonymousUser()
+        groups = None
+
+        def get_groups():
+            nonlocal groups
+            if groups is None:
+                groups = policy.get_user_group_values(user)
+            return groups
+
+        matched = []
+        for statement in self.statements_for(action, request.method):
+            if not statement.matches_principal(policy, user, get_groups):
+                continue
+            if not all(
+                _check_condition_result(label, check(policy, request, view, action, *args))
+                for label, check, args in statement.get_condition_checks(policy)
+            ):
+                continue
+            if statement.condition_expressions and not policy._get_statements_matching_conditions(
+                request,
+                view,
+                action=action,
+                statements=[statement.statement],
+                is_expression=True,
+            ):
+                continue
+            matched.append(statement)
+
+        return bool(matched) and all(statement.effect == "allow" for statement in matched)
+
+
+def resolve_access_policy(policy_class, view):
+    """
+    Find the access policy of a view, as a MockPulpAccessPolicy.
+
+    Galaxy policies are loaded by NAME from the statement files. Pulp
+    viewsets use their override from statements/pulp.py, then their own
+    DEFAULT_ACCESS_POLICY, and finally an admin only policy.
+    """
+    # If this is a galaxy access policy, load from the statement file
+    if policy_class.NAME:
+        return GALAXY_STATEMENTS.get_pulp_access_policy(policy_class.NAME, default=[])
+
+    # Check if the view has a url pattern. If it does, check for customized
+    # policies from statements/pulp.py
+    try:
+        viewname = get_view_urlpattern(view)
+
+        override_ap = PULP_VIEWSETS.get(viewname, None)
+        if override_ap:
+            return MockPulpAccessPolicy(override_ap)
+
+    except AttributeError:
+        pass
+
+    # If no customized policies exist, try to load the one defined on the view itself
+    try:
+        return MockPulpAccessPolicy(view.DEFAULT_ACCESS_POLICY)
+    except AttributeError:
+        pass
+
+    # As a last resort, require admin rights
+    return MockPulpAccessPolicy(_DEFAULT_ACCESS_POLICY)
+
+
+class AccessPolicyRegistry:
+    """
+    Compiled access policies, keyed by (deployment mode, policy NAME) for the
+    galaxy policies and by (deployment mode, view class) for pulp viewsets.
+
+    `build` compiles every galaxy statement list and pulp override at once,
+    the policy of each view class is compiled the first time it is checked.
+    """
+
+    def __init__(self):
+        self._policies = {}
+        self._pulp_overrides = {}
+        self._built = False
+        self._lock = threading.Lock()
+
+    def build(self):
+        for mode, statements in GALAXY_STATEMENTS.galaxy_statements.items():
+            for name, policy_statements in statements.items():
+                self._policies[(mode, name)] = CompiledAccessPolicy(
+                    {"statements": policy_statements}
+                )
+        for viewname, access_policy in PULP_VIEWSETS.items():
+            self._pulp_overrides[viewname] = CompiledAccessPolicy(access_policy)
+        self._built = True
+
+    def clear(self):
+        with self._lock:
+            self._policies = {}
+            self._pulp_overrides = {}
+            self._built = False
+
+    def get(self, policy_class, view):
+        view_class = view if isinstance(view, type) else type(view)
+        mode = settings.GALAXY_DEPLOYMENT_MODE
+        key = (mode, policy_class.NAME or view_class)
+
+        compiled = self._policies.get(key)
+        if compiled is None:
+            with self._lock:
+                compiled = self._policies.get(key)
+                if compiled is None:
+                    compiled = self._compile(policy_class, view, key)
+        return compiled
+
+    def _compile(self, policy_class, view, key):
+        if not self._built:
+            self.build()
+            compiled = self._policies.get(key)
+            if compiled is not None:
+                return compiled
+
+        if not policy_class.NAME:
+            try:
+                compiled = self._pulp_overrides.get(get_view_urlpattern(view))
+            except AttributeError:
+                compiled = None
+            if compiled is not None:
+                self._policies[key] = compiled
+                return compiled
+
+        access_policy = resolve_access_policy(policy_class, view)
+        if access_policy is None:
+            access_policy = MockPulpAccessPolicy({"statements": []})
+        compiled = CompiledAccessPolicy(vars(access_policy))
+        self._policies[key] = compiled
+        return compiled
+
+
+ACCESS_POLICY_REGISTRY = AccessPolicyRegistry()
+
 
 class AccessPolicyBase(AccessPolicyFromDB):
     """
@@ -124,36 +410,20 @@ class AccessPolicyBase(AccessPolicyFromDB):
 
     @classmethod
     def get_access_policy(cls, view):
-        statements = GALAXY_STATEMENTS
+        return ACCESS_POLICY_REGISTRY.get(cls, view)
 
-        # If this is a galaxy access policy, load from the statement file
-        if cls.NAME:
-            return statements.get_pulp_access_policy(cls.NAME, default=[])
-
-        # Check if the view has a url pattern. If it does, check for customized
-        # policies from statements/pulp.py
-        try:
-            viewname = get_view_urlpattern(view)
-
-            override_ap = PULP_VIEWSETS.get(viewname, None)
-            if override_ap:
-                return MockPulpAccessPolicy(override_ap)
-
-        except AttributeError:
-            pass
+    def has_permission(self, request, view):
+        """
+        Evaluate the compiled policy of the view, see `CompiledAccessPolicy`.
+        """
+        action = self._get_invoked_action(view)
+        access_policy = self.get_access_policy(view)
+        if not access_policy.compiled_statements:
+            return False
 
-        # If no customized policies exist, try to load the one defined on the view itself
-        try:
-            return MockPulpAccessPolicy(view.DEFAULT_ACCESS_POLICY)
-        except AttributeError:
-            pass
-
-        # As a last resort, require admin rights
-        return MockPulpAccessPolicy(
-            {
-                "statements": [{"action": "*", "principal": "admin", "effect": "allow"}],
-            }
-        )
+        allowed = access_policy.evaluate(self, request, view, action)
+        request.access_enforcement = AccessEnforcement(action=action, allowed=allowed)
+        return allowed
 
     def scope_by_view_repository_permissions(self, view, qs, field_name="", is_generic=True):
         """
@@ -249,26 +519,24 @@ class AccessPolicyBase(AccessPolicyFromDB):
         )
 
         if path:
-            distro = ansible_models.AnsibleDistribution.objects.get(base_path=path)
-            repo = distro.repository
-            repo = repo.cast()
+            rbac = get_rbac_cache(request)
+            repo = rbac.get_repository(path)
 
             if repo.private:
-                perm = "ansible.view_ansiblerepository"
-                return request.user.has_perm(perm) or request.user.has_perm(perm, repo)
+                return rbac.has_model_or_object_perm("ansible.view_ansiblerepository", repo)
 
         return True
 
     def v3_can_destroy_collections(self, request, view, action):
-        user = request.user
+        rbac = get_rbac_cache(request)
 
         # first check for global permissions ...
         for delete_permission in ["galaxy.change_namespace", "ansible.delete_collection"]:
-            if user.has_perm(delete_permission):
+            if rbac.has_perm(delete_permission):
                 return True
 
         # could be a collection or could be a collectionversion ...
-        obj = view.get_object()
+        obj = rbac.get_view_object(view)
         model_name = obj.__class__.__name__
         if model_name == 'Collection':
             collection = obj
@@ -278,14 +546,14 @@ class AccessPolicyBase(AccessPolicyFromDB):
             raise Exception(
                 f'model type {model_name} is not suitable for v3_can_destroy_collections'
             )
-        namespace = models.Namespace.objects.get(name=collection.namespace)
+        namespace = rbac.get_namespace(collection.namespace)
 
         # check namespace object level permissions ...
-        if user.has_perm("galaxy.change_namespace", namespace):
+        if rbac.has_perm("galaxy.change_namespace", namespace):
             return True
 
         # check collection object level permissions ...
-        if user.has_perm("ansible.delete_collection", collection):  # noqa: SIM103
+        if rbac.has_perm("ansible.delete_collection", collection):  # noqa: SIM103
             return True
 
         return False
@@ -302,7 +570,7 @@ class AccessPolicyBase(AccessPolicyFromDB):
         if is_github_social_auth:
             return True
 
-        if request.user.has_perm('galaxy.view_user'):  # noqa: SIM103
+        if get_rbac_cache(request).has_perm('galaxy.view_user'):  # noqa: SIM103
             return True
 
         return False
@@ -314,11 +582,12 @@ class AccessPolicyBase(AccessPolicyFromDB):
 
         View actions are only enforced when the repo is private.
         """
-        if request.user.has_perm(permission):
+        rbac = get_rbac_cache(request)
+        if rbac.has_perm(permission):
             return True
 
         try:
-            obj = view.get_object()
+            obj = rbac.get_view_object(view)
         except AssertionError:
             obj = view.get_parent_object()
 
@@ -335,20 +604,21 @@ class AccessPolicyBase(AccessPolicyFromDB):
         if permission == "ansible.view_ansiblerepository" and not repo.private:
             return True
 
-        return request.user.has_perm(permission, repo)
+        return rbac.has_perm(permission, repo)
 
     def can_copy_or_move(self, request, view, action, permission):
         """
         Check if the user has model or object-level permissions
         on the source and destination repositories.
         """
-        if request.user.has_perm(permission):
+        rbac = get_rbac_cache(request)
+        if rbac.has_perm(permission):
             return True
 
         # accumulate all the objects to check for permission
         repos_to_check = []
         # add source repo to the list of repos to check
-        obj = view.get_object()
+        obj = rbac.get_view_object(view)
         if isinstance(obj, ansible_models.AnsibleRepository):
             repos_to_check.append(obj)
 
@@ -360,7 +630,7 @@ class AccessPolicyBase(AccessPolicyFromDB):
         # have to check `repos_to_check and all(...)` because `all([])` on an empty
         # list would return True
         return repos_to_check and all(
-            request.user.has_perm(permission, repo) for repo in repos_to_check
+            rbac.has_perm(permission, repo) for repo in repos_to_check
         )
 
     def _get_rh_identity(self, request):
@@ -394,23 +664,20 @@ class AccessPolicyBase(AccessPolicyFromDB):
         if getattr(self, "swagger_fake_view", False):
             # If OpenAPI schema is requested, don't check for update permissions
             return False
-        collection = view.get_object()
-        namespace = models.Namespace.objects.get(name=collection.namespace)
-        return has_model_or_object_permissions(
-            request.user,
-            "galaxy.upload_to_namespace",
-            namespace
-        )
+        rbac = get_rbac_cache(request)
+        collection = rbac.get_view_object(view)
+        namespace = rbac.get_namespace(collection.namespace)
+        return rbac.has_model_or_object_perm("galaxy.upload_to_namespace", namespace)
 
     def can_create_collection(self, request, view, permission):
+        rbac = get_rbac_cache(request)
         data = view._get_data(request)
         try:
-            namespace = models.Namespace.objects.get(name=data["filename"].namespace)
+            namespace = rbac.get_namespace(data["filename"].namespace)
         except models.Namespace.DoesNotExist:
             raise NotFound(_("Namespace in filename not found."))
 
-        can_upload_to_namespace = has_model_or_object_permissions(
-            request.user,
+        can_upload_to_namespace = rbac.has_model_or_object_perm(
             "galaxy.upload_to_namespace",
             namespace
         )
@@ -420,7 +687,7 @@ class AccessPolicyBase(AccessPolicyFromDB):
 
         path = view._get_path()
         try:
-            repo = ansible_models.AnsibleDistribution.objects.get(base_path=path).repository.cast()
+            repo = rbac.get_repository(path)
             pipeline = repo.pulp_labels.get("pipeline", None)
 
             # if uploading to a staging repo, don't check any additional perms
@@ -430,8 +697,7 @@ class AccessPolicyBase(AccessPolicyFromDB):
             # if no pipeline is declared on the repo, verify that the user can modify the
             # repo contents.
             elif pipeline is None:
-                return has_model_or_object_permissions(
-                    request.user,
+                return rbac.has_model_or_object_perm(
                     "ansible.modify_ansible_repo_content",
                     repo
                 )
@@ -445,18 +711,18 @@ class AccessPolicyBase(AccessPolicyFromDB):
     def can_sign_collections(self, request, view, permission):
         # Repository is required on the CollectionSign payload
         # Assumed that if user can modify repo they can sign everything in it
+        rbac = get_rbac_cache(request)
         repository = view.get_repository(request)
-        can_modify_repo = request.user.has_perm('ansible.modify_ansible_repo_content', repository)
+        can_modify_repo = rbac.has_perm('ansible.modify_ansible_repo_content', repository)
 
         # Payload can optionally specify a namespace to filter its contents
         # Assumed that if user has access to modify namespace they can sign its contents.
         if namespace := request.data.get('namespace'):
             try:
-                namespace = models.Namespace.objects.get(name=namespace)
+                namespace = rbac.get_namespace(namespace)
             except models.Namespace.DoesNotExist:
                 raise NotFound(_('Namespace not found.'))
-            return can_modify_repo and has_model_or_object_permissions(
-                request.user,
+            return can_modify_repo and rbac.has_model_or_object_perm(
                 "galaxy.upload_to_namespace",
                 namespace
             )
@@ -474,16 +740,17 @@ class AccessPolicyBase(AccessPolicyFromDB):
     def has_concrete_perms(self, request, view, action, permission):
         # Function the same as has_model_or_object_perms, but uses the concrete model
         # instead of the proxy model
-        if request.user.has_perm(permission):
+        rbac = get_rbac_cache(request)
+        if rbac.has_perm(permission):
             return True
 
         # if the object is a proxy object, get the concrete object and use that for the
         # permission comparison
-        obj = view.get_object()
+        obj = rbac.get_view_object(view)
         if obj._meta.proxy:
             obj = obj._meta.concrete_model.objects.get(pk=obj.pk)
 
-        return request.user.has_perm(permission, obj)
+        return rbac.has_perm(permission, obj)
 
     def signatures_not_required_for_repo(self, request, view, action):
         """
@@ -598,14 +865,11 @@ class AIDenyIndexAccessPolicy(AccessPolicyBase):
 
     def can_edit_ai_deny_index(self, request, view, permission):
         """This permission applies to Namespace or LegacyNamespace on ai_deny_index/."""
-        obj = view.get_object()
+        rbac = get_rbac_cache(request)
+        obj = rbac.get_view_object(view)
         has_permission = False
         if isinstance(obj, models.Namespace):
-            has_permission = has_model_or_object_permissions(
-                request.user,
-                "galaxy.change_namespace",
-                obj
-            )
+            has_permission = rbac.has_model_or_object_perm("galaxy.change_namespace", obj)
         elif isinstance(obj, LegacyNamespace):
             has_permission = LegacyAccessPolicy().is_namespace_owner(
                 request, view, permission
@@ -820,9 +1084,5 @@ class LegacyAccessPolicy(AccessPolicyBase):
         if not v3_namespace:
             return False
 
-        # use the helper to get the list of owners
-        owners = get_v3_namespace_owners(v3_namespace)
-        if owners and user in owners:  # noqa: SIM103
-            return True
-
-        return False
+        # owners are the users holding a role on the v3 namespace, directly or via a group
+        return get_rbac_cache(request).has_object_role(v3_namespace)
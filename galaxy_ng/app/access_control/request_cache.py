@@ -0,0 +1,141 @@
+"""
+Per-request cache of permission checks and object lookups.
+
+Access policy conditions are evaluated one after the other for every
+statement matching a request, and each of them used to call
+`user.has_perm(...)`, `view.get_object()` or fetch the same distribution or
+namespace again. `RequestRBACCache` loads the permissions of the user once
+per request and memoizes the lookups, so the number of queries made by the
+permission checks does not grow with the number of statements.
+
+The model level permissions are the ones returned by every configured
+authentication backend. The object level permissions are the pulp object
+roles assigned to the user or to one of their groups, which is what
+`pulpcore.backends.ObjectRolePermissionBackend` checks.
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from pulpcore.plugin.models.role import GroupRole, UserRole
+
+from pulp_ansible.app import models as ansible_models
+
+from galaxy_ng.app import models
+
+CACHE_ATTRIBUTE = "_galaxy_rbac_cache"
+
+OBJECT_ROLE_VALUES = (
+    "content_type_id",
+    "object_id",
+    "role__permissions__content_type_id",
+    "role__permissions__content_type__app_label",
+    "role__permissions__codename",
+)
+
+
+class RequestRBACCache:
+    """Permissions of one user and the objects looked up while checking them."""
+
+    def __init__(self, user):
+        self.user = user
+        self._model_perms = None
+        self._object_perms = None
+        self._owned_objects = None
+        self._lookups = {}
+
+    def _load_object_roles(self):
+        user_roles = UserRole.objects.filter(user=self.user).exclude(object_id=None)
+        group_roles = GroupRole.objects.filter(
+            group__in=self.user.groups.all()
+        ).exclude(object_id=None)
+
+        self._object_perms = set()
+        self._owned_objects = set()
+        for qs in (user_roles, group_roles):
+            for ctype_id, object_id, perm_ctype_id, app_label, codename in qs.values_list(
+                *OBJECT_ROLE_VALUES
+            ):
+                if codename is None:
+                    continue
+                self._object_perms.add((f"{app_label}.{codename}", perm_ctype_id, object_id))
+                if ctype_id == perm_ctype_id:
+                    self._owned_objects.add((ctype_id, object_id))
+
+    def _is_active_user(self):
+        return self.user.is_active and self.user.is_authenticated
+
+    def has_perm(self, perm, obj=None):
+        """Same result as `user.has_perm(perm, obj)`."""
+        if not self.user.is_active:
+            return False
+        if self.user.is_superuser:
+            return True
+
+        if obj is None:
+            if self._model_perms is None:
+                self._model_perms = self.user.get_all_permissions()
+            return perm in self._model_perms
+
+        if not self.user.is_authenticated:
+            return False
+        if self._object_perms is None:
+            self._load_object_roles()
+        ctype = ContentType.objects.get_for_model(obj, for_concrete_model=False)
+        return (perm, ctype.pk, str(obj.pk)) in self._object_perms
+
+    def has_model_or_object_perm(self, perm, obj):
+        return self.has_perm(perm) or self.has_perm(perm, obj)
+
+    def has_object_role(self, obj):
+        """True when the user, or one of their groups, holds any role on obj."""
+        if not self._is_active_user():
+            return False
+        if self._owned_objects is None:
+            self._load_object_roles()
+        ctype = ContentType.objects.get_for_model(obj, for_concrete_model=False)
+        return (ctype.pk, str(obj.pk)) in self._owned_objects
+
+    def _memoize(self, key, lookup):
+        if key not in self._lookups:
+            self._lookups[key] = lookup()
+        return self._lookups[key]
+
+    def get_view_object(self, view):
+        return self._memoize(("object", id(view)), view.get_object)
+
+    def get_distribution(self, base_path):
+        """Raises AnsibleDistribution.DoesNotExist like `objects.get(base_path=...)`."""
+        distro = self._memoize(
+            ("distribution", base_path),
+            lambda: ansible_models.AnsibleDistribution.objects.select_related(
+                "repository"
+            ).filter(base_path=base_path).first(),
+        )
+        if distro is None:
+            raise ansible_models.AnsibleDistribution.DoesNotExist(base_path)
+        return distro
+
+    def get_repository(self, base_path):
+        """The concrete repository served by the distribution at base_path."""
+        return self._memoize(
+            ("repository", base_path),
+            lambda: self.get_distribution(base_path).repository.cast(),
+        )
+
+    def get_namespace(self, name):
+        """Raises Namespace.DoesNotExist like `Namespace.objects.get(name=...)`."""
+        namespace = self._memoize(
+            ("namespace", name),
+            lambda: models.Namespace.objects.filter(name=name).first(),
+        )
+        if namespace is None:
+            raise models.Namespace.DoesNotExist(name)
+        return namespace
+
+
+def get_rbac_cache(request):
+    """Return the cache of the request, created on first use."""
+    cache = getattr(request, CACHE_ATTRIBUTE, None)
+    if cache is None or cache.user is not request.user:
+        cache = RequestRBACCache(request.user)
+        setattr(request, CACHE_ATTRIBUTE, cache)
+    return cache
@@ -0,0 +1,260 @@
+"""
+Opt-in keyset (cursor) pagination for large listings.
+
+Limit/offset and page number pagination make postgres produce and throw away
+every row before the requested offset, so walking a listing to the end costs
+O(N^2) in total. When the `cursor` query parameter is present, the paginators
+below filter on the sort-key tuple of the last row of the previous page instead,
+and return an opaque token for the next page in the `next` link. A cursor
+request on an ordering that a keyset cannot follow (expressions, nullable
+columns) is rejected with a 400 instead of silently paginating by offset.
+
+Passing `estimate_count=true` replaces the exact COUNT(*) with the row
+estimate of the query planner, in both pagination modes.
+"""
+
+import base64
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator as DjangoPaginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.functional import cached_property
+from pulp_ansible.app.galaxy.v3.pagination import LimitOffsetPagination
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Keeps the microseconds of times, DjangoJSONEncoder cuts them to milliseconds."""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values):
+    """Encode a sort-key tuple into an opaque url safe token."""
+    data = json.dumps(values, cls=CursorEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, size):
+    """Decode a token created by `encode_cursor`, raises NotFound when invalid."""
+    try:
+        padding = "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(token + padding))
+    except (TypeError, ValueError) as exc:
+        raise NotFound("Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise NotFound("Invalid cursor")
+    return values
+
+
+def estimated_count(queryset):
+    """Return the number of rows the postgres planner expects the queryset to return."""
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def keyset_filter(ordering, values):
+    """Build the filter matching the rows after `values` for the given ordering.
+
+    For an ordering (-a, b, pk) it returns:
+        a < va OR (a = va AND b > vb) OR (a = va AND b = vb AND pk > vpk)
+    """
+    query = Q()
+    for index, field in enumerate(ordering):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition = Q(**{f"{name}__{lookup}": values[index]})
+        for previous, value in zip(ordering[:index], values[:index]):
+            condition &= Q(**{previous.lstrip("-"): value})
+        query |= condition
+    return query
+
+
+def is_nullable(queryset, name):
+    """Whether the ordering `name` of queryset may be NULL, annotations are assumed not to."""
+    if name in queryset.query.annotations:
+        return False
+    opts = queryset.model._meta
+    for part in name.split(LOOKUP_SEP):
+        try:
+            field = opts.pk if part == "pk" else opts.get_field(part)
+        except FieldDoesNotExist:
+            return True
+        if getattr(field, "null", True):
+            return True
+        if field.is_relation:
+            opts = field.related_model._meta
+    return False
+
+
+def _is_true(value):
+    return str(value).lower() in ("1", "true", "yes")
+
+
+class EstimatedCountPaginator(DjangoPaginator):
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list)
+
+
+class KeysetPaginationMixin:
+    """Adds the opt-in cursor mode and the estimated count to a DRF paginator."""
+
+    cursor_query_param = "cursor"
+    estimate_count_query_param = "estimate_count"
+
+    cursor_mode = False
+    next_cursor = None
+
+    def get_cursor_page_size(self, request):
+        return self.get_page_size(request)
+
+    def use_cursor(self, request):
+        return self.cursor_query_param in request.query_params
+
+    def use_estimated_count(self, request):
+        return _is_true(request.query_params.get(self.estimate_count_query_param))
+
+    def get_queryset_count(self, queryset):
+        if self.use_estimated_count(self.request):
+            return estimated_count(queryset)
+        return queryset.count()
+
+    def get_keyset_ordering(self, queryset):
+        """The ordering of the queryset, made total by a trailing primary key.
+
+        Returns None when the rows cannot be walked by keyset: the ordering has
+        expressions, or a column that may be NULL.
+        """
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        for field in ordering:
+            if not isinstance(field, str) or field == "?":
+                return None
+            if is_nullable(queryset, field.lstrip("-")):
+                return None
+        if not any(field.lstrip("-") in ("pk", "id") for field in ordering):
+            ordering.append("pk")
+        return ordering
+
+    @staticmethod
+    def get_keyset_value(row, field):
+        name = field.lstrip("-")
+        if isinstance(row, dict):
+            return row[name]
+        return getattr(row, name)
+
+    def paginate_queryset_by_cursor(self, queryset, request):
+        self.cursor_mode = True
+        self.request = request
+        self.page_size = self.get_cursor_page_size(request)
+        self.count = self.get_queryset_count(queryset)
+
+        ordering = self.get_keyset_ordering(queryset)
+        if ordering is None:
+            raise ValidationError(
+                f"This ordering does not support the '{self.cursor_query_param}' parameter"
+            )
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            queryset = queryset.filter(
+                keyset_filter(ordering, decode_cursor(token, len(ordering)))
+            )
+
+        rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        self.next_cursor = None
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            values = [self.get_keyset_value(rows[-1], field) for field in ordering]
+            if None in values:
+                raise ValidationError("Cursor pagination requires a non null ordering")
+            self.next_cursor = encode_cursor(values)
+        return rows
+
+    def get_cursor_link(self, token):
+        url = self.request.get_full_path()
+        url = self.remove_offset_query_params(url)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def get_next_cursor_link(self):
+        if self.next_cursor is None:
+            return None
+        return self.request.build_absolute_uri(self.get_cursor_link(self.next_cursor))
+
+    def remove_offset_query_params(self, url):
+        return url
+
+
+class KeysetLimitOffsetPagination(KeysetPaginationMixin, LimitOffsetPagination):
+    """The `_ui/v1/` limit/offset pagination with the opt-in cursor mode."""
+
+    def get_cursor_page_size(self, request):
+        return self.get_limit(request)
+
+    def remove_offset_query_params(self, url):
+        return remove_query_param(url, self.offset_query_param)
+
+    def get_count(self, queryset):
+        return self.get_queryset_count(queryset)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.limit = self.get_cursor_page_size(request)
+            return self.paginate_queryset_by_cursor(queryset, request)
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_data(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_data(data)
+        next_link = None
+        if self.next_cursor is not None:
+            next_link = self.get_cursor_link(self.next_cursor)
+        return {
+            "meta": {"count": self.count},
+            "links": {
+                "first": self.get_cursor_link(""),
+                "previous": None,
+                "next": next_link,
+                "last": None,
+            },
+            "data": data,
+        }
+
+
+class KeysetPageNumberPagination(KeysetPaginationMixin, PageNumberPagination):
+    """The `api/v1/` page number pagination with the opt-in cursor mode."""
+
+    def remove_offset_query_params(self, url):
+        return remove_query_param(url, self.page_query_param)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            return self.paginate_queryset_by_cursor(queryset, request)
+        if self.use_estimated_count(request):
+            self.django_paginator_class = EstimatedCountPaginator
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            "count": self.count,
+            "next": self.get_next_cursor_link(),
+            "previous": None,
+            "results": data,
+        })
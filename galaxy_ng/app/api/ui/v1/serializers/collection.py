@@ -1,8 +1,10 @@
 import logging
 
+from django.db.models import Prefetch, prefetch_related_objects
 from pulp_ansible.app.models import (
     AnsibleDistribution,
     CollectionVersion,
+    CollectionVersionSignature,
 )
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
@@ -11,6 +13,7 @@ import semantic_version
 from .base import Serializer
 from galaxy_ng.app.api.v3.serializers.namespace import NamespaceSummarySerializer
 from galaxy_ng.app.models import Namespace
+from galaxy_ng.app.utils.repositories import get_latest_repository_names
 
 log = logging.getLogger(__name__)
 
@@ -43,33 +46,135 @@ class ContentSerializer(Serializer):
     description = serializers.CharField()
 
 
+LOOKUP_CACHE_KEY = "galaxy_lookup_cache"
+
+
+def _get_distro_base_path(request):
+    """The base path of the distribution the request is scoped to, if any."""
+    try:
+        # on URLS like _ui/v1/repo/rh-certified/namespace/name and
+        # /api/automation-hub/_ui/v1/repo/community/
+        # the distro_base_path can be parsed from the URL
+        path = request.parser_context['kwargs']['distro_base_path']
+    except KeyError:
+        # this same serializer is used on /_ui/v1/collection-versions/
+        # which can have the distro_base_path passed in as a query param
+        # on the `?repository=` field
+        path = request.query_params.get('repository')
+    except AttributeError:
+        # if there is no request, we are probably in a unit test
+        return None
+
+    # A bare /_ui/v1/collection-versions/ is not scoped to a single distro
+    return path or None
+
+
+class SerializerLookupCache:
+    """Objects looked up by the serializers of one response.
+
+    Nested serializers share the context of the root serializer, so the
+    distribution, its repository version, the namespaces and the repositories
+    of the content are fetched once for the whole page instead of once per row.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self._lookups = {}
+        self._namespaces = {}
+        self._repository_names = {}
+        self.namespace_data = {}
+
+    def _memoize(self, key, lookup):
+        if key not in self._lookups:
+            self._lookups[key] = lookup()
+        return self._lookups[key]
+
+    def get_distro(self):
+        """The distribution the request is scoped to, or None."""
+        return self._memoize("distro", self._load_distro)
+
+    def _load_distro(self):
+        path = _get_distro_base_path(self.request)
+        if path is None:
+            return None
+        return AnsibleDistribution.objects.select_related("repository").get(base_path=path)
+
+    def get_repository_version(self):
+        """The latest version of the repository served by the distribution."""
+        return self._memoize(
+            "repository_version", lambda: self.get_distro().repository.latest_version()
+        )
+
+    def load_namespaces(self, names):
+        """Fetch the namespaces that have not been looked up yet in one query."""
+        missing = set(names) - self._namespaces.keys()
+        if not missing:
+            return
+        namespaces = Namespace.objects.filter(name__in=missing).select_related(
+            "last_created_pulp_metadata"
+        ).prefetch_related("links")
+        self._namespaces.update(dict.fromkeys(missing))
+        self._namespaces.update((namespace.name, namespace) for namespace in namespaces)
+
+    def get_namespace(self, name):
+        """Raises Namespace.DoesNotExist like `Namespace.objects.get(name=...)`."""
+        self.load_namespaces([name])
+        namespace = self._namespaces[name]
+        if namespace is None:
+            raise Namespace.DoesNotExist(name)
+        return namespace
+
+    def load_repository_names(self, content_pks):
+        """Find the repositories of the content not looked up yet in one query."""
+        missing = set(content_pks) - self._repository_names.keys()
+        if not missing:
+            return
+        self._repository_names.update(dict.fromkeys(missing, ()))
+        self._repository_names.update(get_latest_repository_names(missing))
+
+    def get_repository_names(self, content_pk):
+        """Names of the repositories whose latest version has the content."""
+        self.load_repository_names([content_pk])
+        return self._repository_names[content_pk]
+
+    def prefetch_collection_versions(self, collection_versions):
+        """Load the signatures and tags of a page of collection versions at once."""
+        distro = self.get_distro()
+        signatures = CollectionVersionSignature.objects.select_related("signing_service")
+        if distro is not None:
+            signatures = signatures.filter(repositories=distro.repository)
+        prefetch_related_objects(
+            collection_versions,
+            "tags",
+            Prefetch("signatures", queryset=signatures, to_attr="distro_signatures"),
+        )
+
+
+def get_lookup_cache(context):
+    """Return the lookup cache of the serializer context, created on first use."""
+    cache = context.get(LOOKUP_CACHE_KEY)
+    if cache is None:
+        cache = SerializerLookupCache(context.get("request"))
+        context[LOOKUP_CACHE_KEY] = cache
+    return cache
+
+
 class RequestDistroMixin:
     """This provides _get_current_distro() to all serializers that inherit from it."""
 
     def _get_current_distro(self):
         """Get current distribution from request information."""
-        request = self.context.get("request")
-        try:
-            # on URLS like _ui/v1/repo/rh-certified/namespace/name and
-            # /api/automation-hub/_ui/v1/repo/community/
-            # the distro_base_path can be parsed from the URL
-            path = request.parser_context['kwargs']['distro_base_path']
-        except KeyError:
-            # this same serializer is used on /_ui/v1/collection-versions/
-            # which can have the distro_base_path passed in as a query param
-            # on the `?repository=` field
-            path = request.query_params.get('repository')
-        except AttributeError:
-            # if there is no request, we are probably in a unit test
-            return None
-
-        if not path:
-            # A bare /_ui/v1/collection-versions/ is not scoped to a single distro
-            return None
+        return get_lookup_cache(self.context).get_distro()
 
-        distro = AnsibleDistribution.objects.get(base_path=path)
+    def _get_distro_signatures(self, obj):
+        """Signatures of obj, in the current distribution when there is one."""
+        if hasattr(obj, "distro_signatures"):
+            return obj.distro_signatures
 
-        return distro
+        distro = self._get_current_distro()
+        if not distro:
+            return obj.signatures.all()
+        return obj.signatures.filter(repositories=distro.repository)
 
 
 class CollectionMetadataSerializer(RequestDistroMixin, Serializer):
@@ -91,14 +196,8 @@ class CollectionMetadataSerializer(RequestDistroMixin, Serializer):
     @extend_schema_field(serializers.ListField(child=serializers.DictField()))
     def get_signatures(self, obj):
         """Returns signature info for each signature."""
-        distro = self._get_current_distro()
-        if not distro:
-            signatures = obj.signatures.all()
-        else:
-            signatures = obj.signatures.filter(repositories=distro.repository)
-
         data = []
-        for signature in signatures:
+        for signature in self._get_distro_signatures(obj):
             sig = {}
             sig["signature"] = signature.data
             sig["pubkey_fingerprint"] = signature.pubkey_fingerprint
@@ -120,11 +219,8 @@ class CollectionVersionSignStateMixin(RequestDistroMixin):
     @extend_schema_field(serializers.CharField())
     def get_sign_state(self, obj):
         """Returns the state of the signature."""
-        distro = self._get_current_distro()
-        if not distro:
-            signature_count = obj.signatures.count()
-        else:
-            signature_count = obj.signatures.filter(repositories=distro.repository).count()
+        signatures = self._get_distro_signatures(obj)
+        signature_count = len(signatures) if isinstance(signatures, list) else signatures.count()
 
         return "unsigned" if signature_count == 0 else "signed"
 
@@ -145,23 +241,28 @@ class CollectionVersionBaseSerializer(CollectionVersionSignStateMixin, Serialize
         return CollectionMetadataSerializer(obj, context=self.context).data
 
 
+class CollectionVersionListSerializer(serializers.ListSerializer):
+    """Finds the repositories of all the listed collection versions at once."""
+
+    def to_representation(self, data):
+        collection_versions = list(data.all() if hasattr(data, 'all') else data)
+        cache = get_lookup_cache(self.context)
+        cache.prefetch_collection_versions(collection_versions)
+        cache.load_repository_names([cv.pk for cv in collection_versions])
+        return super().to_representation(collection_versions)
+
+
 class CollectionVersionSerializer(CollectionVersionBaseSerializer):
     repository_list = serializers.SerializerMethodField()
 
+    class Meta(CollectionVersionBaseSerializer.Meta):
+        list_serializer_class = CollectionVersionListSerializer
+
     @extend_schema_field(serializers.ListField)
     def get_repository_list(self, collection_version):
         """Repository list where content is in the latest RepositoryVersion."""
-
-        # get all repos where content exists in a RepositoryVersion
-        content = collection_version.content_ptr
-        all_repos = content.repositories.all().distinct().exclude(name__endswith='-synclist')
-
-        qs = CollectionVersion.objects.filter(pk=collection_version.pk)
-        cv_in_repo_latest_version = []
-        for repo in all_repos:
-            if qs.filter(pk__in=repo.latest_version().content):
-                cv_in_repo_latest_version.append(repo.name)
-        return cv_in_repo_latest_version
+        cache = get_lookup_cache(self.context)
+        return list(cache.get_repository_names(collection_version.pk))
 
 
 class CollectionVersionDetailSerializer(CollectionVersionBaseSerializer):
@@ -175,6 +276,17 @@ class CollectionVersionSummarySerializer(CollectionVersionSignStateMixin, Serial
     sign_state = serializers.SerializerMethodField()
 
 
+class CollectionPageListSerializer(serializers.ListSerializer):
+    """Loads the namespaces, signatures and tags of a page of collections at once."""
+
+    def to_representation(self, data):
+        collection_versions = list(data.all() if hasattr(data, 'all') else data)
+        cache = get_lookup_cache(self.context)
+        cache.load_namespaces({cv.namespace for cv in collection_versions})
+        cache.prefetch_collection_versions(collection_versions)
+        return super().to_representation(collection_versions)
+
+
 class _CollectionSerializer(Serializer):
     """ Serializer for pulp_ansible CollectionViewSet.
     Uses CollectionVersion object to serialize associated Collection data.
@@ -188,14 +300,22 @@ class _CollectionSerializer(Serializer):
 
     @extend_schema_field(NamespaceSummarySerializer)
     def get_namespace(self, obj):
-        namespace = Namespace.objects.get(name=obj.namespace)
-        return NamespaceSummarySerializer(namespace, context=self.context).data
+        cache = get_lookup_cache(self.context)
+        if obj.namespace not in cache.namespace_data:
+            namespace = cache.get_namespace(obj.namespace)
+            cache.namespace_data[obj.namespace] = NamespaceSummarySerializer(
+                namespace, context=self.context
+            ).data
+        return cache.namespace_data[obj.namespace]
 
 
 class CollectionListSerializer(_CollectionSerializer):
     deprecated = serializers.BooleanField()
     sign_state = serializers.CharField()
 
+    class Meta(_CollectionSerializer.Meta):
+        list_serializer_class = CollectionPageListSerializer
+
     @extend_schema_field(CollectionVersionBaseSerializer)
     def get_latest_version(self, obj):
         return CollectionVersionBaseSerializer(obj, context=self.context).data
@@ -213,14 +333,17 @@ class CollectionDetailSerializer(_CollectionSerializer):
 
     @extend_schema_field(CollectionVersionSummarySerializer(many=True))
     def get_all_versions(self, obj):
-        path = self.context['request'].parser_context['kwargs']['distro_base_path']
-        distro = AnsibleDistribution.objects.get(base_path=path)
-        repository_version = distro.repository.latest_version()
+        cache = get_lookup_cache(self.context)
+        repository_version = cache.get_repository_version()
         versions_in_repo = CollectionVersion.objects.filter(
             pk__in=repository_version.content,
             collection=obj.collection,
-        ).only("content_ptr_id", "version")
+        ).only("content_ptr_id", "version", "pulp_created")
         versions_in_repo = sorted(
             versions_in_repo, key=lambda obj: semantic_version.Version(obj.version), reverse=True
         )
-        return CollectionVersionSummarySerializer(versions_in_repo, many=True).data
+        # sign_state reads the distro_signatures loaded here
+        cache.prefetch_collection_versions(versions_in_repo)
+        return CollectionVersionSummarySerializer(
+            versions_in_repo, many=True, context=self.context
+        ).data
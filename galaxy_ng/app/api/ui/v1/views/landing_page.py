@@ -1,17 +1,57 @@
+import json
+
 from galaxy_ng.app.access_control import access_policy
-from random import sample
+from random import randrange
+from django.conf import settings
 from rest_framework.response import Response
 from pulp_ansible.app.models import CollectionVersion, AnsibleDistribution
 from galaxy_ng.app.models import Namespace
-from galaxy_ng.app import settings
 from galaxy_ng.app.api import base as api_base
+from galaxy_ng.app.tasks import settings_cache
+
+LANDING_PAGE_CACHE_KEY = "GALAXY_LANDING_PAGE"
+
+
+@settings_cache.connection_error_wrapper(default=lambda: None)
+def _get_cached_data():
+    value = settings_cache.conn.get(LANDING_PAGE_CACHE_KEY)
+    return None if value is None else json.loads(value)
+
+
+@settings_cache.connection_error_wrapper(default=lambda: None)
+def _set_cached_data(data, ttl):
+    settings_cache.conn.set(LANDING_PAGE_CACHE_KEY, json.dumps(data), ex=ttl)
+
+
+@settings_cache.connection_error_wrapper(default=lambda: None)
+def invalidate_landing_page_cache():
+    settings_cache.conn.delete(LANDING_PAGE_CACHE_KEY)
 
 
 class LandingPageView(api_base.APIView):
+    """
+    Console landing page.
+
+    The payload is cached in Redis for GALAXY_LANDING_PAGE_CACHE_TIMEOUT
+    seconds and dropped when a repository version is completed or a namespace
+    changes. The cache is shared by all the API workers, so a change seen by
+    any of them is visible to the others. Without Redis the payload is built
+    on every request.
+    """
+
     permission_classes = [access_policy.LandingPageAccessPolicy]
     action = "retrieve"
 
     def get(self, request, *args, **kwargs):
+        ttl = settings.get("GALAXY_LANDING_PAGE_CACHE_TIMEOUT", 60)
+        data = _get_cached_data() if ttl else None
+        if data is None:
+            data = self.get_data()
+            if ttl:
+                _set_cached_data(data, ttl)
+        return Response(data)
+
+    def get_data(self):
         golden_name = settings.GALAXY_API_DEFAULT_DISTRIBUTION_BASE_PATH
 
         distro = AnsibleDistribution.objects.get(base_path=golden_name)
@@ -24,8 +64,12 @@ class LandingPageView(api_base.APIView):
 
         # If there are no partners dont show the recommendation for it
         recommendations = {}
+        namespace = None
         if partner_count > 0:
-            namespace = sample(list(Namespace.objects.all()), 1)[0]
+            # pick a random partner through the primary key index
+            offset = randrange(partner_count)
+            namespace = Namespace.objects.order_by("pk")[offset:offset + 1].first()
+        if namespace is not None:
             recommendations = {
                 "recs": [
                     {
@@ -159,4 +203,4 @@ class LandingPageView(api_base.APIView):
             },
         }
 
-        return Response(data)
+        return data
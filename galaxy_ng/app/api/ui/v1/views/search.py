@@ -1,33 +1,16 @@
-from django.contrib.postgres.aggregates import JSONBAgg
 from django.contrib.postgres.search import SearchQuery
-from django.db.models import (
-    Exists,
-    F,
-    FloatField,
-    Func,
-    JSONField,
-    OuterRef,
-    Q,
-    Subquery,
-    Value,
-)
-from django.db.models.fields.json import KT
-from django.db.models.functions import Coalesce
+from django.db.models import F, Q
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema
-from pulp_ansible.app.models import (
-    AnsibleCollectionDeprecated,
-    CollectionDownloadCount,
-    CollectionVersion,
-)
 from rest_framework import mixins
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny
 
 from galaxy_ng.app.api import base as api_base
+from galaxy_ng.app.api.pagination import KeysetLimitOffsetPagination
 from galaxy_ng.app.api.ui.v1.serializers import SearchResultsSerializer
-from galaxy_ng.app.api.v1.models import LegacyRole
-from galaxy_ng.app.models.namespace import Namespace
+from galaxy_ng.app.models import SearchIndexEntry
+from galaxy_ng.app.utils.search_index import QUERYSET_VALUES, rank
 
 FILTER_PARAMS = [
     "keywords",
@@ -43,23 +26,6 @@ SORT_PARAM = "order_by"
 SORTABLE_FIELDS = ["name", "namespace_name", "download_count", "last_updated", "relevance"]
 SORTABLE_FIELDS += [f"-{item}" for item in SORTABLE_FIELDS]
 DEFAULT_SEARCH_TYPE = "websearch"  # websearch,sql
-QUERYSET_VALUES = [
-    "namespace_avatar",
-    "content_list",
-    "deprecated",
-    "description_text",
-    "download_count",
-    "last_updated",
-    "name",
-    "namespace_name",
-    "platform_names",
-    "tag_names",
-    "content_type",
-    "latest_version",
-    "search",
-    "relevance",
-]
-RANK_NORMALIZATION = 32
 
 
 class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
@@ -67,6 +33,7 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
 
     permission_classes = [AllowAny]
     serializer_class = SearchResultsSerializer
+    pagination_class = KeysetLimitOffsetPagination
 
     @extend_schema(
         parameters=[
@@ -85,6 +52,15 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
             OpenApiParameter("tags", many=True),
             OpenApiParameter("platform"),
             OpenApiParameter("order_by", enum=SORTABLE_FIELDS),
+            OpenApiParameter(
+                "cursor",
+                description="Enables keyset pagination, pass the token from the 'next' link",
+            ),
+            OpenApiParameter(
+                "estimate_count",
+                OpenApiTypes.BOOL,
+                description="Use the planner estimate instead of an exact count",
+            ),
         ]
     )
     def list(self, *args, **kwargs):
@@ -121,6 +97,12 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
 
         Pagination is based on `limit` and `offset` parameters.
 
+        Passing `cursor` (empty for the first page) switches to keyset pagination,
+        the `links:next` then carries an opaque cursor token and `offset` is ignored,
+        this is the recommended mode to walk all the results.
+
+        Passing `estimate_count=true` returns an estimated `meta:count`.
+
         ## Results
 
         Results are embedded in the pagination serializer including
@@ -148,7 +130,7 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
         return super().list(*args, **kwargs)
 
     def get_queryset(self):
-        """Returns the UNION ALL from CollectionVersion and LegacyRole"""
+        """Returns the SearchIndexEntry results for Collections and LegacyRoles"""
         request = self.request
         self.filter_params = self.get_filter_params(request)
         self.sort = self.get_sorting_param(request)
@@ -156,7 +138,7 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
         return qs
 
     def get_search_results(self, filter_params, sort):
-        """Validates filter_params, builds each queryset and then unionize and apply filters."""
+        """Validates filter_params, builds the index queryset and apply filters."""
         type_ = filter_params.get("type", "").lower()
         if type_ not in ("role", "collection", ""):
             raise ValidationError("'type' must be ['collection', 'role']")
@@ -169,16 +151,8 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
         if keywords and search_type == "websearch":
             query = SearchQuery(keywords, search_type="websearch")
 
-        collections = self.get_collection_queryset(query=query)
-        roles = self.get_role_queryset(query=query)
-        result_qs = self.filter_and_sort(
-            collections,
-            roles,
-            filter_params,
-            sort,
-            type_,
-            query=query
-        )
+        qs = self.get_index_queryset(query=query)
+        result_qs = self.filter_and_sort(qs, filter_params, sort, type_, query=query)
         return result_qs
 
     def get_filter_params(self, request):
@@ -202,82 +176,18 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
             raise ValidationError("'order_by=relevance' works only with 'search_type=websearch'")
         return sort
 
-    def get_collection_queryset(self, query=None):
-        """Build the CollectionVersion queryset from annotations."""
-        deprecated_qs = AnsibleCollectionDeprecated.objects.filter(
-            namespace=OuterRef("namespace"), name=OuterRef("name")
-        )
-        download_count_qs = CollectionDownloadCount.objects.filter(
-            namespace=OuterRef("namespace"), name=OuterRef("name")
-        )
-        namespace_qs = Namespace.objects.filter(name=OuterRef("namespace"))
-
-        relevance = Value(0)
-        if query:
-            relevance = Func(
-                F("search_vector"),
-                query,
-                RANK_NORMALIZATION,
-                function="ts_rank",
-                output_field=FloatField(),
-            )
+    def get_index_queryset(self, query=None):
+        """Build the SearchIndexEntry queryset from annotations."""
+        return SearchIndexEntry.objects.annotate(
+            search=F("search_vector"),
+            relevance=rank("search_vector", query),
+        ).values(*QUERYSET_VALUES, "pk")
 
-        # The order of the fields here is important, must match the role_queryset
-        qs = (
-            CollectionVersion.objects.annotate(
-                namespace_name=F("namespace"),
-                description_text=F("description"),
-                platform_names=Value([], JSONField()),  # There is no platforms for collections
-                tag_names=JSONBAgg("tags__name"),
-                content_type=Value("collection"),
-                last_updated=F("timestamp_of_interest"),
-                deprecated=Exists(deprecated_qs),
-                download_count=Coalesce(
-                    Subquery(download_count_qs.values("download_count")[:1]), Value(0)
-                ),
-                latest_version=F("version"),
-                content_list=F("contents"),
-                namespace_avatar=Subquery(namespace_qs.values("_avatar_url")),
-                search=F("search_vector"),
-                relevance=relevance,
-            )
-            .values(*QUERYSET_VALUES)
-            .filter(is_highest=True)
-        )
-        return qs
-
-    def get_role_queryset(self, query=None):
-        """Build the LegacyRole queryset from annotations."""
-        relevance = Value(0)
-        if query:
-            relevance = Func(
-                F("search"),
-                query,
-                RANK_NORMALIZATION,
-                function="ts_rank",
-                output_field=FloatField(),
-            )
-        # The order of the fields here is important, must match the collection_queryset
-        qs = LegacyRole.objects.annotate(
-            namespace_name=F("namespace__name"),
-            description_text=KT("full_metadata__description"),
-            platform_names=F("full_metadata__platforms"),
-            tag_names=F("full_metadata__tags"),
-            content_type=Value("role"),
-            last_updated=F("created"),
-            deprecated=Value(False),  # there is no deprecation for roles
-            download_count=Coalesce(F("legacyroledownloadcount__count"), Value(0)),
-            latest_version=KT("full_metadata__versions__-1__version"),
-            content_list=Value([], JSONField()),  # There is no contents for roles
-            namespace_avatar=F("namespace__namespace___avatar_url"),  # v3 namespace._avatar_url
-            search=F("legacyrolesearchvector__search_vector"),
-            relevance=relevance,
-        ).values(*QUERYSET_VALUES)
-        return qs
-
-    def filter_and_sort(self, collections, roles, filter_params, sort, type_="", query=None):
-        """Apply filters individually on each queryset and then combine to sort."""
+    def filter_and_sort(self, qs, filter_params, sort, type_="", query=None):
+        """Apply filters on the search index and sort."""
         facets = {}
+        if type_:
+            facets["content_type"] = type_
         if deprecated := filter_params.get("deprecated"):
             if deprecated.lower() not in ("true", "false"):
                 raise ValidationError("'deprecated' filter must be 'true' or 'false'")
@@ -287,23 +197,20 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
         if namespace := filter_params.get("namespace"):
             facets["namespace_name__iexact"] = namespace
         if facets:
-            collections = collections.filter(**facets)
-            roles = roles.filter(**facets)
+            qs = qs.filter(**facets)
 
         if tags := filter_params.get("tags"):
             tag_filter = Q()
             for tag in tags:
                 tag_filter &= Q(tag_names__icontains=tag)
-            collections = collections.filter(tag_filter)
-            roles = roles.filter(tag_filter)
+            qs = qs.filter(tag_filter)
 
         if platform := filter_params.get("platform"):
-            roles = roles.filter(full_metadata__platforms__icontains=platform)
-            collections = collections.filter(platform_names=platform)  # never match but required
+            # There is no platforms for collections
+            qs = qs.filter(content_type="role", platform_names__icontains=platform)
 
         if query:
-            collections = collections.filter(search=query)
-            roles = roles.filter(search=query)
+            qs = qs.filter(search_vector=query)
         elif keywords := filter_params.get("keywords"):
             query = (
                 Q(name__icontains=keywords)
@@ -312,16 +219,9 @@ class SearchListView(api_base.GenericViewSet, mixins.ListModelMixin):
                 | Q(tag_names__icontains=keywords)
                 | Q(platform_names__icontains=keywords)
             )
-            collections = collections.filter(query)
-            roles = roles.filter(query)
-
-        if type_.lower() == "role":
-            qs = roles.order_by(*sort)
-        elif type_.lower() == "collection":
-            qs = collections.order_by(*sort)
-        else:
-            qs = collections.union(roles, all=True).order_by(*sort)
-        return qs
+            qs = qs.filter(query)
+
+        return qs.order_by(*sort)
 
 
 def test():
@@ -26,6 +26,8 @@ from galaxy_ng.app.api import base as api_base
 from galaxy_ng.app.access_control import access_policy
 from galaxy_ng.app.api.ui.v1 import serializers, versioning
 from galaxy_ng.app.api.v3.serializers.sync import CollectionRemoteSerializer
+from galaxy_ng.app.utils import highest_versions
+from galaxy_ng.app.utils.version_range import filter_version_range
 
 
 class CollectionByCollectionVersionFilter(pulp_ansible_viewsets.CollectionVersionFilter):
@@ -78,6 +80,26 @@ class CollectionViewSet(
 
         base_versions_query = CollectionVersion.objects.filter(pk__in=self._distro_content)
 
+        deprecated_query = AnsibleCollectionDeprecated.objects.filter(
+            namespace=OuterRef("namespace"),
+            name=OuterRef("name"),
+            pk__in=self._distro_content,
+        )
+
+        # Use the highest versions recorded when the repository version was created,
+        # repository versions created before the index existed are handled below.
+        repository_version = self._repository_version
+        if repository_version is not None and highest_versions.is_indexed(repository_version):
+            return CollectionVersion.objects.filter(
+                galaxy_highest_versions__repository_version=repository_version
+            ).select_related("collection").annotate(
+                deprecated=Exists(deprecated_query),
+                sign_state=Case(
+                    When(signatures__pk__in=self._distro_content, then=Value("signed")),
+                    default=Value("unsigned"),
+                )
+            )
+
         # Build a dict to be used by the annotation filter at the end of the method
         collection_versions = {}
         for collection_id, version in base_versions_query.values_list("collection_id", "version"):
@@ -85,12 +107,6 @@ class CollectionViewSet(
             if not value or semantic_version.Version(version) > semantic_version.Version(value):
                 collection_versions[str(collection_id)] = version
 
-        deprecated_query = AnsibleCollectionDeprecated.objects.filter(
-            namespace=OuterRef("namespace"),
-            name=OuterRef("name"),
-            pk__in=self._distro_content,
-        )
-
         if not collection_versions.items():
             return CollectionVersion.objects.none().annotate(
                 # AAH-122: annotated filterable fields must exist in all the returned querysets
@@ -187,12 +203,7 @@ class CollectionVersionFilter(filterset.FilterSet):
 
     def version_range_filter(self, queryset, name, value):
         try:
-            s = semantic_version.SimpleSpec(value)
-            full_version_list = [
-                semantic_version.Version(v) for v in queryset.values_list('version', flat=True)]
-            version_list = [str(v) for v in s.filter(full_version_list)]
-
-            return queryset.filter(version__in=version_list)
+            return filter_version_range(queryset, value)
         except ValueError:
             raise ValidationError(_('{} must be a valid semantic version range.').format(name))
 
@@ -1,5 +1,10 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery
 from django.db.models import Q
 from django.db.models import Case, Value, When
+from django.db.models.fields.json import KT
+from django.db.models.functions import Coalesce
 from django_filters import filters
 from django_filters.rest_framework import filterset
 
@@ -7,7 +12,20 @@ from galaxy_ng.app.models.auth import User
 from galaxy_ng.app.api.v1.models import LegacyNamespace
 from galaxy_ng.app.api.v1.models import LegacyRole
 from galaxy_ng.app.api.v1.models import LegacyRoleImport
-from galaxy_ng.app.utils.rbac import get_v3_namespace_owners
+from galaxy_ng.app.api.v1.models import LegacyRoleSearchVector
+from galaxy_ng.app.utils.rbac import filter_v3_namespaces_owned_by
+from galaxy_ng.app.utils.search_index import rank
+
+
+def prefix_search_query(keyword):
+    """
+    A tsquery matching the lexemes starting with each word of keyword,
+    `to_tsquery('foo:* & bar:*')`, or None when keyword has no word.
+    """
+    words = re.findall(r"\w+", keyword)
+    if not words:
+        return None
+    return SearchQuery(" & ".join(f"{word}:*" for word in words), search_type="raw")
 
 
 class LegacyNamespaceFilter(filterset.FilterSet):
@@ -38,20 +56,7 @@ class LegacyNamespaceFilter(filterset.FilterSet):
 
     def owner_filter(self, queryset, name, value):
         # find the owner on the linked v3 namespace
-
-        # FIXME(jctanner): this is terribly slow
-        pks = []
-        for ns1 in LegacyNamespace.objects.all():
-            if not ns1.namespace:
-                continue
-            ns3 = ns1.namespace
-            owners = get_v3_namespace_owners(ns3)
-            if value in [x.username for x in owners]:
-                pks.append(ns1.id)
-
-        queryset = queryset.filter(id__in=pks)
-
-        return queryset
+        return filter_v3_namespaces_owned_by(queryset, value, field='namespace_id')
 
     def provider_filter(self, queryset, name, value):
         return queryset.filter(namespace__name=value)
@@ -135,31 +140,55 @@ class LegacyRoleFilter(filterset.FilterSet):
 
         return queryset
 
-    def keywords_filter(self, queryset, name, value):
-
-        keywords = self.request.query_params.getlist('keywords')
-
+    def _search(self, queryset, keywords, prefix=False):
+        """
+        Match each keyword against the role search vector, or as a substring of
+        the role name, namespace name or description, and rank the roles by
+        relevance.
+
+        Each match is a subquery answered by its own index (the GIN index of the
+        search vector, the trigram indexes of the names and description) and the
+        role has to be in their UNION, an OR across the joined tables would scan
+        every role.
+        An explicit order_by parameter still takes precedence over the rank.
+        """
+        search_query = None
         for keyword in keywords:
-            queryset = queryset.filter(
-                Q(namespace__name__contains=keyword)
-                | Q(name__contains=keyword)
-                | Q(full_metadata__description__contains=keyword)
+            query = prefix_search_query(keyword) if prefix else SearchQuery(keyword)
+            matches = [
+                LegacyRole.objects.filter(name__contains=keyword).values('pk'),
+                LegacyRole.objects.alias(
+                    description=KT('full_metadata__description')
+                ).filter(description__contains=keyword).values('pk'),
+                LegacyRole.objects.filter(
+                    namespace__in=LegacyNamespace.objects.filter(
+                        name__contains=keyword
+                    ).values('pk')
+                ).values('pk'),
+            ]
+            if query is not None:
+                matches.append(
+                    LegacyRoleSearchVector.objects.filter(search_vector=query).values('role_id')
+                )
+                search_query = query if search_query is None else search_query & query
+            matches = [match.order_by() for match in matches]
+            queryset = queryset.filter(pk__in=matches[0].union(*matches[1:]))
+
+        if search_query is None:
+            return queryset
+        return queryset.annotate(
+            relevance=Coalesce(
+                rank("legacyrolesearchvector__search_vector", search_query), Value(0.0)
             )
+        ).order_by('-relevance', 'created')
 
-        return queryset
+    def keywords_filter(self, queryset, name, value):
+        keywords = self.request.query_params.getlist('keywords')
+        return self._search(queryset, keywords)
 
     def autocomplete_filter(self, queryset, name, value):
-
         keywords = self.request.query_params.getlist('autocomplete')
-
-        for keyword in keywords:
-            queryset = queryset.filter(
-                Q(namespace__name__contains=keyword)
-                | Q(name__contains=keyword)
-                | Q(full_metadata__description__contains=keyword)
-            )
-
-        return queryset
+        return self._search(queryset, keywords, prefix=True)
 
     def username_autocomplete_filter(self, queryset, name, value):
 
@@ -188,8 +217,8 @@ class LegacyRoleImportFilter(filterset.FilterSet):
     role_name = filters.NumberFilter(field_name='role__name')
     namespace_id = filters.NumberFilter(field_name='role__namespace_id')
     namespace_name = filters.NumberFilter(field_name='role__namespace_name')
-    github_user = filters.CharFilter(field_name='task__kwargs__github_user')
-    github_repo = filters.CharFilter(field_name='task__kwargs__github_repo')
+    github_user = filters.CharFilter(field_name='github_user')
+    github_repo = filters.CharFilter(field_name='github_repo')
     state = filters.CharFilter(method='state_filter')
 
     class Meta:
@@ -1,14 +1,46 @@
+import functools
 import logging
+import time
+
+# a role import logs a few hundred lines, write them in a handful of statements
+FLUSH_SIZE = 50
+FLUSH_INTERVAL = 2.0
 
 
 class LegacyRoleImportHandler(logging.Handler):
     """
     A custom Handler which logs into `LegacyRoleImport.messages` attribute of the current task.
+
+    Records are buffered in memory and appended to the messages array with a
+    single jsonb concatenation once `flush_size` records are pending, when
+    `flush_interval` seconds have passed since the last write, when a record
+    of `flush_level` or above is logged, and when the handler is flushed at
+    the end of the task. The interval is only checked when a record is logged,
+    so warnings and errors are written right away instead of waiting for the
+    next record. Tasks without a LegacyRoleImport
+    (v1 syncs log here too) are detected on their first write and their
+    records are dropped from then on.
     """
 
+    def __init__(
+        self,
+        level=logging.NOTSET,
+        flush_size=FLUSH_SIZE,
+        flush_interval=FLUSH_INTERVAL,
+        flush_level=logging.WARNING,
+    ):
+        super().__init__(level)
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+        self.task_id = None
+        self.has_import = True
+        self.buffer = []
+        self.last_flush = time.monotonic()
+
     def emit(self, record):
         """
-        Log `record` into the `LegacyRoleImport.messages` field of the current task.
+        Buffer `record` for the `LegacyRoleImport.messages` field of the current task.
 
         Args:
             record (logging.LogRecord): The record to log.
@@ -20,15 +52,55 @@ class LegacyRoleImportHandler(logging.Handler):
         from pulpcore.plugin.models import Task
 
         # some v1 tasks may not create async jobs ...
-        if not Task.current():
+        task = Task.current()
+        if not task:
             return
 
-        # v1 sync tasks will also end up here ...
-        if not LegacyRoleImport.objects.filter(task=Task.current().pulp_id).exists():
+        if task.pk != self.task_id:
+            self._write()
+            self.task_id = task.pk
+            self.has_import = True
+
+        if not self.has_import:
             return
 
-        # fetch the task
-        task = Task.current()
-        legacyrole_import = LegacyRoleImport.objects.get(task=task.pulp_id)
-        legacyrole_import.add_log_record(record, state=task.state)
-        legacyrole_import.save()
+        self.buffer.append(LegacyRoleImport.log_record_message(record, state=task.state))
+        if (
+            len(self.buffer) >= self.flush_size
+            or record.levelno >= self.flush_level
+            or time.monotonic() - self.last_flush >= self.flush_interval
+        ):
+            self._write()
+
+    def _write(self):
+        from galaxy_ng.app.api.v1.models import LegacyRoleImport
+
+        messages, self.buffer = self.buffer, []
+        self.last_flush = time.monotonic()
+        if messages and self.has_import:
+            self.has_import = bool(LegacyRoleImport.append_messages(self.task_id, messages))
+
+    def flush(self):
+        """Write the pending records of the current task."""
+        with self.lock:
+            self._write()
+
+    def close(self):
+        self.flush()
+        super().close()
+
+
+def flush_log_handlers(logger):
+    """Decorator flushing the handlers of logger when the function returns or raises."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                for handler in logger.handlers:
+                    handler.flush()
+        return wrapper
+
+    return decorator
@@ -1,4 +1,8 @@
 from django.db import models
+from django.db.models import F, Func, Value
+from django.db.models.fields.json import KT, KeyTransform
+from django.db.models.functions import MD5
+from django.contrib.postgres.indexes import OpClass
 from django.contrib.postgres.search import SearchVectorField
 from django.contrib.postgres.indexes import GinIndex
 
@@ -112,6 +116,12 @@ class LegacyNamespace(models.Model):
         editable=True
     )
 
+    class Meta:
+        indexes = [
+            # substring matches of the role keywords and autocomplete filters
+            GinIndex(fields=['name'], name='galaxy_legacyns_name_trgm', opclasses=['gin_trgm_ops']),
+        ]
+
     def __repr__(self):
         return f'<LegacyNamespace: {self.name}>'
 
@@ -129,6 +139,67 @@ class LegacyRoleTag(models.Model):
         return self.name
 
 
+# full_metadata keys that are only shown by the role content endpoint. A readme
+# can be many times the size of the rest of the document.
+LARGE_METADATA_KEYS = ('readme', 'readme_html')
+
+
+class JSONBWithoutKeys(Func):
+    """The jsonb document of expression without the given top level keys."""
+
+    output_field = models.JSONField()
+
+    def __init__(self, expression, keys, **extra):
+        # the keys are constants of this module, never user input
+        removed = "".join(f" - '{key}'" for key in keys)
+        super().__init__(expression, template=f"(%(expressions)s{removed})", **extra)
+
+
+class JSONBConcat(Func):
+    """`jsonb || jsonb`, appends the elements of an array to another one."""
+
+    arg_joiner = " || "
+    template = "(%(expressions)s)"
+    output_field = models.JSONField()
+
+
+class JSONBArraySlice(Func):
+    """The elements of a jsonb array from offset to the end."""
+
+    function = "jsonb_path_query_array"
+    # the path is the last expression
+    template = "%(function)s(%(expressions)s::jsonpath)"
+    output_field = models.JSONField()
+
+    def __init__(self, expression, offset, **extra):
+        path = Value(f"$[{int(offset)} to last]")
+        super().__init__(expression, path, **extra)
+
+
+class LegacyRoleQuerySet(models.QuerySet):
+
+    def with_summary_metadata(self):
+        """
+        Defer full_metadata and annotate it as summary_metadata without the
+        LARGE_METADATA_KEYS.
+
+        The keys are removed by postgres, so the readmes of a page of roles
+        are never sent to django nor decoded.
+        """
+        return self.defer('full_metadata').annotate(
+            summary_metadata=JSONBWithoutKeys(F('full_metadata'), LARGE_METADATA_KEYS)
+        )
+
+    def with_metadata_digests(self):
+        """
+        with_summary_metadata plus the md5 of each of the LARGE_METADATA_KEYS
+        as <key>_md5, to tell whether a readme changed without loading it.
+        """
+        return self.with_summary_metadata().annotate(**{
+            f'{key}_md5': MD5(KT(f'full_metadata__{key}')) for key in LARGE_METADATA_KEYS
+        })
+
+
 class LegacyRole(models.Model):
     """
     A legacy v1 role, which is just an index for github.
@@ -170,6 +241,28 @@ class LegacyRole(models.Model):
 
     tags = models.ManyToManyField(LegacyRoleTag, editable=False, related_name="legacyrole")
 
+    objects = LegacyRoleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # role imports and the cli delete look roles up by their github repo
+            models.Index(
+                KeyTransform('github_repo', 'full_metadata'),
+                KeyTransform('github_user', 'full_metadata'),
+                name='galaxy_legacyrole_github_idx',
+            ),
+            # the tags filter of api/v1/roles/
+            GinIndex(KeyTransform('tags', 'full_metadata'), name='galaxy_legacyrole_tags_idx'),
+            # substring matches of the keywords and autocomplete filters
+            GinIndex(
+                fields=['name'], name='galaxy_legacyrole_name_trgm', opclasses=['gin_trgm_ops']
+            ),
+            GinIndex(
+                OpClass(KT('full_metadata__description'), name='gin_trgm_ops'),
+                name='galaxy_legacyrole_desc_trgm',
+            ),
+        ]
+
     def __repr__(self):
         return f'<LegacyRole: {self.namespace.name}.{self.name}>'
 
@@ -213,9 +306,23 @@ class LegacyRoleImport(models.Model):
     )
     messages = models.JSONField(default=list, editable=False)
 
+    # copied from the task kwargs, which are encrypted and can't be filtered on
+    github_user = models.CharField(max_length=256, null=True, db_index=True, editable=False)
+    github_repo = models.CharField(max_length=256, null=True, db_index=True, editable=False)
+
     class Meta:
         ordering = ["task__pulp_created"]
 
+    @staticmethod
+    def log_record_message(log_record, state=None):
+        """The entry of messages for a single log record."""
+        return {
+            "state": state,
+            "message": log_record.msg,
+            "level": log_record.levelname,
+            "time": log_record.created
+        }
+
     def add_log_record(self, log_record, state=None):
         """
         Records a single log message but does not save the LegacyRoleImport object.
@@ -224,9 +331,27 @@ class LegacyRoleImport(models.Model):
             log_record(logging.LogRecord): The logging record to record on messages.
 
         """
-        self.messages.append({
-            "state": state,
-            "message": log_record.msg,
-            "level": log_record.levelname,
-            "time": log_record.created
-        })
+        self.messages.append(self.log_record_message(log_record, state=state))
+
+    @classmethod
+    def append_messages(cls, task_id, messages):
+        """
+        Append messages to the import of a task with a single jsonb concatenation,
+        without reading or rewriting the messages already stored.
+
+        Returns:
+            int: 1 if the task has an import, 0 otherwise.
+        """
+        return cls.objects.filter(task_id=task_id).update(
+            messages=JSONBConcat(F('messages'), Value(messages, output_field=models.JSONField()))
+        )
+
+    @classmethod
+    def get_messages(cls, task_id, offset=0):
+        """
+        The messages of the import of a task from offset on, sliced by postgres, or
+        None when the task has no import.
+        """
+        return cls.objects.filter(task_id=task_id).values_list(
+            JSONBArraySlice(F('messages'), offset), flat=True
+        ).first()
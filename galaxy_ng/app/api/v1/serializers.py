@@ -6,7 +6,7 @@ from pulpcore.plugin.util import get_url
 
 from galaxy_ng.app.models.auth import User
 from galaxy_ng.app.models.namespace import Namespace
-from galaxy_ng.app.utils.rbac import get_v3_namespace_owners
+from galaxy_ng.app.utils.rbac import get_v3_namespace_owners, get_v3_namespaces_owners
 from galaxy_ng.app.api.v1.models import LegacyNamespace
 from galaxy_ng.app.api.v1.models import LegacyRole, LegacyRoleTag
 from galaxy_ng.app.api.v1.models import LegacyRoleDownloadCount
@@ -17,6 +17,23 @@ from galaxy_ng.app.utils.galaxy import (
 )
 
 
+# serializer context key of the {v3 namespace pk: [owners]} of a listing
+NAMESPACE_OWNERS_KEY = "galaxy_namespace_owners"
+
+
+class LegacyNamespacesListSerializer(serializers.ListSerializer):
+    """Resolves the owners of all the listed namespaces at once."""
+
+    def to_representation(self, data):
+        namespaces = list(data.all() if hasattr(data, 'all') else data)
+        owners_by_namespace = self.context.setdefault(NAMESPACE_OWNERS_KEY, {})
+        owners_by_namespace.update(get_v3_namespaces_owners(
+            [ns.namespace for ns in namespaces if ns.namespace],
+            use_cache=True,
+        ))
+        return super().to_representation(namespaces)
+
+
 class LegacyNamespacesSerializer(serializers.ModelSerializer):
 
     summary_fields = serializers.SerializerMethodField()
@@ -27,6 +44,7 @@ class LegacyNamespacesSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = LegacyNamespace
+        list_serializer_class = LegacyNamespacesListSerializer
         fields = [
             'id',
             'url',
@@ -61,7 +79,10 @@ class LegacyNamespacesSerializer(serializers.ModelSerializer):
 
         owners = []
         if obj.namespace:
-            owner_objects = get_v3_namespace_owners(obj.namespace)
+            owners_by_namespace = self.context.get(NAMESPACE_OWNERS_KEY, {})
+            owner_objects = owners_by_namespace.get(obj.namespace.pk)
+            if owner_objects is None:
+                owner_objects = get_v3_namespace_owners(obj.namespace)
             owners = [{'id': x.id, 'username': x.username} for x in owner_objects]
 
         # link the v1 namespace to the v3 namespace so that users
@@ -245,6 +266,12 @@ class LegacyRoleSerializer(serializers.ModelSerializer):
             'download_count',
         ]
 
+    def _get_metadata(self, obj):
+        """The summary_metadata projection of listings, or the full_metadata."""
+        if hasattr(obj, 'summary_metadata'):
+            return obj.summary_metadata
+        return obj.full_metadata
+
     def get_id(self, obj):
         return obj.pulp_id
 
@@ -255,7 +282,7 @@ class LegacyRoleSerializer(serializers.ModelSerializer):
         This ID comes from the original source of the role
         if it was sync'ed from an upstream source.
         """
-        return obj.full_metadata.get('upstream_id')
+        return self._get_metadata(obj).get('upstream_id')
 
     def get_url(self, obj):
         return None
@@ -270,7 +297,7 @@ class LegacyRoleSerializer(serializers.ModelSerializer):
         return obj.pulp_created
 
     def get_imported(self, obj):
-        return obj.full_metadata.get('imported')
+        return self._get_metadata(obj).get('imported')
 
     def get_github_user(self, obj):
         """
@@ -280,8 +307,9 @@ class LegacyRoleSerializer(serializers.ModelSerializer):
         of the role in the form of:
             https://github.com/<github_user>/<github_repo>/...
         """
-        if obj.full_metadata.get('github_user'):
-            return obj.full_metadata['github_user']
+        metadata = self._get_metadata(obj)
+        if metadata.get('github_user'):
+            return metadata['github_user']
         return obj.namespace.name
 
     def get_username(self, obj):
@@ -295,7 +323,7 @@ class LegacyRoleSerializer(serializers.ModelSerializer):
         of the role in the form of:
             https://github.com/<github_user>/<github_repo>/...
         """
-        return obj.full_metadata.get('github_repo')
+        return self._get_metadata(obj).get('github_repo')
 
     def get_github_branch(self, obj):
         """
@@ -305,24 +333,26 @@ class LegacyRoleSerializer(serializers.ModelSerializer):
         at install time. If not branch is given, the cli will default to
         the "master" branch.
         """
-        if obj.full_metadata.get('github_reference'):
-            return obj.full_metadata.get('github_reference')
-        return obj.full_metadata.get('github_branch')
+        metadata = self._get_metadata(obj)
+        if metadata.get('github_reference'):
+            return metadata.get('github_reference')
+        return metadata.get('github_branch')
 
     def get_commit(self, obj):
-        return obj.full_metadata.get('commit')
+        return self._get_metadata(obj).get('commit')
 
     def get_commit_message(self, obj):
-        return obj.full_metadata.get('commit_message')
+        return self._get_metadata(obj).get('commit_message')
 
     def get_description(self, obj):
-        return obj.full_metadata.get('description')
+        return self._get_metadata(obj).get('description')
 
     def get_summary_fields(self, obj):
-        dependencies = obj.full_metadata.get('dependencies', [])
-        tags = obj.full_metadata.get('tags', [])
+        metadata = self._get_metadata(obj)
+        dependencies = metadata.get('dependencies', [])
+        tags = metadata.get('tags', [])
 
-        versions = obj.full_metadata.get('versions', [])
+        versions = metadata.get('versions', [])
         if versions:
             # FIXME(jctanner): we can't assume they're all sorted yet
             versions = sort_versions(versions)
@@ -342,12 +372,12 @@ class LegacyRoleSerializer(serializers.ModelSerializer):
 
         # FIXME(jctanner): repository is a bit hacky atm
         repository = {}
-        if obj.full_metadata.get('repository'):
-            repository = obj.full_metadata.get('repository')
+        if metadata.get('repository'):
+            repository = metadata.get('repository')
         if not repository.get('name'):
-            repository['name'] = obj.full_metadata.get('github_repo')
+            repository['name'] = metadata.get('github_repo')
         if not repository.get('original_name'):
-            repository['original_name'] = obj.full_metadata.get('github_repo')
+            repository['original_name'] = metadata.get('github_repo')
 
         # prefer the provider avatar url
         avatar_url = f'https://github.com/{obj.namespace.name}.png'
@@ -368,10 +398,11 @@ class LegacyRoleSerializer(serializers.ModelSerializer):
         }
 
     def get_download_count(self, obj):
-        counter = LegacyRoleDownloadCount.objects.filter(legacyrole=obj).first()
-        if counter:
-            return counter.count
-        return 0
+        # no query when the counter was joined with select_related
+        try:
+            return obj.legacyroledownloadcount.count
+        except LegacyRoleDownloadCount.DoesNotExist:
+            return 0
 
 
 class LegacyRoleRepositoryUpdateSerializer(serializers.Serializer):
@@ -8,8 +8,7 @@ import traceback
 import tempfile
 import uuid
 
-from django.db import transaction
-
+from django.db.models.fields.json import KT
 from ansible.module_utils.compat.version import LooseVersion
 
 from galaxy_importer.config import Config
@@ -17,15 +16,17 @@ from galaxy_importer.legacy_role import import_legacy_role
 
 from galaxy_ng.app.models.auth import User
 from galaxy_ng.app.models import Namespace
+from galaxy_ng.app.utils.galaxy import SyncCheckpoint
 from galaxy_ng.app.utils.galaxy import upstream_role_iterator
+from galaxy_ng.app.utils.legacy import LegacyRoleSyncWriter
 from galaxy_ng.app.utils.legacy import process_namespace
 from galaxy_ng.app.utils.namespaces import generate_v3_namespace_from_attributes
 from galaxy_ng.app.utils.rbac import get_v3_namespace_owners
 
 from galaxy_ng.app.api.v1.models import LegacyNamespace
 from galaxy_ng.app.api.v1.models import LegacyRole
-from galaxy_ng.app.api.v1.models import LegacyRoleDownloadCount
 from galaxy_ng.app.api.v1.models import LegacyRoleImport
+from galaxy_ng.app.api.v1.logutils import flush_log_handlers
 from galaxy_ng.app.api.v1.utils import sort_versions
 from galaxy_ng.app.api.v1.utils import parse_version_tag
 
@@ -69,14 +70,17 @@ def find_real_role(github_user, github_repo):
     clone_url = None
 
     # some roles have their github_user set differently from their namespace name ...
-    candidates = LegacyRole.objects.filter(
+    # only the two keys are read, full_metadata is loaded if the role gets imported
+    real_role = LegacyRole.objects.filter(
         full_metadata__github_user=github_user,
         full_metadata__github_repo=github_repo
-    ).order_by('created')
-    if candidates.count() > 0:
-        real_role = candidates.first()
-        rr_github_user = real_role.full_metadata.get('github_user')
-        rr_github_repo = real_role.full_metadata.get('github_repo')
+    ).select_related('namespace').defer('full_metadata').annotate(
+        rr_github_user=KT('full_metadata__github_user'),
+        rr_github_repo=KT('full_metadata__github_repo'),
+    ).order_by('created').first()
+    if real_role is not None:
+        rr_github_user = real_role.rr_github_user
+        rr_github_repo = real_role.rr_github_repo
         real_namespace_name = real_role.namespace.name
         if rr_github_user and rr_github_repo:
             real_github_user = rr_github_user
@@ -269,6 +273,7 @@ def compute_all_versions(this_role, gitrepo):
     return versions
 
 
+@flush_log_handlers(logger)
 def legacy_role_import(
     request_username=None,
     github_user=None,
@@ -320,7 +325,10 @@ def legacy_role_import(
     if task:
         v1_task_id = uuid_to_int(str(task.pulp_id))
         task_id = task.pulp_id
-        import_model, _ = LegacyRoleImport.objects.get_or_create(task_id=task_id)
+        import_model, _ = LegacyRoleImport.objects.get_or_create(
+            task_id=task_id,
+            defaults={'github_user': github_user, 'github_repo': github_repo},
+        )
 
     logger.info(f'Starting import: task_id={v1_task_id}, pulp_id={task_id}')
     logger.info('')
@@ -551,9 +559,9 @@ def legacy_role_import(
 
     # bind the role to the import log model
     if import_model:
-        import_model.refresh_from_db()
+        # the log handler appends the messages, don't write them back
         import_model.role = this_role
-        import_model.save()
+        import_model.save(update_fields=['role'])
 
     logger.info('')
     logger.info('Import completed')
@@ -567,6 +575,10 @@ def legacy_sync_from_upstream(
     role_version=None,
     limit=None,
     start_page=None,
+    concurrency=None,
+    batch_size=None,
+    restart=False,
+    incremental=False,
 ):
     """
     Sync legacy roles from a remote v1 api.
@@ -579,6 +591,17 @@ def legacy_sync_from_upstream(
         Allow the client to reduce the set of synced roles by the role name.
     :param limit:
         Allow the client to reduce the total number of synced roles.
+    :param concurrency:
+        Number of upstream requests made in parallel while fetching the roles.
+    :param batch_size:
+        Number of roles written to the database at once.
+    :param restart:
+        Ignore the progress saved by a previous interrupted sync.
+    :param incremental:
+        Only sync the roles modified upstream since the last complete sync.
+
+    A sync of all the upstream roles saves its progress in an
+    UpstreamSyncCursor and resumes from it when it is interrupted.
 
     This is conceptually similar to the pulp_ansible/app/tasks/roles.py:synchronize
     function but has more robust handling and better schema matching. Although
@@ -599,8 +622,19 @@ def legacy_sync_from_upstream(
     if limit is not None:
         limit = int(limit)
 
-    # index of all roles
-    rmap = {}
+    writer = LegacyRoleSyncWriter(batch_size=batch_size)
+
+    # only a sync of all the upstream roles can be resumed
+    checkpoint = None
+    if not github_user and not role_name and not start_page:
+        checkpoint = SyncCheckpoint(
+            'roles',
+            baseurl or 'https://old-galaxy.ansible.com',
+            restart=restart,
+            incremental=incremental,
+            on_checkpoint=writer.flush,
+            every=writer.batch_size,
+        )
 
     iterator_kwargs = {
         'baseurl': baseurl,
@@ -608,6 +642,8 @@ def legacy_sync_from_upstream(
         'role_name': role_name,
         'limit': limit,
         'start_page': start_page,
+        'concurrency': concurrency,
+        'checkpoint': checkpoint,
     }
     for ns_data, rdata, rversions in upstream_role_iterator(**iterator_kwargs):
 
@@ -623,7 +659,6 @@ def legacy_sync_from_upstream(
 
         logger.info(f'POPULATE {github_user}.{role_name}')
 
-        rkey = (github_user, role_name)
         remote_id = rdata['id']
         role_versions = rversions[:]
         github_repo = rdata['github_repo']
@@ -648,16 +683,6 @@ def legacy_sync_from_upstream(
         role_type = rdata.get('role_type', 'ANS')
         role_download_count = rdata.get('download_count', 0)
 
-        if rkey not in rmap:
-            logger.debug(f'SYNC create initial role for {rkey}')
-            this_role, _ = LegacyRole.objects.get_or_create(
-                namespace=namespace,
-                name=role_name
-            )
-            rmap[rkey] = this_role
-        else:
-            this_role = rmap[rkey]
-
         new_full_metadata = {
             'upstream_id': remote_id,
             'role_type': role_type,
@@ -687,14 +712,14 @@ def legacy_sync_from_upstream(
         new_full_metadata['versions'] = normalize_versions(new_full_metadata['versions'])
         new_full_metadata['versions'] = sort_versions(new_full_metadata['versions'])
 
-        if dict(this_role.full_metadata) != new_full_metadata:
-            with transaction.atomic():
-                this_role.full_metadata = new_full_metadata
-                this_role.save()
+        writer.add(namespace, role_name, new_full_metadata, role_download_count)
 
-        with transaction.atomic():
-            counter, _ = LegacyRoleDownloadCount.objects.get_or_create(legacyrole=this_role)
-            counter.count = role_download_count
-            counter.save()
+    writer.flush()
 
-    logger.debug('STOP LEGACY SYNC!')
+    logger.debug(
+        'STOP LEGACY SYNC!'
+        + f' inserted:{writer.stats["inserted"]}'
+        + f' updated:{writer.stats["updated"]}'
+        + f' skipped:{writer.stats["skipped"]}'
+    )
+    return writer.stats
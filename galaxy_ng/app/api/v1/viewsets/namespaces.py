@@ -74,7 +74,10 @@ class LegacyNamespacesViewSet(
     TODO: allow mapping to a real namespace
     """
 
-    queryset = LegacyNamespace.objects.all().order_by('id')
+    # the serializer reads the provider namespace and its avatar of every row
+    queryset = LegacyNamespace.objects.select_related(
+        'namespace__last_created_pulp_metadata'
+    ).order_by('id')
     pagination_class = LegacyNamespacesSetPagination
     serializer_class = LegacyNamespacesSerializer
 
@@ -1,8 +1,6 @@
 import logging
 
 from django.conf import settings
-from django.db import transaction
-from django.db.utils import InternalError as DatabaseInternalError
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
 
@@ -11,16 +9,15 @@ from rest_framework import viewsets
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.settings import perform_import
-from rest_framework.pagination import PageNumberPagination
 
 from galaxy_ng.app.access_control.access_policy import LegacyAccessPolicy
+from galaxy_ng.app.api.pagination import KeysetPageNumberPagination
 
 from galaxy_ng.app.api.v1.tasks import (
     legacy_role_import,
 )
 from galaxy_ng.app.api.v1.models import (
     LegacyRole,
-    LegacyRoleDownloadCount,
     LegacyRoleImport,
 )
 from galaxy_ng.app.api.v1.serializers import (
@@ -34,6 +31,7 @@ from galaxy_ng.app.api.v1.serializers import (
 )
 
 from galaxy_ng.app.api.v1.viewsets.tasks import LegacyTasksMixin
+from galaxy_ng.app.tasks.download_counts import count_role_download
 from galaxy_ng.app.api.v1.filtersets import (
     LegacyRoleFilter,
     LegacyRoleImportFilter,
@@ -48,7 +46,7 @@ GALAXY_AUTHENTICATION_CLASSES = perform_import(
 logger = logging.getLogger(__name__)
 
 
-class LegacyRolesSetPagination(PageNumberPagination):
+class LegacyRolesSetPagination(KeysetPageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 1000
@@ -57,7 +55,11 @@ class LegacyRolesSetPagination(PageNumberPagination):
 class LegacyRolesViewSet(viewsets.ModelViewSet):
     """A list of legacy roles."""
 
-    queryset = LegacyRole.objects.all().order_by('created')
+    # the serializer reads the download counter and the namespaces of every role
+    queryset = LegacyRole.objects.select_related(
+        'legacyroledownloadcount',
+        'namespace__namespace__last_created_pulp_metadata',
+    ).order_by('created')
     ordering = ('created')
     filter_backends = (DjangoFilterBackend,)
     filterset_class = LegacyRoleFilter
@@ -68,6 +70,13 @@ class LegacyRolesViewSet(viewsets.ModelViewSet):
     permission_classes = [LegacyAccessPolicy]
     authentication_classes = GALAXY_AUTHENTICATION_CLASSES
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            # the readmes are only served by the role content endpoint
+            queryset = queryset.with_summary_metadata()
+        return queryset
+
     def list(self, request):
 
         # this is the naive logic used in the original galaxy to assume a role
@@ -78,25 +87,7 @@ class LegacyRolesViewSet(viewsets.ModelViewSet):
             role_name = request.query_params.get('name')
             role = LegacyRole.objects.filter(namespace__name=role_namespace, name=role_name).first()
             if role:
-
-                with transaction.atomic():
-
-                    try:
-                        # attempt to get or create the counter first
-                        counter, _ = LegacyRoleDownloadCount.objects.get_or_create(legacyrole=role)
-
-                        # now lock the row so that we avoid race conditions
-                        counter = LegacyRoleDownloadCount.objects.select_for_update().get(
-                            pk=counter.pk
-                        )
-
-                        # increment and save
-                        counter.count += 1
-                        counter.save()
-                    except DatabaseInternalError as e:
-                        # Fail gracefully if the database is in read-only mode.
-                        if "read-only" not in str(e):
-                            raise e
+                count_role_download(role)
 
         return super().list(request)
 
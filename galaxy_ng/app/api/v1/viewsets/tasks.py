@@ -5,6 +5,7 @@ from django.shortcuts import get_object_or_404
 
 from drf_spectacular.utils import extend_schema
 
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
 from pulpcore.plugin.tasking import dispatch
@@ -72,12 +73,20 @@ class LegacyTasksMixin:
             'COMPLETED': 'SUCCESS'
         }
 
+        # pollers can pass the number of messages they already have
+        try:
+            offset = int(request.query_params.get('offset', 0))
+        except ValueError:
+            raise ValidationError({'offset': 'offset must be an integer'})
+        if offset < 0:
+            raise ValidationError({'offset': 'offset must not be negative'})
+
         task_messages = []
 
         # get messages from the model if this was a role import
-        roleimport = LegacyRoleImport.objects.filter(task=this_task).first()
-        if roleimport:
-            for message in roleimport.messages:
+        messages = LegacyRoleImport.get_messages(this_task.pk, offset=offset)
+        if messages:
+            for message in messages:
                 msg_type = msg_type_map.get(message['level'], message['level'])
                 # FIXME(cutwater): The `datetime.utcfromtimestamp` method used here is a cause of
                 #  multiple problems (deprecated method, naive-datetime object result,
@@ -1,9 +1,11 @@
 import logging
+import threading
+from urllib.parse import urlsplit
 
 import requests
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
-from django.http import HttpResponseRedirect, StreamingHttpResponse
+from django.http import HttpResponse, HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
@@ -37,6 +39,7 @@ from galaxy_ng.app.tasks import (
     import_and_auto_approve,
     import_to_staging,
 )
+from galaxy_ng.app.tasks.download_counts import count_collection_download
 
 
 log = logging.getLogger(__name__)
@@ -156,16 +159,57 @@ class CollectionUploadViewSet(api_base.LocalSettingsMixin,
         )
 
 
+# connections to the content app are reused across the downloads served by a
+# thread, requests.Session is not thread safe
+_content_app = threading.local()
+
+
+def get_content_app_session():
+    """Return the keep-alive session to the content app of this thread."""
+    session = getattr(_content_app, 'session', None)
+    if session is None:
+        session = _content_app.session = requests.Session()
+    return session
+
+
 class CollectionArtifactDownloadView(api_base.APIView):
+    """
+    Downloads a collection artifact.
+
+    In insights mode the artifact is served by the content app behind the API.
+    When GALAXY_DOWNLOAD_ACCEL_REDIRECT_LOCATION is set, the fronting nginx is
+    told to fetch it with an X-Accel-Redirect to that internal location, else
+    the API worker streams it in GALAXY_DOWNLOAD_CHUNK_SIZE chunks.
+    """
+
     permission_classes = [access_policy.CollectionAccessPolicy]
     action = 'download'
 
     def _get_tcp_response(self, url):
-        return requests.get(url, stream=True, allow_redirects=False)
+        return get_content_app_session().get(url, stream=True, allow_redirects=False)
 
     def _get_ansible_distribution(self, base_path):
         return AnsibleDistribution.objects.get(base_path=base_path)
 
+    @staticmethod
+    def _get_accel_redirect_response(location, url):
+        url = urlsplit(url)
+        response = HttpResponse()
+        # let nginx pick the content type of the content app response
+        del response['Content-Type']
+        response['X-Accel-Redirect'] = '{location}{path}?{query}'.format(
+            location=location.rstrip('/'), path=url.path, query=url.query
+        )
+        return response
+
+    @staticmethod
+    def _stream(response):
+        try:
+            yield from response.raw.stream(amt=settings.get('GALAXY_DOWNLOAD_CHUNK_SIZE', 4096))
+        finally:
+            # give the connection back to the pool
+            response.close()
+
     def get(self, request, *args, **kwargs):
         metrics.collection_artifact_download_attempts.inc()
 
@@ -180,7 +224,7 @@ class CollectionArtifactDownloadView(api_base.APIView):
             )
 
         if settings.get("ANSIBLE_COLLECT_DOWNLOAD_COUNT", False):
-            pulp_ansible_views.CollectionArtifactDownloadView.count_download(filename)
+            count_collection_download(filename)
 
         if settings.GALAXY_DEPLOYMENT_MODE == DeploymentMode.INSIGHTS.value:  # noqa: SIM300
             url = 'http://{host}:{port}/{prefix}/{distro_base_path}/{filename}'.format(
@@ -190,23 +234,34 @@ class CollectionArtifactDownloadView(api_base.APIView):
                 distro_base_path=distro_base_path,
                 filename=filename,
             )
-            response = self._get_tcp_response(
-                distribution.content_guard.cast().preauthenticate_url(url)
-            )
+            url = distribution.content_guard.cast().preauthenticate_url(url)
+
+            if location := settings.get('GALAXY_DOWNLOAD_ACCEL_REDIRECT_LOCATION'):
+                # nginx reports the errors of the content app to the client
+                metrics.collection_artifact_download_successes.inc()
+                return self._get_accel_redirect_response(location, url)
+
+            response = self._get_tcp_response(url)
 
             if response.status_code == requests.codes.not_found:
+                response.close()
                 metrics.collection_artifact_download_failures.labels(
                     status=requests.codes.not_found
                 ).inc()
                 raise NotFound()
             if response.status_code == requests.codes.found:
+                response.close()
                 return HttpResponseRedirect(response.headers['Location'])
             if response.status_code == requests.codes.ok:
                 metrics.collection_artifact_download_successes.inc()
-                return StreamingHttpResponse(
-                    response.raw.stream(amt=4096),
+                streaming_response = StreamingHttpResponse(
+                    self._stream(response),
                     content_type=response.headers['Content-Type']
                 )
+                if 'Content-Length' in response.headers:
+                    streaming_response['Content-Length'] = response.headers['Content-Length']
+                return streaming_response
+            response.close()
             metrics.collection_artifact_download_failures.labels(status=response.status_code).inc()
             raise APIException(
                 _('Unexpected response from content app. Code: %s.') % response.status_code
@@ -1,8 +1,10 @@
 import base64
+import hashlib
 import json
 import logging
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
 
 from pulpcore.plugin.util import get_objects_for_group
@@ -17,6 +19,7 @@ from galaxy_ng.app.models.auth import Group, User
 DEFAULT_UPSTREAM_REPO_NAME = settings.GALAXY_API_DEFAULT_DISTRIBUTION_BASE_PATH
 RH_ACCOUNT_SCOPE = 'rh-identity-account'
 SYNCLIST_DEFAULT_POLICY = 'exclude'
+IDENTITY_CACHE_PREFIX = 'galaxy_rh_identity'
 
 
 log = logging.getLogger(__name__)
@@ -28,6 +31,10 @@ class RHIdentityAuthentication(BaseAuthentication):
 
     For users logging in first time creates User record and
     Tenant record for user's account if it doesn't exist.
+
+    Once provisioned, the user id is cached under a hash of the identity
+    attributes for GALAXY_RH_IDENTITY_CACHE_TIMEOUT seconds, and requests
+    with the same attributes only load the user.
     """
 
     header = 'HTTP_X_RH_IDENTITY'
@@ -75,19 +82,47 @@ class RHIdentityAuthentication(BaseAuthentication):
         first_name = user.get('first_name', '')
         last_name = user.get('last_name', '')
 
-        group, _ = self._ensure_group(RH_ACCOUNT_SCOPE, account)
+        attrs = {'email': email, 'first_name': first_name, 'last_name': last_name}
+        cache_key = self._get_cache_key(identity_type, account, username, attrs)
+        user = self._get_cached_user(cache_key)
+        if user is None:
+            user = self._provision(account, username, attrs)
+            self._cache_user(cache_key, user)
 
-        user = self._ensure_user(
-            username,
-            group,
-            email=email,
-            first_name=first_name,
-            last_name=last_name
-        )
+        return user, {'rh_identity': header}
 
-        self._ensure_synclists(group)
+    def _provision(self, account, username, attrs):
+        """Create the account group, the user and the account synclist in one transaction"""
+        with transaction.atomic():
+            group, _ = self._ensure_group(RH_ACCOUNT_SCOPE, account)
+            # serialize the first logins of an account so the synclist is created once
+            Group.objects.select_for_update().filter(pk=group.pk).first()
 
-        return user, {'rh_identity': header}
+            user = self._ensure_user(username, group, **attrs)
+            self._ensure_synclists(group)
+        return user
+
+    @staticmethod
+    def _get_cache_key(identity_type, account, username, attrs):
+        identity = json.dumps([identity_type, account, username, attrs], sort_keys=True)
+        digest = hashlib.sha256(identity.encode()).hexdigest()
+        return f"{IDENTITY_CACHE_PREFIX}:{digest}"
+
+    @staticmethod
+    def _get_cached_user(cache_key):
+        if not settings.get('GALAXY_RH_IDENTITY_CACHE_TIMEOUT', 0):
+            return None
+        user_id = cache.get(cache_key)
+        if user_id is None:
+            return None
+        return User.objects.filter(pk=user_id).first()
+
+    @staticmethod
+    def _cache_user(cache_key, user):
+        timeout = settings.get('GALAXY_RH_IDENTITY_CACHE_TIMEOUT', 0)
+        if timeout:
+            # only cache provisioning that was committed
+            transaction.on_commit(lambda: cache.set(cache_key, user.pk, timeout))
 
     def _ensure_group(self, account_scope, account):
         """Create a auto group for the account and create a synclist distribution"""
@@ -134,7 +169,7 @@ class RHIdentityAuthentication(BaseAuthentication):
                 username=username,
                 defaults=attrs,
             )
-            if group not in user.groups.all():
+            if not user.groups.filter(pk=group.pk).exists():
                 user.groups.add(group)
         return user
 
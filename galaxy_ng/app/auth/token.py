@@ -1,6 +1,8 @@
 import datetime
 
+from django.apps import apps
 from django.conf import settings
+from django.db.models import BooleanField, Exists, OuterRef, Value
 from django.utils import timezone
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.authtoken.models import Token
@@ -10,30 +12,40 @@ from rest_framework import exceptions
 class ExpiringTokenAuthentication(TokenAuthentication):
 
     def authenticate_credentials(self, key):
-        try:
-            token = Token.objects.get(key=key)
-        except Token.DoesNotExist:
-            raise exceptions.AuthenticationFailed('Invalid token')
+        token = self._get_token(key)
 
         if not token.user.is_active:
             raise exceptions.AuthenticationFailed('User inactive or deleted')
 
         # Token expiration only for SOCIAL AUTH users
-        if hasattr(token.user, 'social_auth'):
-            from social_django.models import UserSocialAuth
+        if token.keycloak_linked:
+            utc_now = timezone.now()
+            # Set default to one day expiration
             try:
-                token.user.social_auth.get(provider="keycloak")
-                utc_now = timezone.now()
-                # Set default to one day expiration
-                try:
-                    expiry = int(settings.get('GALAXY_TOKEN_EXPIRATION'))
-                    if token.created < utc_now - datetime.timedelta(minutes=expiry):
-                        raise exceptions.AuthenticationFailed('Token has expired')
-                except ValueError:
-                    pass
-                except TypeError:
-                    pass
-            except UserSocialAuth.DoesNotExist:
+                expiry = int(settings.get('GALAXY_TOKEN_EXPIRATION'))
+                if token.created < utc_now - datetime.timedelta(minutes=expiry):
+                    raise exceptions.AuthenticationFailed('Token has expired')
+            except ValueError:
+                pass
+            except TypeError:
                 pass
 
         return (token.user, token)
+
+    @staticmethod
+    def _get_token(key):
+        """Load the token, its user and whether the user is linked to keycloak at once."""
+        if apps.is_installed('social_django'):
+            from social_django.models import UserSocialAuth
+            keycloak_linked = Exists(
+                UserSocialAuth.objects.filter(user=OuterRef('user'), provider="keycloak")
+            )
+        else:
+            keycloak_linked = Value(False, output_field=BooleanField())
+
+        try:
+            return Token.objects.select_related('user').annotate(
+                keycloak_linked=keycloak_linked
+            ).get(key=key)
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed('Invalid token')
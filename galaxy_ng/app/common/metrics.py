@@ -31,3 +31,18 @@ collection_artifact_download_successes = Counter(
     "galaxy_api_collection_artifact_download_successes",
     "count of successful collection artifact downloads"
 )
+
+legacy_role_sync_inserted = Counter(
+    "galaxy_legacy_role_sync_inserted",
+    "count of legacy roles created by the upstream sync"
+)
+
+legacy_role_sync_updated = Counter(
+    "galaxy_legacy_role_sync_updated",
+    "count of legacy roles updated by the upstream sync"
+)
+
+legacy_role_sync_skipped = Counter(
+    "galaxy_legacy_role_sync_skipped",
+    "count of legacy roles left unchanged by the upstream sync"
+)
@@ -1,32 +1,72 @@
-import io
 import logging
 
 from rest_framework.parsers import MultiPartParser
 
 log = logging.getLogger(__name__)
 
+SHA256_PART_HEADER = b'Content-Disposition: form-data; name="sha256"\r\n'
+
+# ansible-galaxy 2.9 sends the sha256 part before the file, so the header
+# is always found at the very beginning of the body.
+HEADER_SCAN_LIMIT = 64 * 1024
+
+
+class CRLFFixingStream:
+    """
+    Wraps the request stream and adds the crlf newline missing between the
+    Content-Disposition line of the sha256 part and its value.
+
+    Only the first HEADER_SCAN_LIMIT bytes of the body are buffered and
+    checked, the rest is read from the request stream as it is consumed.
+    """
+
+    def __init__(self, stream, on_fix=None):
+        self._stream = stream
+        self._head = None
+        self._on_fix = on_fix
+
+    def _read_head(self):
+        size = HEADER_SCAN_LIMIT + len(SHA256_PART_HEADER) + 2
+        chunks = []
+        while size > 0:
+            chunk = self._stream.read(size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size -= len(chunk)
+        head = b''.join(chunks)
+
+        before, header, after = head.partition(SHA256_PART_HEADER)
+        if header and len(before) < HEADER_SCAN_LIMIT and not after.startswith(b'\r\n'):
+            if self._on_fix is not None:
+                self._on_fix()
+            head = before + header + b'\r\n' + after
+        return head
+
+    def read(self, size=-1):
+        if self._head is None:
+            self._head = self._read_head()
+
+        if not self._head:
+            return self._stream.read(size)
+
+        if size is None or size < 0:
+            data, self._head = self._head + self._stream.read(), b''
+        else:
+            data, self._head = self._head[:size], self._head[size:]
+        return data
+
 
 class AnsibleGalaxy29MultiPartParser(MultiPartParser):
     def parse(self, stream, media_type=None, parser_context=None):
         # Add in a crlf newline if the body is missing it between the Content-Disposition line
-        # and the value
-
-        b_data = stream.read()
-        body_parts = b_data.partition(b'Content-Disposition: form-data; name="sha256"\r\n')
+        # and the value. The body is not read into memory, file parts are spooled by the
+        # upload handlers of the request as usual.
 
-        new_stream = io.BytesIO()
-        new_stream.write(body_parts[0])
-        new_stream.write(body_parts[1])
-
-        if not body_parts[2].startswith(b'\r\n'):
+        def log_malformed_body():
             log.warning('Malformed multipart body user-agent: %s',
                         parser_context['request'].META.get('HTTP_USER_AGENT'))
 
-            # add the crlf to the new stream so the base parser does the right thing
-            new_stream.write(b'\r\n')
-
-        new_stream.write(body_parts[2])
-
-        new_stream.seek(0)
+        new_stream = CRLFFixingStream(stream, on_fix=log_malformed_body)
 
         return super().parse(new_stream, media_type=media_type, parser_context=parser_context)
@@ -718,36 +718,33 @@ def configure_dynamic_settings(settings: Dynaconf) -> dict[str, Any]:
             return value.value
 
         # lazy import because it can't happen before apps are ready
-        from galaxy_ng.app.tasks.settings_cache import (
-            get_settings_from_cache,
-            get_settings_from_db,
-        )
-        if data := get_settings_from_cache():
-            metadata = SourceMetadata(loader="hooking", identifier="cache")
-        else:
-            data = get_settings_from_db()
-            if data:
-                metadata = SourceMetadata(loader="hooking", identifier="db")
-
-        # This is the main part, it will update temp_settings with data coming from settings db
-        # and by calling update it will process dynaconf parsing and merging.
-        try:
-            if data:
-                temp_settings.update(data, loader_identifier=metadata, tomlfy=True)
-        except (DynaconfFormatError, DynaconfParseError) as exc:
-            logger.error("Error loading dynamic settings: %s", str(exc))
-
-        if not data:
-            logger.debug("Dynamic settings are empty, reading key %s from default sources", key)
-        elif key in [_k.split("__")[0] for _k in data]:
-            logger.debug("Dynamic setting for key: %s loaded from %s", key, metadata.identifier)
-        else:
-            logger.debug(
-                "Key %s not on db/cache, %s other keys loaded from %s",
-                key, len(data), metadata.identifier
-            )
+        from galaxy_ng.app.tasks.settings_cache import settings_snapshot
 
-        return temp_settings.get(key, value.value)
+        def parse(data, source):
+            metadata = SourceMetadata(loader="hooking", identifier=source)
+
+            # This is the main part, it will update temp_settings with data coming from
+            # settings db and by calling update it will process dynaconf parsing and merging.
+            try:
+                if data:
+                    temp_settings.update(data, loader_identifier=metadata, tomlfy=True)
+            except (DynaconfFormatError, DynaconfParseError) as exc:
+                logger.error("Error loading dynamic settings: %s", str(exc))
+
+            if not data:
+                logger.debug("Dynamic settings are empty, reading key %s from default sources", key)
+            elif key in [_k.split("__")[0] for _k in data]:
+                logger.debug("Dynamic setting for key: %s loaded from %s", key, source)
+            else:
+                logger.debug(
+                    "Key %s not on db/cache, %s other keys loaded from %s",
+                    key, len(data), source
+                )
+
+            return temp_settings.get(key, value.value)
+
+        # the snapshot parses each key once per generation of the settings cache
+        return settings_snapshot.get(key, value.value, parse)
 
     def alter_hostname_settings(
         temp_settings: Settings,
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from galaxy_ng.app.utils.highest_versions import DEFAULT_BATCH_SIZE, rebuild_highest_versions
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the HighestCollectionVersion rows of the repository versions
+    served by the ansible distributions.
+
+    New repository versions are indexed by signals, this command backfills the
+    versions created before the index existed.
+    """
+
+    help = "Rebuild the highest collection versions used by _ui/v1/repo/<distro>/"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Number of rows written per query [{DEFAULT_BATCH_SIZE}]",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_highest_versions(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} repository versions."))
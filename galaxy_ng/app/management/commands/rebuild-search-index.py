@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from galaxy_ng.app.utils.search_index import DEFAULT_BATCH_SIZE, rebuild_search_index
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the SearchIndexEntry table backing _ui/v1/search/.
+
+    Entries are kept up to date by signals, this command is meant to be run
+    after bulk operations that bypass signals (e.g: sql imports) or periodically
+    as a safety net.
+    """
+
+    help = "Rebuild the search index used by _ui/v1/search/"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Number of entries written per query [{DEFAULT_BATCH_SIZE}]",
+        )
+
+    def handle(self, *args, **options):
+        collections, roles = rebuild_search_index(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed {collections} collections and {roles} roles.")
+        )
@@ -7,6 +7,7 @@ import django_guid
 from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand
 
+from galaxy_ng.app.utils.galaxy import SyncCheckpoint
 from galaxy_ng.app.utils.galaxy import upstream_collection_iterator
 from galaxy_ng.app.utils.legacy import process_namespace
 
@@ -33,6 +34,9 @@ User = get_user_model()
 class Command(BaseCommand):
     """
     Iterates through every upstream namespace and syncs it.
+
+    A sync of all the collections resumes where the previous one was
+    interrupted, or stopped by --limit, unless --restart is given.
     """
 
     help = 'Sync upstream namespaces+owners from [old-]galaxy.ansible.com'
@@ -45,6 +49,16 @@ class Command(BaseCommand):
         parser.add_argument("--repository", help="name for the repository", default="published")
         parser.add_argument("--rebuild_only", action="store_true", help="only rebuild metadata")
         parser.add_argument("--limit", type=int)
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="ignore the progress saved by an interrupted sync",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="only sync collections modified upstream since the last complete sync",
+        )
 
     def echo(self, message, style=None):
         style = style or self.style.SUCCESS
@@ -59,6 +73,16 @@ class Command(BaseCommand):
         if not repo:
             raise Exception('could not find repo')
 
+        # only a sync of all the upstream collections can be resumed
+        checkpoint = None
+        if not options['namespace'] and not options['name']:
+            checkpoint = SyncCheckpoint(
+                'collections',
+                options['baseurl'],
+                restart=options['restart'],
+                incremental=options['incremental'],
+            )
+
         counter = 0
         processed_namespaces = set()
         for namespace_info, collection_info, collection_versions in upstream_collection_iterator(
@@ -66,6 +90,7 @@ class Command(BaseCommand):
             collection_namespace=options['namespace'],
             collection_name=options['name'],
             limit=options['limit'],
+            checkpoint=checkpoint,
         ):
             counter += 1  # noqa: SIM113
             logger.info(
@@ -2,6 +2,7 @@ import django_guid
 from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand
 
+from galaxy_ng.app.utils.galaxy import SyncCheckpoint
 from galaxy_ng.app.utils.galaxy import upstream_namespace_iterator
 from galaxy_ng.app.utils.galaxy import find_namespace
 from galaxy_ng.app.utils.legacy import process_namespace
@@ -17,6 +18,9 @@ User = get_user_model()
 class Command(BaseCommand):
     """
     Iterates through every upstream namespace and syncs it.
+
+    A sync of all the namespaces resumes where the previous one was
+    interrupted, or stopped by --limit, unless --restart or --start_page is given.
     """
 
     help = 'Sync upstream namespaces+owners from [old-]galaxy.ansible.com'
@@ -28,6 +32,16 @@ class Command(BaseCommand):
         parser.add_argument("--force", action="store_true")
         parser.add_argument("--limit", type=int)
         parser.add_argument("--start_page", type=int)
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="ignore the progress saved by an interrupted sync",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="only sync namespaces modified upstream since the last complete sync",
+        )
 
     def echo(self, message, style=None):
         style = style or self.style.SUCCESS
@@ -47,11 +61,21 @@ class Command(BaseCommand):
 
         else:
 
+            checkpoint = None
+            if not options['start_page']:
+                checkpoint = SyncCheckpoint(
+                    'namespaces',
+                    options['baseurl'],
+                    restart=options['restart'],
+                    incremental=options['incremental'],
+                )
+
             count = 0
             for total, namespace_info in upstream_namespace_iterator(
                 baseurl=options['baseurl'],
                 start_page=options['start_page'],
                 limit=options['limit'],
+                checkpoint=checkpoint,
             ):
 
                 count += 1  # noqa: SIM113
@@ -10,6 +10,9 @@ django_guid.set_guid(django_guid.utils.generate_guid())
 class Command(BaseCommand):
     """
     Iterates through api/v1/roles and sync all roles found.
+
+    A sync of all the roles resumes where the previous one was interrupted,
+    or stopped by --limit, unless --restart is given.
     """
 
     help = 'Sync upstream roles from [old-]galaxy.ansible.com'
@@ -20,6 +23,26 @@ class Command(BaseCommand):
         parser.add_argument("--role_name", help="find and sync only this role name")
         parser.add_argument("--limit", type=int)
         parser.add_argument("--start_page", type=int)
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            help="number of parallel requests to the upstream",
+        )
+        parser.add_argument(
+            "--batch_size",
+            type=int,
+            help="number of roles written to the database at once",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="ignore the progress saved by an interrupted sync",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="only sync roles modified upstream since the last complete sync",
+        )
 
     def echo(self, message, style=None):
         style = style or self.style.SUCCESS
@@ -34,4 +57,8 @@ class Command(BaseCommand):
             role_name=options['role_name'],
             limit=options['limit'],
             start_page=options['start_page'],
+            concurrency=options['concurrency'],
+            batch_size=options['batch_size'],
+            restart=options['restart'],
+            incremental=options['incremental'],
         )
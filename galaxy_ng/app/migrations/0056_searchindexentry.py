@@ -0,0 +1,156 @@
+# Generated by Django 4.2.17 on 2026-10-18 10:12
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+POPULATE_SEARCH_INDEX = """
+INSERT INTO galaxy_searchindexentry (
+    content_type, namespace_name, name, description_text, latest_version,
+    namespace_avatar, content_list, tag_names, platform_names, deprecated,
+    download_count, last_updated, search_vector, collection_id, role_id
+)
+SELECT
+    'collection',
+    cv.namespace,
+    cv.name,
+    COALESCE(cv.description, ''),
+    cv.version,
+    ns._avatar_url,
+    cv.contents,
+    COALESCE((
+        SELECT jsonb_agg(t.name)
+        FROM ansible_collectionversion_tags cvt
+        INNER JOIN ansible_tag t ON t.pulp_id = cvt.tag_id
+        WHERE cvt.collectionversion_id = cv.content_ptr_id
+    ), '[]'::jsonb),
+    '[]'::jsonb,
+    EXISTS(
+        SELECT 1 FROM ansible_ansiblecollectiondeprecated d
+        WHERE d.namespace = cv.namespace AND d.name = cv.name
+    ),
+    COALESCE((
+        SELECT dc.download_count FROM ansible_collectiondownloadcount dc
+        WHERE dc.namespace = cv.namespace AND dc.name = cv.name
+        LIMIT 1
+    ), 0),
+    c.timestamp_of_interest,
+    cv.search_vector,
+    cv.collection_id,
+    NULL
+FROM ansible_collectionversion cv
+INNER JOIN core_content c ON c.pulp_id = cv.content_ptr_id
+LEFT OUTER JOIN galaxy_namespace ns ON ns.name = cv.namespace
+WHERE cv.is_highest
+ON CONFLICT DO NOTHING;
+
+INSERT INTO galaxy_searchindexentry (
+    content_type, namespace_name, name, description_text, latest_version,
+    namespace_avatar, content_list, tag_names, platform_names, deprecated,
+    download_count, last_updated, search_vector, collection_id, role_id
+)
+SELECT
+    'role',
+    lns.name,
+    r.name,
+    COALESCE(r.full_metadata->>'description', ''),
+    r.full_metadata->'versions'->-1->>'version',
+    ns._avatar_url,
+    '[]'::jsonb,
+    COALESCE(r.full_metadata->'tags', '[]'::jsonb),
+    COALESCE(r.full_metadata->'platforms', '[]'::jsonb),
+    false,
+    COALESCE(dc.count, 0),
+    r.created,
+    COALESCE(sv.search_vector, ''::tsvector),
+    NULL,
+    r.id
+FROM galaxy_legacyrole r
+INNER JOIN galaxy_legacynamespace lns ON lns.id = r.namespace_id
+LEFT OUTER JOIN galaxy_namespace ns ON ns.id = lns.namespace_id
+LEFT OUTER JOIN galaxy_legacyroledownloadcount dc ON dc.legacyrole_id = r.id
+LEFT OUTER JOIN galaxy_legacyrolesearchvector sv ON sv.role_id = r.id
+ON CONFLICT DO NOTHING;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ansible", "0055_alter_collectionversion_version_alter_role_version"),
+        ("galaxy", "0055_remove_organization_users_remove_team_users"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchIndexEntry",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "content_type",
+                    models.CharField(
+                        choices=[("collection", "Collection"), ("role", "Role")], max_length=16
+                    ),
+                ),
+                ("namespace_name", models.CharField(max_length=64)),
+                ("name", models.CharField(max_length=64)),
+                ("description_text", models.TextField(blank=True, default="")),
+                ("latest_version", models.CharField(max_length=128, null=True)),
+                ("namespace_avatar", models.CharField(max_length=256, null=True)),
+                ("content_list", models.JSONField(default=list)),
+                ("tag_names", models.JSONField(default=list)),
+                ("platform_names", models.JSONField(default=list)),
+                ("deprecated", models.BooleanField(default=False)),
+                ("download_count", models.BigIntegerField(default=0)),
+                ("last_updated", models.DateTimeField(null=True)),
+                ("search_vector", django.contrib.postgres.search.SearchVectorField(default="")),
+                (
+                    "collection",
+                    models.OneToOneField(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="ansible.collection",
+                    ),
+                ),
+                (
+                    "role",
+                    models.OneToOneField(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="galaxy.legacyrole",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    django.contrib.postgres.indexes.GinIndex(
+                        fields=["search_vector"], name="galaxy_searchindex_sv_gin"
+                    ),
+                    models.Index(
+                        fields=["-download_count", "-last_updated"],
+                        name="galaxy_searchindex_dl_idx",
+                    ),
+                    models.Index(
+                        fields=["content_type", "-download_count", "-last_updated"],
+                        name="galaxy_searchindex_type_dl_idx",
+                    ),
+                    models.Index(fields=["-last_updated"], name="galaxy_searchindex_lu_idx"),
+                    models.Index(fields=["name"], name="galaxy_searchindex_name_idx"),
+                    models.Index(fields=["namespace_name"], name="galaxy_searchindex_ns_idx"),
+                ],
+            },
+        ),
+        migrations.RunSQL(
+            sql=POPULATE_SEARCH_INDEX,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
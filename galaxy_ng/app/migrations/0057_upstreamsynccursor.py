@@ -0,0 +1,45 @@
+# Generated by Django 4.2.17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("galaxy", "0056_searchindexentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UpstreamSyncCursor",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[
+                            ("roles", "Roles"),
+                            ("collections", "Collections"),
+                            ("namespaces", "Namespaces"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                ("baseurl", models.CharField(max_length=255)),
+                ("page_url", models.TextField(null=True)),
+                ("page_number", models.IntegerField(default=0)),
+                ("completed_ids", models.JSONField(default=list)),
+                ("run_started_at", models.DateTimeField(null=True)),
+                ("last_success_at", models.DateTimeField(null=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "unique_together": {("source", "baseurl")},
+            },
+        ),
+    ]
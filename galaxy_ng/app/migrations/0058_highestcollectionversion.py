@@ -0,0 +1,60 @@
+# Generated by Django 4.2.17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0117_task_unblocked_at"),
+        ("ansible", "0055_alter_collectionversion_version_alter_role_version"),
+        ("galaxy", "0057_upstreamsynccursor"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HighestCollectionVersion",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "collection",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="ansible.collection",
+                    ),
+                ),
+                (
+                    "collection_version",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="galaxy_highest_versions",
+                        to="ansible.collectionversion",
+                    ),
+                ),
+                (
+                    "repository_version",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="core.repositoryversion",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("repository_version", "collection")},
+                "indexes": [
+                    models.Index(
+                        fields=["repository_version", "collection_version"],
+                        name="galaxy_highestcv_rv_cv_idx",
+                    )
+                ],
+            },
+        ),
+    ]
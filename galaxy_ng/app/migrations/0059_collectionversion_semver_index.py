@@ -0,0 +1,31 @@
+# Generated by Django 4.2.17
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Index the version numbers of the collection versions, so the version_range
+    filter of _ui/v1/collection-versions/ is an index range scan.
+
+    The index is built concurrently so that ansible_collectionversion stays
+    writable meanwhile, which cannot happen inside a transaction.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ("ansible", "0055_alter_collectionversion_version_alter_role_version"),
+        ("galaxy", "0058_highestcollectionversion"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS galaxy_cv_semver_idx "
+                "ON ansible_collectionversion "
+                "(namespace, name, version_major, version_minor, version_patch)"
+            ),
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS galaxy_cv_semver_idx",
+        ),
+    ]
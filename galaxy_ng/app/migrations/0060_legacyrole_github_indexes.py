@@ -0,0 +1,66 @@
+# Generated by Django 4.2.17 on 2026-10-18 14:02
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.fields.json
+
+
+BATCH_SIZE = 1000
+
+
+def copy_import_github_fields(apps, schema_editor):
+    """Copy github_user and github_repo from the kwargs of the import tasks."""
+    LegacyRoleImport = apps.get_model("galaxy", "LegacyRoleImport")
+
+    batch = []
+    for role_import in LegacyRoleImport.objects.select_related("task").iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        kwargs = role_import.task.enc_kwargs or {}
+        role_import.github_user = kwargs.get("github_user")
+        role_import.github_repo = kwargs.get("github_repo")
+        batch.append(role_import)
+        if len(batch) >= BATCH_SIZE:
+            LegacyRoleImport.objects.bulk_update(batch, ["github_user", "github_repo"])
+            batch = []
+    LegacyRoleImport.objects.bulk_update(batch, ["github_user", "github_repo"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0117_task_unblocked_at"),
+        ("galaxy", "0059_collectionversion_semver_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="legacyrole",
+            index=models.Index(
+                django.db.models.fields.json.KeyTransform("github_repo", "full_metadata"),
+                django.db.models.fields.json.KeyTransform("github_user", "full_metadata"),
+                name="galaxy_legacyrole_github_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="legacyrole",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.db.models.fields.json.KeyTransform("tags", "full_metadata"),
+                name="galaxy_legacyrole_tags_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="legacyroleimport",
+            name="github_repo",
+            field=models.CharField(db_index=True, editable=False, max_length=256, null=True),
+        ),
+        migrations.AddField(
+            model_name="legacyroleimport",
+            name="github_user",
+            field=models.CharField(db_index=True, editable=False, max_length=256, null=True),
+        ),
+        migrations.RunPython(
+            code=copy_import_github_fields,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.17 on 2026-10-18 15:20
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("galaxy", "0060_legacyrole_github_indexes"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="legacynamespace",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"], name="galaxy_legacyns_name_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="legacyrole",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"], name="galaxy_legacyrole_name_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+    ]
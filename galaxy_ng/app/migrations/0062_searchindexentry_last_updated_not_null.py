@@ -0,0 +1,26 @@
+# Generated by Django 4.2.17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    last_updated is always filled from timestamp_of_interest or created, make
+    it non null so it can be used as a cursor pagination key.
+    """
+
+    dependencies = [
+        ("galaxy", "0061_legacyrole_name_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="UPDATE galaxy_searchindexentry SET last_updated = now() WHERE last_updated IS NULL",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name="searchindexentry",
+            name="last_updated",
+            field=models.DateTimeField(),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.17
+
+import django.contrib.postgres.indexes
+import django.db.models.fields.json
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("galaxy", "0062_searchindexentry_last_updated_not_null"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="legacyrole",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.fields.json.KT("full_metadata__description"),
+                    name="gin_trgm_ops",
+                ),
+                name="galaxy_legacyrole_desc_trgm",
+            ),
+        ),
+    ]
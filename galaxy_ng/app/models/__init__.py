@@ -2,6 +2,7 @@ from .aiindex import AIIndexDenyList
 from .auth import Group, User
 from .collectionimport import CollectionImport
 from .config import Setting
+from .highest_version import HighestCollectionVersion
 from .container import (
     ContainerDistribution,
     ContainerDistroReadme,
@@ -11,6 +12,8 @@ from .container import (
 )
 from .namespace import Namespace, NamespaceLink
 from .organization import Organization, Team
+from .search import SearchIndexEntry
+from .sync_cursor import UpstreamSyncCursor
 from .synclist import SyncList
 
 from pulp_ansible.app.models import (
@@ -34,16 +37,22 @@ __all__ = (
     "ContainerRegistryRepos",
     # auth
     "Group",
+    # highest_version
+    "HighestCollectionVersion",
     # namespace
     "Namespace",
     "NamespaceLink",
     # organization
     "Organization",
+    # search
+    "SearchIndexEntry",
     # config
     "Setting",
     # synclist
     "SyncList",
     "Team",
+    # sync_cursor
+    "UpstreamSyncCursor",
     "User",
 )
 
@@ -156,9 +156,10 @@ class Setting(LifecycleModelMixin, models.Model):
 
     @classmethod
     def update_cache(cls):
-        from galaxy_ng.app.tasks.settings_cache import update_setting_cache  # noqa
+        from galaxy_ng.app.tasks.settings_cache import settings_snapshot, update_setting_cache  # noqa
 
         update_setting_cache(cls.as_dict())
+        settings_snapshot.invalidate()
 
     @hook(AFTER_CREATE, on_commit=True)
     def _hook_update_create(self):
@@ -0,0 +1,45 @@
+from django.db import models
+
+from pulp_ansible.app.models import Collection, CollectionVersion
+from pulpcore.plugin.models import RepositoryVersion
+
+__all__ = ("HighestCollectionVersion",)
+
+
+class HighestCollectionVersion(models.Model):
+    """
+    The highest version of each collection in a repository version.
+
+    The `_ui/v1/repo/<distro>/` collection listing joins this table instead of
+    comparing every version of the distribution in python on each request.
+
+    Rows are added by the signal handlers in `galaxy_ng.app.signals.handlers`
+    when a repository version is completed, and removed with the repository
+    version. The `rebuild-highest-versions` management command fills the
+    table for the repository versions served by a distribution.
+
+    Fields:
+        repository_version: The repository version the collection is in.
+        collection: The collection.
+        collection_version: The highest version of the collection, by semver.
+    """
+
+    repository_version = models.ForeignKey(
+        RepositoryVersion, on_delete=models.CASCADE, related_name="+"
+    )
+    collection = models.ForeignKey(Collection, on_delete=models.CASCADE, related_name="+")
+    collection_version = models.ForeignKey(
+        CollectionVersion, on_delete=models.CASCADE, related_name="galaxy_highest_versions"
+    )
+
+    class Meta:
+        unique_together = ("repository_version", "collection")
+        indexes = [
+            models.Index(
+                fields=["repository_version", "collection_version"],
+                name="galaxy_highestcv_rv_cv_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.collection_version} in {self.repository_version}"
@@ -0,0 +1,97 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+
+from pulp_ansible.app.models import Collection
+
+__all__ = ("SearchIndexEntry",)
+
+CONTENT_TYPES = (
+    ("collection", "Collection"),
+    ("role", "Role"),
+)
+
+
+class SearchIndexEntry(models.Model):
+    """
+    A denormalized row backing the `_ui/v1/search/` endpoint.
+
+    There is one entry per collection (built from its highest version) and one
+    entry per legacy role. Each row already holds every value the search
+    serializer renders, so the search view can filter, rank and sort on a
+    single indexed table instead of building a UNION ALL of two annotated
+    querysets on every request.
+
+    Entries are maintained by the signal handlers in
+    `galaxy_ng.app.signals.handlers` and can be rebuilt from scratch with the
+    `rebuild-search-index` management command.
+
+    Fields:
+        content_type: Either "collection" or "role".
+        namespace_name: Collection namespace or legacy role namespace name.
+        name: Collection or role name.
+        description_text: Description of the highest version or the role.
+        latest_version: Highest collection version or latest role version.
+        namespace_avatar: Avatar url of the (v3) namespace.
+        content_list: Contents of the highest collection version.
+        tag_names: List of tag names.
+        platform_names: List of platforms (roles only).
+        deprecated: Collection deprecation flag (always False for roles).
+        download_count: Number of downloads.
+        last_updated: Timestamp of interest for collections, created for roles.
+        search_vector: Copy of the collection version or role search vector.
+
+    Relations:
+        collection: The indexed collection (collection entries only).
+        role: The indexed legacy role (role entries only).
+    """
+
+    content_type = models.CharField(max_length=16, choices=CONTENT_TYPES)
+
+    namespace_name = models.CharField(max_length=64)
+    name = models.CharField(max_length=64)
+    description_text = models.TextField(default="", blank=True)
+    latest_version = models.CharField(max_length=128, null=True)
+    namespace_avatar = models.CharField(max_length=256, null=True)
+
+    content_list = models.JSONField(default=list)
+    tag_names = models.JSONField(default=list)
+    platform_names = models.JSONField(default=list)
+
+    deprecated = models.BooleanField(default=False)
+    download_count = models.BigIntegerField(default=0)
+    last_updated = models.DateTimeField()
+
+    search_vector = SearchVectorField(default="")
+
+    collection = models.OneToOneField(
+        Collection,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    role = models.OneToOneField(
+        "galaxy.LegacyRole",
+        null=True,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+
+    def __str__(self):
+        return f"{self.content_type}: {self.namespace_name}.{self.name}"
+
+    class Meta:
+        indexes = (
+            GinIndex(fields=["search_vector"], name="galaxy_searchindex_sv_gin"),
+            models.Index(
+                fields=["-download_count", "-last_updated"],
+                name="galaxy_searchindex_dl_idx",
+            ),
+            models.Index(
+                fields=["content_type", "-download_count", "-last_updated"],
+                name="galaxy_searchindex_type_dl_idx",
+            ),
+            models.Index(fields=["-last_updated"], name="galaxy_searchindex_lu_idx"),
+            models.Index(fields=["name"], name="galaxy_searchindex_name_idx"),
+            models.Index(fields=["namespace_name"], name="galaxy_searchindex_ns_idx"),
+        )
@@ -0,0 +1,44 @@
+from django.db import models
+
+__all__ = ("UpstreamSyncCursor",)
+
+SOURCES = (
+    ("roles", "Roles"),
+    ("collections", "Collections"),
+    ("namespaces", "Namespaces"),
+)
+
+
+class UpstreamSyncCursor(models.Model):
+    """
+    Progress of a sync from an upstream galaxy.
+
+    The upstream iterators in `galaxy_ng.app.utils.galaxy` record the listing
+    page being processed and the upstream ids already handled on that page, so
+    an interrupted sync resumes where it stopped instead of starting over.
+
+    Fields:
+        source: What is synced, one of "roles", "collections" or "namespaces".
+        baseurl: The scheme and host of the upstream.
+        page_url: The listing page to resume from, null once a run completed.
+        page_number: The number of pages completed by the current run.
+        completed_ids: The upstream ids already processed on `page_url`.
+        run_started_at: When the current run started.
+        last_success_at: When the last complete run started, anything modified
+            upstream after it is fetched by an incremental sync.
+    """
+
+    source = models.CharField(choices=SOURCES, max_length=32)
+    baseurl = models.CharField(max_length=255)
+    page_url = models.TextField(null=True)
+    page_number = models.IntegerField(default=0)
+    completed_ids = models.JSONField(default=list)
+    run_started_at = models.DateTimeField(null=True)
+    last_success_at = models.DateTimeField(null=True)
+    modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("source", "baseurl")
+
+    def __str__(self):
+        return f"{self.source} from {self.baseurl}"
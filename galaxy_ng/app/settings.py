@@ -152,6 +152,12 @@ GALAXY_API_REJECTED_DISTRIBUTION_BASE_PATH = "rejected"
 # associated distribution name, and distribution base_path
 GALAXY_API_SYNCLIST_NAME_FORMAT = "{account_name}-synclist"
 
+# Seconds a provisioned X-RH-IDENTITY user is cached, 0 provisions on every request
+GALAXY_RH_IDENTITY_CACHE_TIMEOUT = 300
+
+# Seconds the console landing page payload is cached in Redis, 0 disables the cache
+GALAXY_LANDING_PAGE_CACHE_TIMEOUT = 60
+
 # Require approval for incoming content, which uses a staging repository
 GALAXY_REQUIRE_CONTENT_APPROVAL = True
 
@@ -217,6 +223,11 @@ AUTH_PASSWORD_VALIDATORS = [
 X_PULP_CONTENT_HOST = "localhost"
 X_PULP_CONTENT_PORT = 24816
 
+# Insights mode collection downloads: internal nginx location proxying to the content
+# app (see webserver_snippets/nginx.conf), when unset the API worker streams the artifact
+GALAXY_DOWNLOAD_ACCEL_REDIRECT_LOCATION = None
+GALAXY_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
 # Example setting of CONTENT_BIND if unix sockets are used
 # CONTENT_BIND = "unix:/var/run/pulpcore-content/pulpcore-content.sock"
 
@@ -356,6 +367,16 @@ AUTHENTICATION_BACKEND_PRESETS_DATA = {
 # Enable the api/$PREFIX/v1 api for legacy roles.
 GALAXY_ENABLE_LEGACY_ROLES = False
 
+# When set to True (and redis is configured) role and collection download counts
+# are buffered in redis and written to the database by the task
+# galaxy_ng.app.tasks.download_counts.flush_download_counts, which the container
+# entrypoints schedule with the `task-scheduler` command when this is enabled.
+GALAXY_BUFFER_DOWNLOAD_COUNTS = False
+
+# Seconds the owners of v3 namespaces listed by api/v1/namespaces/ are cached
+# in redis. 0 disables the cache.
+GALAXY_NAMESPACE_OWNERS_CACHE_TTL = 0
+
 SOCIAL_AUTH_GITHUB_BASE_URL = os.environ.get('SOCIAL_AUTH_GITHUB_BASE_URL', 'https://github.com')
 SOCIAL_AUTH_GITHUB_API_URL = os.environ.get('SOCIAL_AUTH_GITHUB_API_URL', 'https://api.github.com')
 SOCIAL_AUTH_GITHUB_KEY = os.environ.get('SOCIAL_AUTH_GITHUB_KEY')
@@ -388,6 +409,9 @@ GALAXY_METRICS_COLLECTION_ORG_ID = None
 # When set to True will enable the DYNAMIC settings feature
 # Individual allowed dynamic keys are set on ./dynamic_settings.py
 GALAXY_DYNAMIC_SETTINGS = False
+# Seconds between checks of the dynamic settings generation outside of requests,
+# within a request the generation is checked once.
+GALAXY_DYNAMIC_SETTINGS_CHECK_INTERVAL = 1.0
 
 # DJANGO ANSIBLE BASE RESOURCES REGISTRY SETTINGS
 ANSIBLE_BASE_RESOURCE_CONFIG_MODULE = "galaxy_ng.app.api.resource_api"
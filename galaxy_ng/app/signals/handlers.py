@@ -12,6 +12,7 @@ from django.dispatch import receiver
 from django.db.models.signals import post_save
 from django.db.models.signals import post_delete
 from django.db.models.signals import m2m_changed
+from django.db import transaction
 from django.db.models import CharField, Value
 from django.db.models.functions import Concat
 from django.contrib.contenttypes.models import ContentType
@@ -20,14 +21,23 @@ from django.conf import settings
 from rest_framework.exceptions import ValidationError
 from django.apps import apps
 from pulp_ansible.app.models import (
+    AnsibleCollectionDeprecated,
     AnsibleDistribution,
     AnsibleRepository,
     Collection,
+    CollectionDownloadCount,
+    CollectionVersion,
     AnsibleNamespaceMetadata,
 )
+from galaxy_ng.app.api.v1.models import LegacyNamespace, LegacyRole, LegacyRoleDownloadCount
 from galaxy_ng.app.models import Namespace, User, Team
+from galaxy_ng.app.utils import highest_versions, search_index
+from galaxy_ng.app.utils.rbac import (
+    invalidate_groups_v3_namespace_owners,
+    invalidate_v3_namespaces_owners,
+)
 from galaxy_ng.app.migrations._dab_rbac import copy_roles_to_role_definitions
-from pulpcore.plugin.models import ContentRedirectContentGuard
+from pulpcore.plugin.models import ContentRedirectContentGuard, RepositoryVersion
 
 from ansible_base.rbac.validators import validate_permissions_for_model
 from ansible_base.rbac.models import (
@@ -116,6 +126,129 @@ def associate_namespace_metadata(sender, instance, created, **kwargs):
         _update_metadata()
 
 
+# ___ SEARCH INDEX ___
+# Keep the SearchIndexEntry rows backing _ui/v1/search/ in sync with their sources.
+# Collection entries are refreshed after commit so the tags added after the
+# CollectionVersion is saved are part of the entry, once per collection and
+# transaction.
+
+
+@receiver(post_save, sender=CollectionVersion)
+@receiver(post_delete, sender=CollectionVersion)
+def update_collection_search_index(sender, instance, **kwargs):
+    search_index.update_collection_entry_on_commit(instance.namespace, instance.name)
+
+
+def update_collection_search_index_tags(instance, action, reverse, **kwargs):
+    if reverse or not action.startswith("post_"):
+        return
+    update_collection_search_index(CollectionVersion, instance)
+
+
+m2m_changed.connect(
+    update_collection_search_index_tags, sender=CollectionVersion.tags.through
+)
+
+
+@receiver(post_save, sender=AnsibleCollectionDeprecated)
+@receiver(post_delete, sender=AnsibleCollectionDeprecated)
+def update_collection_search_index_deprecation(sender, instance, **kwargs):
+    search_index.update_collection_deprecation(instance.namespace, instance.name)
+
+
+@receiver(post_save, sender=CollectionDownloadCount)
+def update_collection_search_index_download_count(sender, instance, **kwargs):
+    search_index.update_collection_download_count(instance.namespace, instance.name)
+
+
+@receiver(post_save, sender=LegacyRole)
+def update_role_search_index(sender, instance, **kwargs):
+    search_index.update_role_entries([instance.pk])
+
+
+@receiver(post_save, sender=LegacyRoleDownloadCount)
+def update_role_search_index_download_count(sender, instance, **kwargs):
+    search_index.update_role_download_count(instance.legacyrole_id)
+
+
+@receiver(post_save, sender=LegacyNamespace)
+def update_legacy_namespace_search_index(sender, instance, created, **kwargs):
+    if created:
+        return
+    search_index.update_role_entries(instance.roles.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Namespace)
+def update_namespace_search_index(sender, instance, **kwargs):
+    search_index.update_namespace_avatar(instance)
+
+
+# ___ HIGHEST COLLECTION VERSIONS ___
+# Index the highest version of each collection when a repository version is
+# completed, see galaxy_ng.app.utils.highest_versions.
+
+
+@receiver(post_save, sender=RepositoryVersion)
+def update_highest_collection_versions(sender, instance, **kwargs):
+    if not instance.complete or not highest_versions.is_ansible_repository_version(instance):
+        return
+
+    def update():
+        # the version may be gone when a later step of the task failed
+        if RepositoryVersion.objects.filter(pk=instance.pk).exists():
+            highest_versions.update_repository_version(instance)
+
+    transaction.on_commit(update)
+
+
+# ___ LANDING PAGE CACHE ___
+# Drop the cached landing page counts, see
+# galaxy_ng.app.api.ui.v1.views.landing_page.LandingPageView.
+
+
+@receiver(post_save, sender=RepositoryVersion)
+def invalidate_landing_page_collections(sender, instance, **kwargs):
+    if not instance.complete:
+        return
+    from galaxy_ng.app.api.ui.v1.views.landing_page import invalidate_landing_page_cache
+    transaction.on_commit(invalidate_landing_page_cache)
+
+
+@receiver(post_save, sender=Namespace)
+@receiver(post_delete, sender=Namespace)
+def invalidate_landing_page_partners(sender, instance, **kwargs):
+    from galaxy_ng.app.api.ui.v1.views.landing_page import invalidate_landing_page_cache
+    transaction.on_commit(invalidate_landing_page_cache)
+
+
+# ___ NAMESPACE OWNERS CACHE ___
+# Drop the cached owners of v3 namespaces, see
+# galaxy_ng.app.utils.rbac.get_v3_namespaces_owners.
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+@receiver(post_save, sender=GroupRole)
+@receiver(post_delete, sender=GroupRole)
+def invalidate_namespace_owners_of_role(sender, instance, **kwargs):
+    ctype = ContentType.objects.get_for_model(Namespace, for_concrete_model=False)
+    if instance.object_id and instance.content_type_id == ctype.pk:
+        invalidate_v3_namespaces_owners([instance.object_id])
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_namespace_owners_of_members(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if reverse:
+        group_pks = [instance.pk]
+    elif action == "pre_clear":
+        group_pks = instance.groups.values_list("pk", flat=True)
+    else:
+        group_pks = pk_set
+    invalidate_groups_v3_namespace_owners(group_pks)
+
+
 # ___ DAB RBAC ___
 
 TEAM_MEMBER_ROLE = 'Galaxy Team Member'
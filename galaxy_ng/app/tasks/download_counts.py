@@ -0,0 +1,178 @@
+"""
+Write-behind download counters for legacy roles and collections.
+
+When GALAXY_BUFFER_DOWNLOAD_COUNTS is enabled and a redis connection is
+configured, each download is a single HINCRBY on a redis hash instead of a
+locked row update in the database. The `flush_download_counts` task, scheduled
+with the `task-scheduler` command by the container entrypoints when the setting
+is enabled, moves the buffered increments to the database with one upsert
+statement per batch.
+
+Without redis (or when redis is unreachable) the counters are written
+directly to the database as before.
+
+Download counts are an approximate popularity signal, a crashed flush may
+apply a batch twice (see `_flush_key`).
+"""
+import logging
+import uuid
+
+import redis
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.utils import InternalError as DatabaseInternalError
+from pulp_ansible.app.galaxy.v3 import views as pulp_ansible_views
+
+from galaxy_ng.app.api.v1.models import LegacyRoleDownloadCount
+from galaxy_ng.app.tasks import settings_cache
+from galaxy_ng.app.utils import search_index
+
+logger = logging.getLogger(__name__)
+
+ROLE_COUNTS_KEY = "GALAXY_ROLE_DOWNLOAD_COUNTS"
+COLLECTION_COUNTS_KEY = "GALAXY_COLLECTION_DOWNLOAD_COUNTS"
+FLUSH_LOCK_NAME = "download_counts_flush"
+DEFAULT_BATCH_SIZE = 1000
+
+UPSERT_ROLE_COUNTS = """
+INSERT INTO galaxy_legacyroledownloadcount (legacyrole_id, count)
+SELECT v.legacyrole_id, v.count
+FROM (VALUES {values}) AS v (legacyrole_id, count)
+INNER JOIN galaxy_legacyrole r ON r.id = v.legacyrole_id
+ON CONFLICT (legacyrole_id) DO UPDATE
+SET count = galaxy_legacyroledownloadcount.count + EXCLUDED.count
+"""
+
+UPSERT_COLLECTION_COUNTS = """
+INSERT INTO ansible_collectiondownloadcount
+    (pulp_id, pulp_created, pulp_last_updated, namespace, name, download_count)
+SELECT v.pulp_id, now(), now(), v.namespace, v.name, v.count
+FROM (VALUES {values}) AS v (pulp_id, namespace, name, count)
+ON CONFLICT (namespace, name) DO UPDATE
+SET download_count = ansible_collectiondownloadcount.download_count + EXCLUDED.download_count,
+    pulp_last_updated = now()
+"""
+
+
+def _buffering_enabled():
+    return settings.get("GALAXY_BUFFER_DOWNLOAD_COUNTS", False) and settings_cache.conn is not None
+
+
+@settings_cache.connection_error_wrapper(default=lambda: False)
+def _increment(key, field):
+    settings_cache.conn.hincrby(key, field, 1)
+    return True
+
+
+def _buffer_increment(key, field):
+    """Returns True when the increment was buffered in redis."""
+    return _buffering_enabled() and _increment(key, field)
+
+
+def write_role_download_count(role):
+    """Increment the role counter directly in the database."""
+    with transaction.atomic():
+        try:
+            # attempt to get or create the counter first
+            counter, _ = LegacyRoleDownloadCount.objects.get_or_create(legacyrole=role)
+
+            # now lock the row so that we avoid race conditions
+            counter = LegacyRoleDownloadCount.objects.select_for_update().get(pk=counter.pk)
+
+            # increment and save
+            counter.count += 1
+            counter.save()
+        except DatabaseInternalError as e:
+            # Fail gracefully if the database is in read-only mode.
+            if "read-only" not in str(e):
+                raise e
+
+
+def count_role_download(role):
+    if not _buffer_increment(ROLE_COUNTS_KEY, role.pk):
+        write_role_download_count(role)
+
+
+def count_collection_download(filename):
+    ns, name, _ = filename.split("-", maxsplit=2)
+    if not _buffer_increment(COLLECTION_COUNTS_KEY, f"{ns}.{name}"):
+        pulp_ansible_views.CollectionArtifactDownloadView.count_download(filename)
+
+
+def _upsert_role_counts(items):
+    values = ", ".join(["(%s::integer, %s::bigint)"] * len(items))
+    params = []
+    for role_id, count in items:
+        params.extend([int(role_id), int(count)])
+    with connection.cursor() as cursor:
+        cursor.execute(UPSERT_ROLE_COUNTS.format(values=values), params)
+    search_index.update_role_download_counts([int(role_id) for role_id, _ in items])
+
+
+def _upsert_collection_counts(items):
+    values = ", ".join(["(%s::uuid, %s, %s, %s::bigint)"] * len(items))
+    params = []
+    keys = []
+    for key, count in items:
+        namespace, name = key.split(".", maxsplit=1)
+        keys.append((namespace, name))
+        params.extend([str(uuid.uuid4()), namespace, name, int(count)])
+    with connection.cursor() as cursor:
+        cursor.execute(UPSERT_COLLECTION_COUNTS.format(values=values), params)
+    search_index.update_collection_download_counts(keys)
+
+
+def _flush_key(key, upsert, batch_size):
+    """Move the counters of one redis hash to the database.
+
+    The hash is renamed first so new increments go to a fresh hash while the
+    renamed one is processed. Fields are removed from the processing hash only
+    after their batch is committed, so an interrupted flush is resumed by the
+    next run without losing increments.
+
+    Delivery is at-least-once: if the process dies after a batch is committed
+    but before its fields are removed from redis, the next run applies that
+    batch again and the counters are over counted by it.
+    """
+    conn = settings_cache.conn
+    processing_key = f"{key}:flushing"
+    if not conn.exists(processing_key):
+        try:
+            conn.rename(key, processing_key)
+        except redis.ResponseError:
+            # nothing was buffered since the last flush
+            return 0
+
+    items = list(conn.hgetall(processing_key).items())
+    flushed = 0
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        with transaction.atomic():
+            upsert(batch)
+        conn.hdel(processing_key, *[field for field, _ in batch])
+        flushed += len(batch)
+    conn.delete(processing_key)
+    return flushed
+
+
+def flush_download_counts(batch_size=DEFAULT_BATCH_SIZE):
+    """Write the buffered download counters to the database.
+
+    Schedule it with:
+        django-admin task-scheduler --id flush_download_counts --interval 5 \
+            --path galaxy_ng.app.tasks.download_counts.flush_download_counts
+    """
+    if settings_cache.conn is None:
+        return
+
+    token = settings_cache.acquire_lock(FLUSH_LOCK_NAME, lock_timeout=300)
+    if not token:
+        logger.info("Download counts are being flushed by another process")
+        return
+
+    try:
+        roles = _flush_key(ROLE_COUNTS_KEY, _upsert_role_counts, batch_size)
+        collections = _flush_key(COLLECTION_COUNTS_KEY, _upsert_collection_counts, batch_size)
+        logger.info(f"Flushed download counts of {roles} roles and {collections} collections")
+    finally:
+        settings_cache.release_lock(FLUSH_LOCK_NAME, token)
@@ -2,8 +2,11 @@
 Tasks related to the settings cache management.
 """
 import logging
+import threading
+import time
 import redis
 
+from crum import get_current_request
 from functools import wraps
 from typing import Any, Callable, Optional
 from uuid import uuid4
@@ -16,6 +19,7 @@ from django.db.utils import OperationalError
 logger = logging.getLogger(__name__)
 _conn = None
 CACHE_KEY = "GALAXY_SETTINGS_DATA"
+VERSION_KEY = "GALAXY_SETTINGS_VERSION"
 
 
 def get_redis_connection():
@@ -117,9 +121,19 @@ def update_setting_cache(data: dict[str, Any]) -> int:
     if data:
         updated = conn.hset(CACHE_KEY, mapping=data)
         conn.expire(CACHE_KEY, settings.get("GALAXY_SETTINGS_EXPIRE", 60 * 60 * 24))
+    conn.incr(VERSION_KEY)
     return updated
 
 
+@connection_error_wrapper(default=lambda: None)
+def get_settings_version() -> Optional[str]:
+    """Returns the generation of the settings cache, bumped on every update"""
+    if conn is None:
+        return None
+
+    return conn.get(VERSION_KEY)
+
+
 @connection_error_wrapper(default=dict)
 def get_settings_from_cache() -> dict[str, Any]:
     """Reads settings from Redis cache and returns a python dictionary"""
@@ -137,3 +151,75 @@ def get_settings_from_db():
     except OperationalError as exc:
         logger.error("Could not read settings from database: %s", str(exc))
         return {}
+
+
+class SettingsSnapshot:
+    """Process local copy of the dynamic settings.
+
+    The data is read from the cache (or the database) once per generation of
+    the settings cache and every key is parsed by dynaconf once per generation.
+    The generation is checked at most once per request, and outside of requests
+    at most once every GALAXY_DYNAMIC_SETTINGS_CHECK_INTERVAL seconds. Without
+    Redis there is no generation and the data is reloaded at every check.
+    """
+
+    REQUEST_ATTRIBUTE = "_galaxy_settings_snapshot"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.invalidate()
+
+    def invalidate(self):
+        """Forces a reload on the next access, also within the current request."""
+        with self.lock:
+            self.token = object()
+            self.generation = None
+            self.checked_at = None
+            self.data = {}
+            self.source = None
+            self.values = {}
+
+    def _needs_check(self, now: float) -> bool:
+        request = get_current_request()
+        if request is not None:
+            return getattr(request, self.REQUEST_ATTRIBUTE, None) is not self.token
+        interval = settings.get("GALAXY_DYNAMIC_SETTINGS_CHECK_INTERVAL", 1.0)
+        return self.checked_at is None or now - self.checked_at >= interval
+
+    def refresh(self):
+        """Reloads the data when the generation of the settings cache changed."""
+        now = time.monotonic()
+        if not self._needs_check(now):
+            return
+
+        generation = get_settings_version()
+        with self.lock:
+            if generation is None or generation != self.generation or self.checked_at is None:
+                if data := get_settings_from_cache():
+                    source = "cache"
+                else:
+                    data = get_settings_from_db()
+                    source = "db"
+                self.data, self.source, self.values = data, source, {}
+                self.generation = generation
+            self.checked_at = now
+            if (request := get_current_request()) is not None:
+                setattr(request, self.REQUEST_ATTRIBUTE, self.token)
+
+    def get(self, key: str, default: Any, parse: Callable) -> Any:
+        """Returns the value of key, calling parse(data, source) once per generation.
+
+        default is the value of key in the static settings, the parsed value is
+        recomputed when it changes.
+        """
+        self.refresh()
+        with self.lock:
+            data, source, values = self.data, self.source, self.values
+        if key in values and values[key][0] == default:
+            return values[key][1]
+        value = parse(data, source)
+        values[key] = (default, value)
+        return value
+
+
+settings_snapshot = SettingsSnapshot()
@@ -1,11 +1,34 @@
 import logging
+import random
+import threading
 import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
 
+from galaxy_ng.app.models import UpstreamSyncCursor
+
 
 logger = logging.getLogger(__name__)
 
+# number of role details, versions and namespaces fetched in parallel
+DEFAULT_CONCURRENCY = 8
+
+# open connections allowed per upstream host, across all threads
+MAX_CONNECTIONS_PER_HOST = 8
+
+# retries of 5xx and 429 responses, with an exponential backoff in seconds
+RETRY_ATTEMPTS = 5
+BACKOFF_BASE = 2
+BACKOFF_MAX = 60
+
+_local = threading.local()
+_host_limits = {}
+_host_limits_lock = threading.Lock()
+
 
 def generate_unverified_email(github_id):
     return str(github_id) + '@GALAXY.GITHUB.UNVERIFIED.COM'
@@ -29,25 +52,163 @@ def int_to_uuid(num):
     return uuid
 
 
+def get_session():
+    """Return a keep-alive requests session, one per thread."""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=MAX_CONNECTIONS_PER_HOST)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _local.session = session
+    return session
+
+
+def _host_limit(url):
+    host = urlparse(url).netloc
+    with _host_limits_lock:
+        if host not in _host_limits:
+            _host_limits[host] = threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST)
+        return _host_limits[host]
+
+
+def backoff_delay(attempt):
+    """Exponential backoff with jitter, so parallel retries do not hit the upstream together."""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
 def safe_fetch(url):
     rr = None
-    counter = 0
-    while True:
-        counter += 1
+    for attempt in range(RETRY_ATTEMPTS):
         logger.info(f'fetch {url}')
-        rr = requests.get(url)
-        if rr.status_code < 500:
+        with _host_limit(url):
+            rr = get_session().get(url)
+        if rr.status_code < 500 and rr.status_code != 429:
             return rr
 
-        if counter >= 5:
+        if attempt + 1 >= RETRY_ATTEMPTS:
             return rr
 
-        logger.info(f'ERROR:{rr.status_code} waiting 60s to refetch {url}')
-        time.sleep(60)
+        delay = backoff_delay(attempt)
+        logger.info(f'ERROR:{rr.status_code} waiting {delay:.1f}s to refetch {url}')
+        time.sleep(delay)
 
     return rr
 
 
+def _add_query_param(url, param):
+    return url + ('&' if '?' in url else '?') + param
+
+
+class SyncCheckpoint:
+    """
+    Saves the progress of an upstream iterator in an UpstreamSyncCursor.
+
+    A full run resumes from the listing page and skips the items recorded by
+    the previous, interrupted, run of the same source. An incremental run
+    walks the listing newest first (`order_by=-modified`) and stops at the
+    first page holding only items modified before the last complete run
+    started. It falls back to a full run when no run completed yet or when a
+    full run is still unfinished.
+
+    :param source: One of "roles", "collections" or "namespaces".
+    :param baseurl: The upstream url, only its scheme and host are used.
+    :param restart: Ignore the saved progress and start from the first page.
+    :param incremental: Only fetch what changed since the last complete run.
+    :param on_checkpoint: Called before the progress is saved, consumers
+        buffering their writes must flush them there.
+    :param every: Save the progress every `every` items, and after each page.
+    """
+
+    def __init__(
+        self,
+        source,
+        baseurl,
+        restart=False,
+        incremental=False,
+        on_checkpoint=None,
+        every=1,
+    ):
+        parsed = urlparse(baseurl)
+        self.cursor, _ = UpstreamSyncCursor.objects.get_or_create(
+            source=source,
+            baseurl=parsed.scheme + '://' + parsed.netloc,
+        )
+        self.on_checkpoint = on_checkpoint
+        self.every = every
+        self.items_since_save = 0
+
+        if restart:
+            self.cursor.page_url = None
+        self.incremental = (
+            incremental
+            and self.cursor.last_success_at is not None
+            and self.cursor.page_url is None
+        )
+        self.since = self.cursor.last_success_at if self.incremental else None
+
+        if self.cursor.page_url:
+            logger.info(
+                f'resuming {self.cursor} from {self.cursor.page_url}'
+                + f' ({len(self.cursor.completed_ids)} items already done)'
+            )
+        else:
+            self.cursor.page_number = 0
+            self.cursor.completed_ids = []
+            self.cursor.run_started_at = timezone.now()
+        self.skip_ids = set(self.cursor.completed_ids)
+        self.cursor.save()
+
+    def start_url(self, url):
+        """The url of the first page to fetch, `url` being the first page of a new run."""
+        if self.cursor.page_url:
+            return self.cursor.page_url
+        if self.incremental:
+            return _add_query_param(url, 'order_by=-modified')
+        self.cursor.page_url = url
+        return url
+
+    def skip(self, item):
+        """True when the item was processed already or did not change since the last run."""
+        if item['id'] in self.skip_ids:
+            return True
+        if self.since is None:
+            return False
+        modified = item.get('modified')
+        if modified is None:
+            return False
+        modified = parse_datetime(modified)
+        return modified is not None and modified < self.since
+
+    def item_done(self, item_id):
+        self.cursor.completed_ids.append(item_id)
+        self.items_since_save += 1
+        if self.items_since_save >= self.every:
+            self.save()
+
+    def page_done(self, next_url):
+        if not self.incremental:
+            self.cursor.page_url = next_url
+        self.cursor.page_number += 1
+        self.cursor.completed_ids = []
+        self.skip_ids = set()
+        self.save()
+
+    def finish(self):
+        self.cursor.page_url = None
+        self.cursor.completed_ids = []
+        self.cursor.last_success_at = self.cursor.run_started_at
+        self.save()
+        logger.info(f'{self.cursor} completed after {self.cursor.page_number} pages')
+
+    def save(self):
+        if self.on_checkpoint is not None:
+            self.on_checkpoint()
+        self.items_since_save = 0
+        self.cursor.save()
+
+
 def paginated_results(next_url):
     """Iterate through a paginated query and combine the results."""
     parsed = urlparse(next_url)
@@ -147,13 +308,25 @@ def get_namespace_owners_details(baseurl, ns_id):
     return owners
 
 
+def _is_stale_page(checkpoint, results):
+    """True when an incremental run reached a page where nothing changed since the last run."""
+    if checkpoint is None or not checkpoint.incremental:
+        return False
+    return all(checkpoint.skip(item) for item in results)
+
+
 def upstream_namespace_iterator(
     baseurl=None,
     limit=None,
     start_page=None,
     require_content=True,
+    checkpoint=None,
 ):
-    """Abstracts the pagination of v2 collections into a generator with error handling."""
+    """Abstracts the pagination of v2 collections into a generator with error handling.
+
+    A SyncCheckpoint given as `checkpoint` records the progress of the
+    iteration, it is ignored when `start_page` is set.
+    """
     if baseurl is None or not baseurl:
         baseurl = 'https://old-galaxy.ansible.com/api/v1/namespaces'
     if not baseurl.rstrip().endswith('/api/v1/namespaces'):
@@ -173,6 +346,10 @@ def upstream_namespace_iterator(
     if start_page:
         pagenum = start_page
         next_url = next_url + f'?page={pagenum}'
+        checkpoint = None
+
+    if checkpoint is not None:
+        next_url = checkpoint.start_url(next_url)
 
     while next_url:
         logger.info(f'fetch {pagenum} {next_url}')
@@ -196,6 +373,9 @@ def upstream_namespace_iterator(
             if not ndata['summary_fields']['content_counts'] and require_content:
                 continue
 
+            if checkpoint is not None and checkpoint.skip(ndata):
+                continue
+
             ns_id = ndata['id']
 
             # get the owners too
@@ -205,20 +385,29 @@ def upstream_namespace_iterator(
             namespace_count += 1
             yield total, ndata
 
+            if checkpoint is not None:
+                checkpoint.item_done(ns_id)
+
             # break early if count reached
             if limit is not None and namespace_count >= limit:
                 break
 
         # break early if count reached
         if limit is not None and namespace_count >= limit:
+            if checkpoint is not None:
+                checkpoint.save()
             break
 
         # break if no next page
-        if not ds.get('next_link'):
+        if not ds.get('next_link') or _is_stale_page(checkpoint, ds['results']):
+            if checkpoint is not None:
+                checkpoint.finish()
             break
 
         pagenum += 1
         next_url = _baseurl + ds['next_link']
+        if checkpoint is not None:
+            checkpoint.page_done(next_url)
 
 
 def upstream_collection_iterator(
@@ -228,8 +417,13 @@ def upstream_collection_iterator(
     collection_name=None,
     get_versions=True,
     start_page=None,
+    checkpoint=None,
 ):
-    """Abstracts the pagination of v2 collections into a generator with error handling."""
+    """Abstracts the pagination of v2 collections into a generator with error handling.
+
+    A SyncCheckpoint given as `checkpoint` records the progress of the
+    iteration over all the upstream collections.
+    """
     if baseurl is None or not baseurl:
         baseurl = 'https://old-galaxy.ansible.com/api/v2/collections'
     logger.info(f'upstream_collection_iterator baseurl:{baseurl}')
@@ -342,6 +536,8 @@ def upstream_collection_iterator(
     pagenum = 0
     collection_count = 0
     next_url = _baseurl + '/api/v2/collections/'
+    if checkpoint is not None:
+        next_url = checkpoint.start_url(next_url)
     while next_url:
         logger.info(f'fetch {pagenum} {next_url}')
 
@@ -360,6 +556,9 @@ def upstream_collection_iterator(
 
         for cdata in ds['results']:
 
+            if checkpoint is not None and checkpoint.skip(cdata):
+                continue
+
             # Get the namespace+owners
             ns_id = cdata['namespace']['id']
             if ns_id not in namespace_cache:
@@ -386,20 +585,46 @@ def upstream_collection_iterator(
             collection_count += 1
             yield namespace_data, cdata, collection_versions
 
+            if checkpoint is not None:
+                checkpoint.item_done(cdata['id'])
+
             # break early if count reached
             if limit is not None and collection_count >= limit:
                 break
 
         # break early if count reached
         if limit is not None and collection_count >= limit:
+            if checkpoint is not None:
+                checkpoint.save()
             break
 
         # break if no next page
-        if not ds.get('next_link'):
+        if not ds.get('next_link') or _is_stale_page(checkpoint, ds['results']):
+            if checkpoint is not None:
+                checkpoint.finish()
             break
 
         pagenum += 1
         next_url = _baseurl + ds['next_link']
+        if checkpoint is not None:
+            checkpoint.page_done(next_url)
+
+
+def _next_role_page_url(ds, baseurl):
+    if ds.get('next'):
+        next_url = ds['next']
+    elif ds.get('next_link'):
+        next_url = ds['next_link']
+    else:
+        return None
+
+    api_prefix = '/api/v1'
+    if not next_url.startswith(baseurl):
+        if not next_url.startswith(api_prefix):
+            next_url = baseurl + api_prefix + next_url
+        else:
+            next_url = baseurl + next_url
+    return next_url
 
 
 def upstream_role_iterator(
@@ -410,11 +635,23 @@ def upstream_role_iterator(
     role_name=None,
     get_versions=True,
     start_page=None,
+    concurrency=None,
+    checkpoint=None,
 ):
-    """Abstracts the pagination of v1 roles into a generator with error handling."""
+    """Abstracts the pagination of v1 roles into a generator with error handling.
+
+    The details, versions and namespace of the roles of a page are fetched by
+    a pool of `concurrency` threads while the next page is prefetched. Roles
+    are still yielded in the upstream order.
+
+    A SyncCheckpoint given as `checkpoint` records the progress of the
+    iteration, it is ignored when `start_page` is set.
+    """
     if baseurl is None or not baseurl:
         baseurl = 'https://old-galaxy.ansible.com/api/v1/roles'
-    logger.info(f'upstream_role_iterator baseurl:{baseurl}')
+    if concurrency is None:
+        concurrency = DEFAULT_CONCURRENCY
+    logger.info(f'upstream_role_iterator baseurl:{baseurl} concurrency:{concurrency}')
 
     # normalize the upstream url
     parsed = urlparse(baseurl)
@@ -437,99 +674,149 @@ def upstream_role_iterator(
             next_url += f'&page={start_page}'
         else:
             next_url = next_url.rstrip('/') + f'/?page={start_page}'
+        checkpoint = None
 
+    if checkpoint is not None:
+        next_url = checkpoint.start_url(next_url)
+
+    # ns_id -> {'lock': ..., 'data': ...}, each namespace is fetched only once
     namespace_cache = {}
+    namespace_cache_lock = threading.Lock()
 
-    pagenum = 0
-    role_count = 0
-    while next_url:
-        logger.info(f'fetch {pagenum} {next_url} role-count:{role_count} ...')
+    def get_namespace(ns_id):
+        with namespace_cache_lock:
+            entry = namespace_cache.setdefault(ns_id, {'lock': threading.Lock()})
+        with entry['lock']:
+            if 'data' in entry:
+                return entry['data']
 
-        page = safe_fetch(next_url)
+            logger.info(_baseurl + f'/api/v1/namespaces/{ns_id}/')
+            ns_url = _baseurl + f'/api/v1/namespaces/{ns_id}/'
 
-        # Some upstream pages return ISEs for whatever reason.
-        if page.status_code >= 500:
-            logger.error(f'{next_url} returned 500ISE. incrementing the page manually')
-            if 'page=' in next_url:
-                next_url = next_url.replace(f'page={pagenum}', f'page={pagenum + 1}')
-            else:
-                next_url = next_url.rstrip('/') + '/?page={pagenum + 1}'
-            pagenum += 1
-            continue
+            nsd_rr = safe_fetch(ns_url)
+            try:
+                namespace_data = nsd_rr.json()
+            except requests.exceptions.JSONDecodeError:
+                return None
 
-        ds = page.json()
+            # get the owners too
+            namespace_data['summary_fields']['owners'] = \
+                get_namespace_owners_details(_baseurl, ns_id)
 
-        # iterate each role
-        for rdata in ds['results']:
+            entry['data'] = namespace_data
+            return namespace_data
 
-            remote_id = rdata['id']
-            role_upstream_url = _baseurl + f'/api/v1/roles/{remote_id}/'
-            logger.info(f'fetch {role_upstream_url}')
+    def fetch_role(rdata):
+        remote_id = rdata['id']
+        role_upstream_url = _baseurl + f'/api/v1/roles/{remote_id}/'
+        logger.info(f'fetch {role_upstream_url}')
 
-            role_page = safe_fetch(role_upstream_url)
-            if role_page.status_code == 404:
-                continue
+        role_page = safe_fetch(role_upstream_url)
+        if role_page.status_code == 404:
+            return None
 
-            role_data = None
-            try:
-                role_data = role_page.json()
-                if role_data.get('detail', '').lower().strip() == 'not found':
-                    continue
-            except Exception:
-                continue
+        role_data = None
+        try:
+            role_data = role_page.json()
+            if role_data.get('detail', '').lower().strip() == 'not found':
+                return None
+        except Exception:
+            return None
 
-            # Get the namespace+owners
-            ns_id = role_data['summary_fields']['namespace']['id']
-            if ns_id not in namespace_cache:
-                logger.info(_baseurl + f'/api/v1/namespaces/{ns_id}/')
-                ns_url = _baseurl + f'/api/v1/namespaces/{ns_id}/'
+        # Get the namespace+owners
+        namespace_data = get_namespace(role_data['summary_fields']['namespace']['id'])
+        if namespace_data is None:
+            return None
+
+        # Get all of the versions because they have more info than the summary
+        if get_versions:
+            versions_url = role_upstream_url + 'versions'
+            role_versions = paginated_results(versions_url)
+        else:
+            role_versions = []
 
-                nsd_rr = safe_fetch(ns_url)
-                try:
-                    namespace_data = nsd_rr.json()
-                except requests.exceptions.JSONDecodeError:
-                    continue
-                namespace_cache[ns_id] = namespace_data
+        return namespace_data, role_data, role_versions
 
-                # get the owners too
-                namespace_cache[ns_id]['summary_fields']['owners'] = \
-                    get_namespace_owners_details(_baseurl, ns_id)
+    role_pool = ThreadPoolExecutor(max_workers=concurrency)
+    page_pool = ThreadPoolExecutor(max_workers=1)
+    role_futures = []
 
-            else:
-                namespace_data = namespace_cache[ns_id]
+    pagenum = 0
+    role_count = 0
+    try:
+        page_future = page_pool.submit(safe_fetch, next_url)
+        while page_future is not None:
+            logger.info(f'fetch {pagenum} {next_url} role-count:{role_count} ...')
+
+            page = page_future.result()
+            page_future = None
+
+            # Some upstream pages return ISEs for whatever reason.
+            if page.status_code >= 500:
+                logger.error(f'{next_url} returned 500ISE. incrementing the page manually')
+                if 'page=' in next_url:
+                    next_url = next_url.replace(f'page={pagenum}', f'page={pagenum + 1}')
+                else:
+                    next_url = next_url.rstrip('/') + f'/?page={pagenum + 1}'
+                pagenum += 1
+                page_future = page_pool.submit(safe_fetch, next_url)
+                continue
 
-            # Get all of the versions because they have more info than the summary
-            if get_versions:
-                versions_url = role_upstream_url + 'versions'
-                role_versions = paginated_results(versions_url)
-            else:
-                role_versions = []
+            ds = page.json()
+
+            # fetch the details of every role on the page in parallel ...
+            role_futures = [
+                (rdata['id'], role_pool.submit(fetch_role, rdata))
+                for rdata in ds['results']
+                if checkpoint is None or not checkpoint.skip(rdata)
+            ]
+
+            # ... while the next page is prefetched
+            next_url = _next_role_page_url(ds, _baseurl)
+            if _is_stale_page(checkpoint, ds['results']):
+                next_url = None
+            if next_url and (limit is None or role_count + len(role_futures) < limit):
+                page_future = page_pool.submit(safe_fetch, next_url)
+
+            # iterate each role
+            for remote_id, future in role_futures:
+                result = future.result()
+                if result is None:
+                    # gone upstream, do not fetch it again when resuming
+                    if checkpoint is not None:
+                        checkpoint.item_done(remote_id)
+                    continue
+
+                # send the role
+                role_count += 1
+                yield result
 
-            # send the role
-            role_count += 1
-            yield namespace_data, role_data, role_versions
+                if checkpoint is not None:
+                    checkpoint.item_done(remote_id)
+
+                # break early if count reached
+                if limit is not None and role_count >= limit:
+                    break
 
             # break early if count reached
             if limit is not None and role_count >= limit:
+                if checkpoint is not None:
+                    checkpoint.save()
                 break
 
-        # break early if count reached
-        if limit is not None and role_count >= limit:
-            break
-
-        if ds.get('next'):
-            next_url = ds['next']
-        elif ds.get('next_link'):
-            next_url = ds['next_link']
-        else:
-            # break if no next page
-            break
+            if checkpoint is not None:
+                if next_url:
+                    checkpoint.page_done(next_url)
+                else:
+                    checkpoint.finish()
 
-        api_prefix = '/api/v1'
-        if not next_url.startswith(_baseurl):
-            if not next_url.startswith(api_prefix):
-                next_url = _baseurl + api_prefix + next_url
-            else:
-                next_url = _baseurl + next_url
+            # the page was not prefetched because the limit seemed close enough
+            if page_future is None and next_url:
+                page_future = page_pool.submit(safe_fetch, next_url)
 
-        pagenum += 1
+            pagenum += 1
+    finally:
+        for _, future in role_futures:
+            future.cancel()
+        role_pool.shutdown(wait=False, cancel_futures=True)
+        page_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,139 @@
+"""
+Maintenance of the HighestCollectionVersion table.
+
+The `_ui/v1/repo/<distro>/` collection listing used to load every
+(collection, version) of the distribution and compare them with
+`semantic_version` on each request. The same comparison is now done once per
+repository version, when it is completed, and the listing joins the result.
+"""
+
+import logging
+
+import semantic_version
+from django.db import transaction
+from pulp_ansible.app.models import AnsibleDistribution, AnsibleRepository, CollectionVersion
+from pulpcore.plugin.models import RepositoryVersion
+
+from galaxy_ng.app.models import HighestCollectionVersion
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def find_highest_versions(rows):
+    """
+    Map each collection id to the pk of its highest version.
+
+    rows is an iterable of (collection_id, collection_version pk, version).
+    """
+    highest = {}
+    for collection_id, pk, version in rows:
+        parsed = semantic_version.Version(version)
+        current = highest.get(collection_id)
+        if current is None or parsed > current[1]:
+            highest[collection_id] = (pk, parsed)
+    return {collection_id: pk for collection_id, (pk, _) in highest.items()}
+
+
+def _collection_versions(repository_version):
+    return CollectionVersion.objects.filter(pk__in=repository_version.content)
+
+
+def _previous_version(repository_version):
+    return (
+        RepositoryVersion.objects.filter(
+            repository=repository_version.repository_id,
+            number__lt=repository_version.number,
+            complete=True,
+        )
+        .order_by("-number")
+        .first()
+    )
+
+
+def is_indexed(repository_version):
+    return HighestCollectionVersion.objects.filter(repository_version=repository_version).exists()
+
+
+def update_repository_version(repository_version, full=False, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Record the highest version of each collection in repository_version.
+
+    Unless full is set and when the previous repository version is indexed,
+    only the collections with versions added or removed since then are
+    compared again, the others are copied over. Returns the number of rows
+    written.
+    """
+    highest = {}
+    versions = _collection_versions(repository_version)
+
+    previous = None if full else _previous_version(repository_version)
+    if previous is not None and is_indexed(previous):
+        changed = set(
+            CollectionVersion.objects.filter(
+                pk__in=repository_version.added(base_version=previous)
+            ).values_list("collection_id", flat=True)
+        ) | set(
+            CollectionVersion.objects.filter(
+                pk__in=repository_version.removed(base_version=previous)
+            ).values_list("collection_id", flat=True)
+        )
+        highest.update(
+            HighestCollectionVersion.objects.filter(repository_version=previous)
+            .exclude(collection_id__in=changed)
+            .values_list("collection_id", "collection_version_id")
+        )
+        versions = versions.filter(collection_id__in=changed)
+
+    highest.update(
+        find_highest_versions(versions.values_list("collection_id", "pk", "version"))
+    )
+
+    with transaction.atomic():
+        HighestCollectionVersion.objects.filter(repository_version=repository_version).delete()
+        HighestCollectionVersion.objects.bulk_create(
+            [
+                HighestCollectionVersion(
+                    repository_version=repository_version,
+                    collection_id=collection_id,
+                    collection_version_id=pk,
+                )
+                for collection_id, pk in highest.items()
+            ],
+            batch_size=batch_size,
+        )
+    return len(highest)
+
+
+def get_distributed_repository_versions():
+    """The repository versions currently served by an ansible distribution."""
+    repository_versions = {}
+    distributions = AnsibleDistribution.objects.select_related("repository", "repository_version")
+    for distribution in distributions:
+        if distribution.repository_version:
+            repository_version = distribution.repository_version
+        elif distribution.repository:
+            repository_version = distribution.repository.latest_version()
+        else:
+            continue
+        if repository_version is not None:
+            repository_versions[repository_version.pk] = repository_version
+    return list(repository_versions.values())
+
+
+def rebuild_highest_versions(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Index every distributed repository version from scratch.
+
+    Returns the number of repository versions indexed.
+    """
+    repository_versions = get_distributed_repository_versions()
+    for repository_version in repository_versions:
+        count = update_repository_version(repository_version, full=True, batch_size=batch_size)
+        logger.info("Indexed %s collections in %s", count, repository_version)
+    return len(repository_versions)
+
+
+def is_ansible_repository_version(repository_version):
+    return repository_version.repository.pulp_type == AnsibleRepository.get_pulp_type()
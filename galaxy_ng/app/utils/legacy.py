@@ -1,9 +1,18 @@
+import hashlib
+import json
 import logging
 import re
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
 
+from galaxy_ng.app.api.v1.models import LARGE_METADATA_KEYS
 from galaxy_ng.app.api.v1.models import LegacyNamespace
+from galaxy_ng.app.api.v1.models import LegacyRole
+from galaxy_ng.app.api.v1.models import LegacyRoleDownloadCount
+from galaxy_ng.app.common import metrics
 from galaxy_ng.app.models import Namespace
+from galaxy_ng.app.utils import search_index
 from galaxy_ng.app.utils.galaxy import generate_unverified_email
 from galaxy_ng.app.utils.namespaces import generate_v3_namespace_from_attributes
 from galaxy_ng.app.utils.rbac import add_user_to_v3_namespace
@@ -16,6 +25,9 @@ logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
+DEFAULT_ROLE_SYNC_BATCH_SIZE = 100
+
+
 def sanitize_avatar_url(url):
     """Remove all the non-url characters people have put in their avatar urls."""
     regex = (
@@ -137,3 +149,116 @@ def process_namespace(namespace_name, namespace_info, force=False):
             add_user_to_v3_namespace(owner, namespace)
 
     return legacy_namespace, namespace
+
+
+def metadata_hash(full_metadata):
+    """A stable hash of a role's full_metadata, independent of the key order."""
+    data = json.dumps(full_metadata, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def metadata_value_md5(value):
+    """
+    The md5 postgres computes for a value of full_metadata read as text.
+
+    Strings are hashed as is, other values as json, whose spacing may differ
+    from the one of postgres, which only makes the role be updated again.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        value = json.dumps(value)
+    return hashlib.md5(value.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def metadata_changed(role, full_metadata):
+    """
+    Whether full_metadata differs from the one of a role loaded with
+    LegacyRoleQuerySet.with_metadata_digests, without loading its readmes.
+    """
+    summary = {k: v for k, v in full_metadata.items() if k not in LARGE_METADATA_KEYS}
+    if metadata_hash(role.summary_metadata) != metadata_hash(summary):
+        return True
+    return any(
+        getattr(role, f'{key}_md5') != metadata_value_md5(full_metadata.get(key))
+        for key in LARGE_METADATA_KEYS
+    )
+
+
+class LegacyRoleSyncWriter:
+    """
+    Writes the roles found by an upstream sync to the database in batches.
+
+    Each batch resolves the existing roles with a single query, creates the
+    new ones with bulk_create, updates only the roles whose full_metadata hash
+    changed with bulk_update and upserts all the download counters at once.
+    The readmes of the existing roles are compared through their md5 computed
+    by postgres, they are never loaded.
+    """
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or DEFAULT_ROLE_SYNC_BATCH_SIZE
+        self.pending = {}
+        self.stats = {'inserted': 0, 'updated': 0, 'skipped': 0}
+
+    def add(self, namespace, name, full_metadata, download_count):
+        # a role seen twice in the same batch keeps the last upstream data
+        self.pending[(namespace.pk, name)] = (namespace, full_metadata, download_count)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+
+        roles = {
+            (role.namespace_id, role.name): role
+            for role in LegacyRole.objects.filter(
+                namespace_id__in={namespace_id for namespace_id, _ in pending},
+                name__in={name for _, name in pending},
+            ).with_metadata_digests()
+        }
+
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        for key, (namespace, full_metadata, _) in pending.items():
+            role = roles.get(key)
+            if role is None:
+                to_create.append(
+                    LegacyRole(namespace=namespace, name=key[1], full_metadata=full_metadata)
+                )
+            elif metadata_changed(role, full_metadata):
+                role.full_metadata = full_metadata
+                role.modified = now
+                to_update.append(role)
+
+        with transaction.atomic():
+            for role in LegacyRole.objects.bulk_create(to_create):
+                roles[(role.namespace_id, role.name)] = role
+            LegacyRole.objects.bulk_update(to_update, ['full_metadata', 'modified'])
+            LegacyRoleDownloadCount.objects.bulk_create(
+                [
+                    LegacyRoleDownloadCount(legacyrole=roles[key], count=download_count)
+                    for key, (_, _, download_count) in pending.items()
+                ],
+                update_conflicts=True,
+                unique_fields=['legacyrole'],
+                update_fields=['count'],
+            )
+
+        # bulk operations do not send the post_save signals maintaining the search index
+        search_index.update_role_entries([roles[key].pk for key in pending])
+
+        skipped = len(pending) - len(to_create) - len(to_update)
+        self.stats['inserted'] += len(to_create)
+        self.stats['updated'] += len(to_update)
+        self.stats['skipped'] += skipped
+        metrics.legacy_role_sync_inserted.inc(len(to_create))
+        metrics.legacy_role_sync_updated.inc(len(to_update))
+        metrics.legacy_role_sync_skipped.inc(skipped)
+        logger.info(
+            f'SYNC batch of {len(pending)} roles: {len(to_create)} inserted,'
+            + f' {len(to_update)} updated, {skipped} skipped'
+        )
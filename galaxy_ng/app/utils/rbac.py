@@ -1,15 +1,27 @@
-from pulpcore.plugin.models.role import Role
+import json
+import logging
+
+import redis
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import IntegerField, Q
+from django.db.models.functions import Cast
+from pulpcore.plugin.models.role import GroupRole, Role, UserRole
 
 from pulpcore.plugin.util import (
     assign_role,
     get_groups_with_perms_attached_roles,
-    get_users_with_perms_attached_roles,
     get_objects_for_user,
     remove_role
 )
 
 from galaxy_ng.app.models import Namespace
 from galaxy_ng.app.models.auth import Group, User
+from galaxy_ng.app.tasks import settings_cache
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE_OWNERS_CACHE_KEY = "GALAXY_NAMESPACE_OWNERS:{pk}"
 
 
 def add_username_to_groupname(username: str, groupname: str) -> None:
@@ -47,6 +59,7 @@ def add_group_to_v3_namespace(group: Group, namespace: Namespace) -> None:
     if group in current_groups:
         return
     assign_role(role_name, group, namespace)
+    invalidate_v3_namespace_owners(namespace)
 
 
 def remove_group_from_v3_namespace(group, namespace) -> None:
@@ -58,39 +71,183 @@ def remove_group_from_v3_namespace(group, namespace) -> None:
     if group not in current_groups:
         return
     remove_role(role_name, group, namespace)
+    invalidate_v3_namespace_owners(namespace)
 
 
 def add_user_to_v3_namespace(user: User, namespace: Namespace) -> None:
     role_name = 'galaxy.collection_namespace_owner'
     assign_role(role_name, user, namespace)
+    invalidate_v3_namespace_owners(namespace)
 
 
 def remove_user_from_v3_namespace(user: User, namespace: Namespace) -> None:
     role_name = 'galaxy.collection_namespace_owner'
     remove_role(role_name, user, namespace)
+    invalidate_v3_namespace_owners(namespace)
 
 
-def get_v3_namespace_owners(namespace: Namespace) -> list:
+def _owners_cache_ttl() -> int:
+    if settings_cache.conn is None:
+        return 0
+    return settings.get("GALAXY_NAMESPACE_OWNERS_CACHE_TTL", 0) or 0
+
+
+def _get_cached_owner_ids(namespace_pks: list) -> dict:
+    keys = [NAMESPACE_OWNERS_CACHE_KEY.format(pk=pk) for pk in namespace_pks]
+    try:
+        values = settings_cache.conn.mget(keys)
+    except redis.exceptions.RedisError:
+        logger.warning("Unable to read the namespace owners cache", exc_info=True)
+        return {}
+    return {
+        pk: json.loads(value)
+        for pk, value in zip(namespace_pks, values)
+        if value is not None
+    }
+
+
+def _set_cached_owner_ids(owner_ids: dict, ttl: int) -> None:
+    try:
+        pipe = settings_cache.conn.pipeline()
+        for pk, user_ids in owner_ids.items():
+            pipe.set(NAMESPACE_OWNERS_CACHE_KEY.format(pk=pk), json.dumps(user_ids), ex=ttl)
+        pipe.execute()
+    except redis.exceptions.RedisError:
+        logger.warning("Unable to write the namespace owners cache", exc_info=True)
+
+
+def invalidate_v3_namespaces_owners(namespace_pks) -> None:
     """
-    Return a list of users that own a v3 namespace.
+    Drop the cached owners of the namespaces, see `get_v3_namespaces_owners`.
     """
-    owners = []
-    current_groups = get_groups_with_perms_attached_roles(
-        namespace,
-        include_model_permissions=False
+    keys = [NAMESPACE_OWNERS_CACHE_KEY.format(pk=pk) for pk in namespace_pks]
+    if settings_cache.conn is None or not keys:
+        return
+    try:
+        settings_cache.conn.delete(*keys)
+    except redis.exceptions.RedisError:
+        logger.warning("Unable to invalidate the namespace owners cache", exc_info=True)
+
+
+def invalidate_v3_namespace_owners(namespace: Namespace) -> None:
+    """
+    Drop the cached owners of a namespace, see `get_v3_namespaces_owners`.
+    """
+    invalidate_v3_namespaces_owners([namespace.pk])
+
+
+def invalidate_groups_v3_namespace_owners(group_pks) -> None:
+    """
+    Drop the cached owners of the namespaces owned by the groups, when their
+    members change.
+    """
+    if not _owners_cache_ttl():
+        return
+    object_ids = GroupRole.objects.filter(
+        group__in=list(group_pks), **_owner_role_filter()
+    ).values_list("object_id", flat=True).distinct()
+    invalidate_v3_namespaces_owners(object_ids)
+
+
+def _owner_role_filter() -> dict:
+    """
+    Filter of the UserRole and GroupRole rows making their user, or the
+    members of their group, owners of a namespace: a role on the namespace
+    granting at least one namespace permission.
+    """
+    ctype = ContentType.objects.get_for_model(Namespace, for_concrete_model=False)
+    return {
+        "content_type": ctype,
+        "role__permissions__content_type": ctype,
+    }
+
+
+def _query_owner_ids(namespace_pks: list) -> dict:
+    """
+    Owner user ids of each namespace in a single query.
+    """
+    role_filter = {
+        **_owner_role_filter(),
+        "object_id__in": [str(pk) for pk in namespace_pks],
+    }
+    user_rows = UserRole.objects.filter(**role_filter).values_list("object_id", "user_id")
+    group_rows = (
+        GroupRole.objects.filter(**role_filter)
+        .exclude(group__user=None)
+        .values_list("object_id", "group__user")
     )
-    for cgroup in current_groups:
-        owners.extend(list(cgroup.user_set.all()))
-    current_users = get_users_with_perms_attached_roles(
-        namespace,
-        include_model_permissions=False
+
+    owner_ids = {pk: set() for pk in namespace_pks}
+    pk_by_object_id = {str(pk): pk for pk in namespace_pks}
+    for object_id, user_id in user_rows.union(group_rows):
+        owner_ids[pk_by_object_id[object_id]].add(user_id)
+    return {pk: sorted(user_ids) for pk, user_ids in owner_ids.items()}
+
+
+def get_v3_namespaces_owners(namespaces, use_cache: bool = False) -> dict:
+    """
+    Return the owners of many v3 namespaces, as {namespace.pk: [users]}.
+
+    The owners of all the namespaces are found with one query, and the users
+    loaded with a second one. With use_cache, the owner ids are also kept in
+    redis for GALAXY_NAMESPACE_OWNERS_CACHE_TTL seconds. The entries are dropped
+    when a role on the namespace or the members of an owner group change, the
+    cache is still only meant for listings and never for permission checks.
+    """
+    namespace_pks = list(dict.fromkeys(ns.pk for ns in namespaces))
+    if not namespace_pks:
+        return {}
+
+    ttl = _owners_cache_ttl() if use_cache else 0
+    owner_ids = _get_cached_owner_ids(namespace_pks) if ttl else {}
+
+    missing = [pk for pk in namespace_pks if pk not in owner_ids]
+    if missing:
+        found = _query_owner_ids(missing)
+        if ttl:
+            _set_cached_owner_ids(found, ttl)
+        owner_ids.update(found)
+
+    users = User.objects.in_bulk(
+        {user_id for user_ids in owner_ids.values() for user_id in user_ids}
+    )
+    return {
+        pk: [users[user_id] for user_id in user_ids if user_id in users]
+        for pk, user_ids in owner_ids.items()
+    }
+
+
+def filter_v3_namespaces_owned_by(queryset, username: str, field: str = "pk"):
+    """
+    Filter queryset down to the rows whose `field`, the primary key of a v3
+    namespace, is a namespace owned by username.
+
+    This is done in SQL with subqueries over the role assignments. The
+    text `object_id` is cast to an integer on the subquery side so that
+    the index on `field` stays usable for the outer query.
+    """
+    role_filter = _owner_role_filter()
+    user_roles = UserRole.objects.filter(
+        user__username=username, **role_filter
+    ).annotate(
+        ns_id=Cast("object_id", output_field=IntegerField())
+    ).values("ns_id")
+    group_roles = GroupRole.objects.filter(
+        group__user__username=username, **role_filter
+    ).annotate(
+        ns_id=Cast("object_id", output_field=IntegerField())
+    ).values("ns_id")
+
+    return queryset.filter(
+        Q(**{f"{field}__in": user_roles}) | Q(**{f"{field}__in": group_roles})
     )
-    owners.extend(list(current_users))
-    unique_owners = []
-    for owner in owners:
-        if owner not in unique_owners:
-            unique_owners.append(owner)
-    return unique_owners
+
+
+def get_v3_namespace_owners(namespace: Namespace) -> list:
+    """
+    Return a list of users that own a v3 namespace.
+    """
+    return get_v3_namespaces_owners([namespace])[namespace.pk]
 
 
 def get_owned_v3_namespaces(user: User):
@@ -0,0 +1,38 @@
+from collections import defaultdict
+
+from django.db.models import F, OuterRef, Q, Subquery
+from pulpcore.plugin.models import RepositoryContent, RepositoryVersion
+
+
+def get_latest_repository_names(content_pks, exclude_synclists=True) -> dict:
+    """
+    Return {content pk: [repository names]} of the repositories whose latest
+    version contains each content unit, in a single query.
+
+    A content unit is in the latest version of a repository when it was added
+    by that version or an earlier one, and not removed by any of them.
+    """
+    latest_number = RepositoryVersion.objects.filter(
+        repository=OuterRef("repository"), complete=True
+    ).order_by("-number").values("number")[:1]
+
+    memberships = RepositoryContent.objects.filter(content__in=content_pks)
+    if exclude_synclists:
+        memberships = memberships.exclude(repository__name__endswith="-synclist")
+
+    rows = (
+        memberships.annotate(latest_number=Subquery(latest_number))
+        .filter(version_added__number__lte=F("latest_number"))
+        .filter(
+            Q(version_removed__isnull=True)
+            | Q(version_removed__number__gt=F("latest_number"))
+        )
+        .order_by("repository__name")
+        .values_list("content_id", "repository__name")
+        .distinct()
+    )
+
+    names = defaultdict(list)
+    for content_pk, name in rows:
+        names[content_pk].append(name)
+    return names
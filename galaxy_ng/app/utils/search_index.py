@@ -0,0 +1,358 @@
+"""
+Maintenance of the denormalized SearchIndexEntry table.
+
+The `_ui/v1/search/` endpoint used to build a UNION ALL of two heavily annotated
+querysets (collection versions and legacy roles) on every request. The same
+querysets are now used here to (re)build one SearchIndexEntry per collection
+(highest version) and per legacy role, and the view only reads that table.
+"""
+
+import logging
+import threading
+
+from django.contrib.postgres.aggregates import JSONBAgg
+from django.db import transaction
+from django.db.models import (
+    Exists,
+    F,
+    FloatField,
+    Func,
+    JSONField,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+)
+from django.db.models.fields.json import KT
+from django.db.models.functions import Cast, Coalesce
+from pulp_ansible.app.models import (
+    AnsibleCollectionDeprecated,
+    CollectionDownloadCount,
+    CollectionVersion,
+)
+
+from galaxy_ng.app.api.v1.models import LegacyRole, LegacyRoleDownloadCount
+from galaxy_ng.app.models import Namespace, SearchIndexEntry
+
+
+logger = logging.getLogger(__name__)
+
+RANK_NORMALIZATION = 32
+
+# The order of the fields here is important, the UNION ALL of both
+# querysets is only valid when both sides select the same columns.
+QUERYSET_VALUES = [
+    "namespace_avatar",
+    "content_list",
+    "deprecated",
+    "description_text",
+    "download_count",
+    "last_updated",
+    "name",
+    "namespace_name",
+    "platform_names",
+    "tag_names",
+    "content_type",
+    "latest_version",
+    "search",
+    "relevance",
+]
+
+# Values persisted on each SearchIndexEntry
+INDEX_VALUES = [
+    "namespace_avatar",
+    "content_list",
+    "deprecated",
+    "description_text",
+    "download_count",
+    "last_updated",
+    "name",
+    "namespace_name",
+    "platform_names",
+    "tag_names",
+    "content_type",
+    "latest_version",
+    "search",
+]
+
+UPDATE_FIELDS = [
+    "namespace_avatar",
+    "content_list",
+    "deprecated",
+    "description_text",
+    "download_count",
+    "last_updated",
+    "name",
+    "namespace_name",
+    "platform_names",
+    "tag_names",
+    "latest_version",
+    "search_vector",
+]
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def rank(search_field, query):
+    """Return the ts_rank expression used to compute search relevance.
+
+    ts_rank returns a float4, it is cast to the float8 of FloatField so the
+    values read back compare equal to the column, as keyset pagination needs.
+    """
+    if not query:
+        return Value(0)
+    return Cast(
+        Func(
+            F(search_field),
+            query,
+            RANK_NORMALIZATION,
+            function="ts_rank",
+            output_field=FloatField(),
+        ),
+        output_field=FloatField(),
+    )
+
+
+def get_collection_queryset(query=None):
+    """Build the annotated CollectionVersion queryset for the highest versions."""
+    deprecated_qs = AnsibleCollectionDeprecated.objects.filter(
+        namespace=OuterRef("namespace"), name=OuterRef("name")
+    )
+    download_count_qs = CollectionDownloadCount.objects.filter(
+        namespace=OuterRef("namespace"), name=OuterRef("name")
+    )
+    namespace_qs = Namespace.objects.filter(name=OuterRef("namespace"))
+
+    return CollectionVersion.objects.annotate(
+        namespace_name=F("namespace"),
+        description_text=F("description"),
+        platform_names=Value([], JSONField()),  # There is no platforms for collections
+        tag_names=JSONBAgg("tags__name"),
+        content_type=Value("collection"),
+        last_updated=F("timestamp_of_interest"),
+        deprecated=Exists(deprecated_qs),
+        download_count=Coalesce(
+            Subquery(download_count_qs.values("download_count")[:1]), Value(0)
+        ),
+        latest_version=F("version"),
+        content_list=F("contents"),
+        namespace_avatar=Subquery(namespace_qs.values("_avatar_url")),
+        search=F("search_vector"),
+        relevance=rank("search_vector", query),
+    ).filter(is_highest=True)
+
+
+def get_role_queryset(query=None):
+    """Build the annotated LegacyRole queryset."""
+    return LegacyRole.objects.annotate(
+        namespace_name=F("namespace__name"),
+        description_text=KT("full_metadata__description"),
+        platform_names=F("full_metadata__platforms"),
+        tag_names=F("full_metadata__tags"),
+        content_type=Value("role"),
+        last_updated=F("created"),
+        deprecated=Value(False),  # there is no deprecation for roles
+        download_count=Coalesce(F("legacyroledownloadcount__count"), Value(0)),
+        latest_version=KT("full_metadata__versions__-1__version"),
+        content_list=Value([], JSONField()),  # There is no contents for roles
+        namespace_avatar=F("namespace__namespace___avatar_url"),  # v3 namespace._avatar_url
+        search=F("legacyrolesearchvector__search_vector"),
+        relevance=rank("legacyrolesearchvector__search_vector", query),
+    )
+
+
+def get_union_queryset(query=None):
+    """The UNION ALL of collections and roles, as the search view used to compute it."""
+    collections = get_collection_queryset(query=query).values(*QUERYSET_VALUES)
+    roles = get_role_queryset(query=query).values(*QUERYSET_VALUES)
+    if query:
+        collections = collections.filter(search=query)
+        roles = roles.filter(search=query)
+    return collections.union(roles, all=True)
+
+
+def _make_entry(row):
+    return SearchIndexEntry(
+        content_type=row["content_type"],
+        namespace_name=row["namespace_name"],
+        name=row["name"],
+        description_text=row["description_text"] or "",
+        latest_version=row["latest_version"],
+        namespace_avatar=row["namespace_avatar"],
+        content_list=row["content_list"] or [],
+        # JSONBAgg over the outer join yields [null] for collections without tags
+        tag_names=[tag for tag in row["tag_names"] or [] if tag is not None],
+        platform_names=row["platform_names"] or [],
+        deprecated=row["deprecated"],
+        download_count=row["download_count"],
+        last_updated=row["last_updated"],
+        search_vector=row["search"] or "",
+        collection_id=row.get("collection_id"),
+        role_id=row.get("role_id"),
+    )
+
+
+def _upsert(entries, unique_field):
+    if not entries:
+        return 0
+    SearchIndexEntry.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=[unique_field],
+        update_fields=UPDATE_FIELDS,
+    )
+    return len(entries)
+
+
+def update_collection_entries(keys):
+    """Create, update or delete the entries of keys, a list of collection (namespace, name)."""
+    keys = set(keys)
+    if not keys:
+        return
+    collections = Q()
+    for namespace, name in keys:
+        collections |= Q(namespace=namespace, name=name)
+    rows = get_collection_queryset().filter(collections).values(*INDEX_VALUES, "collection_id")
+    entries = [_make_entry(row) for row in rows]
+
+    removed = Q()
+    for namespace, name in keys - {(entry.namespace_name, entry.name) for entry in entries}:
+        removed |= Q(namespace_name=namespace, name=name)
+    with transaction.atomic():
+        if removed:
+            SearchIndexEntry.objects.filter(removed, content_type="collection").delete()
+        _upsert(entries, "collection")
+
+
+def update_collection_entry(namespace, name):
+    """Create, update or delete the entry of a single collection."""
+    update_collection_entries([(namespace, name)])
+
+
+_pending = threading.local()
+
+
+class _CollectionEntriesBatch:
+    """The collections changed by the current transaction, refreshed once it commits."""
+
+    def __init__(self):
+        self.keys = set()
+
+    def __call__(self):
+        if getattr(_pending, "batch", None) is self:
+            _pending.batch = None
+        update_collection_entries(self.keys)
+
+
+def update_collection_entry_on_commit(namespace, name):
+    """
+    Refresh the entry of a collection after the current transaction commits.
+
+    A sync saves many versions of a collection and adds their tags one by one,
+    the collections are collected per transaction and each entry is computed
+    once on commit.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        update_collection_entry(namespace, name)
+        return
+
+    batch = getattr(_pending, "batch", None)
+    # a rolled back transaction (or savepoint) drops the batch from run_on_commit
+    if batch is None or not any(entry[1] is batch for entry in connection.run_on_commit):
+        batch = _pending.batch = _CollectionEntriesBatch()
+        transaction.on_commit(batch)
+    batch.keys.add((namespace, name))
+
+
+def update_role_entries(role_ids):
+    """Create or update the entries of the given legacy roles."""
+    rows = get_role_queryset().filter(pk__in=role_ids).values(*INDEX_VALUES, role_id=F("pk"))
+    _upsert([_make_entry(row) for row in rows], "role")
+
+
+def update_collection_download_counts(keys):
+    """Refresh the download count of the collections in keys, a list of (namespace, name)."""
+    if not keys:
+        return
+    collections = Q()
+    for namespace, name in keys:
+        collections |= Q(namespace_name=namespace, name=name)
+    counter_qs = CollectionDownloadCount.objects.filter(
+        namespace=OuterRef("namespace_name"), name=OuterRef("name")
+    )
+    SearchIndexEntry.objects.filter(collections, content_type="collection").update(
+        download_count=Coalesce(Subquery(counter_qs.values("download_count")[:1]), Value(0))
+    )
+
+
+def update_collection_download_count(namespace, name):
+    update_collection_download_counts([(namespace, name)])
+
+
+def update_role_download_counts(role_ids):
+    counter_qs = LegacyRoleDownloadCount.objects.filter(legacyrole_id=OuterRef("role_id"))
+    SearchIndexEntry.objects.filter(role_id__in=role_ids).update(
+        download_count=Coalesce(Subquery(counter_qs.values("count")[:1]), Value(0))
+    )
+
+
+def update_role_download_count(role_id):
+    update_role_download_counts([role_id])
+
+
+def update_collection_deprecation(namespace, name):
+    deprecated_qs = AnsibleCollectionDeprecated.objects.filter(namespace=namespace, name=name)
+    SearchIndexEntry.objects.filter(
+        content_type="collection", namespace_name=namespace, name=name
+    ).update(deprecated=Exists(deprecated_qs))
+
+
+def update_namespace_avatar(namespace):
+    """Propagate a v3 namespace avatar to its collections and legacy roles."""
+    SearchIndexEntry.objects.filter(
+        content_type="collection", namespace_name=namespace.name
+    ).update(namespace_avatar=namespace._avatar_url)
+    SearchIndexEntry.objects.filter(role__namespace__namespace=namespace).update(
+        namespace_avatar=namespace._avatar_url
+    )
+
+
+def rebuild_search_index(batch_size=DEFAULT_BATCH_SIZE):
+    """Rebuild every SearchIndexEntry and drop the entries without a source row.
+
+    Returns a tuple with the number of (collections, roles) indexed.
+    """
+    collection_count = 0
+    rows = get_collection_queryset().values(*INDEX_VALUES, "collection_id").order_by()
+    batch = []
+    for row in rows.iterator(chunk_size=batch_size):
+        batch.append(_make_entry(row))
+        if len(batch) >= batch_size:
+            collection_count += _upsert(batch, "collection")
+            batch = []
+    collection_count += _upsert(batch, "collection")
+
+    role_count = 0
+    rows = get_role_queryset().values(*INDEX_VALUES, role_id=F("pk")).order_by()
+    batch = []
+    for row in rows.iterator(chunk_size=batch_size):
+        batch.append(_make_entry(row))
+        if len(batch) >= batch_size:
+            role_count += _upsert(batch, "role")
+            batch = []
+    role_count += _upsert(batch, "role")
+
+    # Collections whose versions were all removed keep their Collection row,
+    # so their entries are not cascaded and must be removed here.
+    highest_qs = CollectionVersion.objects.filter(
+        collection_id=OuterRef("collection_id"), is_highest=True
+    )
+    stale, _ = SearchIndexEntry.objects.filter(content_type="collection").exclude(
+        Exists(highest_qs)
+    ).delete()
+    logger.info(
+        f"search index rebuilt with {collection_count} collections and {role_count} roles, "
+        f"{stale} stale entries removed"
+    )
+    return collection_count, role_count
@@ -0,0 +1,141 @@
+"""
+Filtering of collection versions by a semantic version range in SQL.
+
+A `semantic_version.SimpleSpec` (`>=1.0.0,<2.0.0`, `^1.2.3`, `~1.2.3`,
+`==1.2.3`, ...) is a tree of AllOf/AnyOf clauses over `Range` matchers. Each
+range is compiled to a row comparison on the (version_major, version_minor,
+version_patch) columns pulp_ansible stores for every collection version, so
+postgres can answer it with an index range scan.
+
+Row comparisons decide the range exactly for release versions. Prerelease
+versions follow the prerelease policy of the range and the semver ordering of
+their identifiers, so the comparison only narrows them down and the few
+candidates left are matched with the spec in python.
+"""
+
+import operator
+from functools import reduce
+
+import semantic_version
+from django.db.models import F, Func, IntegerField, Q, Value
+from django.db.models.lookups import (
+    Exact,
+    GreaterThan,
+    GreaterThanOrEqual,
+    LessThan,
+    LessThanOrEqual,
+)
+
+from semantic_version.base import AllOf, Always, AnyOf, Never, Range
+
+NEVER = Q(pk__in=[])
+
+LOOKUPS = {
+    Range.OP_GT: GreaterThan,
+    Range.OP_GTE: GreaterThanOrEqual,
+    Range.OP_LT: LessThan,
+    Range.OP_LTE: LessThanOrEqual,
+    Range.OP_EQ: Exact,
+}
+
+
+class Row(Func):
+    function = "ROW"
+    output_field = IntegerField()
+
+
+VERSION_ROW = Row(F("version_major"), F("version_minor"), F("version_patch"))
+
+
+def _compare(op, target):
+    """Q comparing the (major, minor, patch) of the rows with the target's."""
+    row = Row(Value(target.major), Value(target.minor), Value(target.patch))
+    if op == Range.OP_NEQ:
+        return ~Q(Exact(VERSION_ROW, row))
+    return Q(LOOKUPS[op](VERSION_ROW, row))
+
+
+def _release_range(clause):
+    """Exact condition of a Range for versions without a prerelease."""
+    op, target = clause.operator, clause.target
+    if not target.prerelease:
+        return _compare(op, target)
+
+    # A release version is greater than the prereleases of its own patch
+    if op in (Range.OP_GT, Range.OP_GTE):
+        return _compare(Range.OP_GTE, target)
+    if op in (Range.OP_LT, Range.OP_LTE):
+        return _compare(Range.OP_LT, target)
+    if op == Range.OP_EQ:
+        return NEVER
+    return Q()
+
+
+def _prerelease_range(clause):
+    """Condition including every prerelease version the Range can match."""
+    op, target = clause.operator, clause.target
+    if op in (Range.OP_GT, Range.OP_GTE):
+        return _compare(Range.OP_GTE, target)
+    if op in (Range.OP_LT, Range.OP_LTE):
+        return _compare(Range.OP_LTE, target)
+    if op == Range.OP_EQ:
+        return _compare(Range.OP_EQ, target)
+    return Q()
+
+
+def _compile(clause, compile_range):
+    if isinstance(clause, Range):
+        return compile_range(clause)
+    if isinstance(clause, Always):
+        return Q()
+    if isinstance(clause, Never):
+        return NEVER
+    if isinstance(clause, AllOf):
+        return reduce(operator.and_, (_compile(c, compile_range) for c in clause.clauses), Q())
+    if isinstance(clause, AnyOf):
+        children = [_compile(c, compile_range) for c in clause.clauses]
+        # an empty Q matches everything
+        if not all(children):
+            return Q()
+        return reduce(operator.or_, children, NEVER)
+    raise TypeError(f"unsupported clause {clause!r}")
+
+
+def _has_build(clause):
+    if isinstance(clause, Range):
+        return bool(clause.target.build)
+    return any(_has_build(child) for child in getattr(clause, "clauses", ()))
+
+
+def _python_filter(queryset, spec):
+    versions = [semantic_version.Version(v) for v in queryset.values_list("version", flat=True)]
+    return queryset.filter(version__in=[str(v) for v in spec.filter(versions)])
+
+
+def filter_version_range(queryset, value):
+    """
+    Filter a CollectionVersion queryset by the SimpleSpec value.
+
+    Raises ValueError when value is not a valid range.
+    """
+    spec = semantic_version.SimpleSpec(value)
+
+    # ranges on build metadata compare the version strings, not the numbers
+    if _has_build(spec.clause):
+        return _python_filter(queryset, spec)
+
+    release_q = _compile(spec.clause, _release_range)
+    prerelease_q = _compile(spec.clause, _prerelease_range)
+
+    candidates = (
+        queryset.exclude(version_prerelease="")
+        .filter(prerelease_q)
+        .order_by()
+        .values_list("version", flat=True)
+        .distinct()
+    )
+    prereleases = [v for v in candidates if spec.match(semantic_version.Version(v))]
+
+    return queryset.filter(
+        (Q(version_prerelease="") & release_q) | Q(version__in=prereleases)
+    )
@@ -0,0 +1,32 @@
+"""
+Microbenchmarks of the database and api hot paths, run against a development
+database from a django shell, e.g.:
+
+    django-admin shell -c \
+        "from galaxy_ng.tests.performance.benchmarks import search_index; search_index.run()"
+
+They are not collected by pytest.
+"""
+import statistics
+import time
+
+
+def measure(func, iterations):
+    """Call func iterations times and return its (p50, p95) latency in seconds."""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    if len(timings) < 2:
+        return timings[0], timings[0]
+    cuts = statistics.quantiles(timings, n=100)
+    return statistics.median(timings), cuts[94]
+
+
+def report_latencies(label, funcs, iterations):
+    """Print the p50/p95 latency of each (name, func) of funcs."""
+    print(f"{label}:")
+    for name, func in funcs:
+        p50, p95 = measure(func, iterations)
+        print(f"  {name:<6} p50={p50 * 1000:.1f}ms p95={p95 * 1000:.1f}ms")
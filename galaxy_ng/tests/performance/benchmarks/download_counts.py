@@ -0,0 +1,104 @@
+"""
+Hammers the download counter of a single legacy role from many threads and
+reports the per-increment latency and the time spent waiting on row locks,
+first with direct database writes and then buffered in redis.
+
+WARNING: the download count of the role is really incremented, do not run
+this against a production database.
+"""
+import statistics
+import threading
+import time
+
+from django.db import connection, connections
+
+from galaxy_ng.app.api.v1.models import LegacyRole
+from galaxy_ng.app.tasks import download_counts, settings_cache
+
+LOCK_WAITERS_SQL = """
+SELECT count(*) FROM pg_stat_activity
+WHERE wait_event_type = 'Lock' AND datname = current_database()
+"""
+
+
+def run(role_id=None, threads=16, downloads=200, sample_interval=0.01):
+    """
+    Count `downloads` downloads per thread of the role `role_id` (the first role
+    by default), sampling the lock waiters every `sample_interval` seconds.
+    """
+    roles = LegacyRole.objects.all()
+    if role_id is not None:
+        roles = roles.filter(pk=role_id)
+    role = roles.first()
+    if role is None:
+        raise ValueError("No role found to count downloads for")
+
+    print(f"Counting downloads of {role} with {threads} threads")
+    _hammer(
+        "direct",
+        lambda: download_counts.write_role_download_count(role),
+        threads, downloads, sample_interval,
+    )
+
+    if settings_cache.conn is None:
+        print("Redis is not configured, skipping buffered mode")
+        return
+
+    _hammer(
+        "buffered",
+        lambda: settings_cache.conn.hincrby(download_counts.ROLE_COUNTS_KEY, role.pk, 1),
+        threads, downloads, sample_interval,
+    )
+    start = time.perf_counter()
+    download_counts.flush_download_counts()
+    print(f"  flush took {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+def _hammer(label, count, threads, downloads, sample_interval):
+    timings = []
+    timings_lock = threading.Lock()
+    lock_samples = []
+    done = threading.Event()
+
+    def worker():
+        local = []
+        try:
+            for _ in range(downloads):
+                start = time.perf_counter()
+                count()
+                local.append(time.perf_counter() - start)
+        finally:
+            connections.close_all()
+        with timings_lock:
+            timings.extend(local)
+
+    def sampler():
+        try:
+            with connection.cursor() as cursor:
+                while not done.is_set():
+                    cursor.execute(LOCK_WAITERS_SQL)
+                    lock_samples.append(cursor.fetchone()[0])
+                    time.sleep(sample_interval)
+        finally:
+            connections.close_all()
+
+    sampler_thread = threading.Thread(target=sampler)
+    sampler_thread.start()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    sampler_thread.join()
+
+    cuts = statistics.quantiles(timings, n=100)
+    lock_wait = sum(lock_samples) * sample_interval
+    print(f"{label}:")
+    print(
+        f"  {len(timings)} downloads in {elapsed:.2f}s, "
+        f"p50={statistics.median(timings) * 1000:.2f}ms p95={cuts[94] * 1000:.2f}ms"
+    )
+    print(f"  approximate lock wait: {lock_wait:.2f}s")
@@ -0,0 +1,52 @@
+"""
+Compares the time spent reading dynamic settings in a request when every
+access reloads and parses the settings cache, like the hook used to do, and
+when the process local snapshot is used.
+"""
+import time
+
+from crum import get_current_request, set_current_request
+from django.conf import settings
+
+from galaxy_ng.app.dynamic_settings import DYNAMIC_SETTINGS_SCHEMA
+from galaxy_ng.app.tasks.settings_cache import settings_snapshot
+
+
+class FakeRequest:
+    pass
+
+
+def run(requests=1000, reads=20):
+    """Time `requests` requests that read `reads` dynamic settings each."""
+    if not settings.get("GALAXY_DYNAMIC_SETTINGS"):
+        raise ValueError("GALAXY_DYNAMIC_SETTINGS is not enabled")
+
+    keys = list(DYNAMIC_SETTINGS_SCHEMA)
+    read_keys = [keys[i % len(keys)] for i in range(reads)]
+
+    def uncached():
+        for key in read_keys:
+            settings_snapshot.invalidate()
+            settings.get(key)
+
+    def snapshot():
+        for key in read_keys:
+            settings.get(key)
+
+    previous_request = get_current_request()
+    timings = []
+    try:
+        for read_settings in (uncached, snapshot):
+            start = time.perf_counter()
+            for _ in range(requests):
+                set_current_request(FakeRequest())
+                read_settings()
+            timings.append((time.perf_counter() - start) / requests * 1e6)
+    finally:
+        set_current_request(previous_request)
+        settings_snapshot.invalidate()
+
+    print(
+        f"{reads} reads per request: {timings[0]:.1f}us -> {timings[1]:.1f}us "
+        f"({timings[0] / timings[1]:.1f}x)"
+    )
@@ -0,0 +1,54 @@
+"""
+Compares the latency of the first _ui/v1/repo/<distro>/ page read from
+HighestCollectionVersion with the semver comparison the view used to run.
+"""
+from django.db.models import CharField, F, Func, Value
+from pulp_ansible.app.models import AnsibleDistribution, CollectionVersion
+
+from galaxy_ng.app.utils.highest_versions import find_highest_versions
+
+from . import report_latencies
+
+
+def run(iterations=100, page_size=10):
+    for distribution in AnsibleDistribution.objects.select_related(
+        "repository", "repository_version"
+    ):
+        repository_version = distribution.repository_version or (
+            distribution.repository and distribution.repository.latest_version()
+        )
+        if repository_version is None:
+            continue
+        content = repository_version.content
+
+        def semver_page(content=content):
+            versions = CollectionVersion.objects.filter(pk__in=content)
+            highest = find_highest_versions(
+                versions.values_list("collection_id", "pk", "version")
+            )
+            by_version = versions.filter(pk__in=highest.values()).values_list(
+                "collection_id", "version"
+            )
+            identifier = Func(
+                F("collection__pk"), Value(":"), F("version"),
+                function="concat",
+                output_field=CharField(),
+            )
+            return list(
+                versions.annotate(version_identifier=identifier).filter(
+                    version_identifier__in=[f"{pk}:{version}" for pk, version in by_version]
+                )[:page_size]
+            )
+
+        def index_page(repository_version=repository_version):
+            return list(
+                CollectionVersion.objects.filter(
+                    galaxy_highest_versions__repository_version=repository_version
+                )[:page_size]
+            )
+
+        report_latencies(
+            distribution.base_path,
+            (("semver", semver_page), ("index", index_page)),
+            iterations,
+        )
@@ -0,0 +1,33 @@
+"""
+Reports how many bytes of role metadata postgres sends for the first page of
+api/v1/roles/ with the full document and with the summary projection used by
+the listing.
+"""
+from django.db.models import F, Func, IntegerField, Sum, TextField
+from django.db.models.functions import Cast
+
+from galaxy_ng.app.api.v1.models import LARGE_METADATA_KEYS, JSONBWithoutKeys, LegacyRole
+
+
+class OctetLength(Func):
+    function = "octet_length"
+    output_field = IntegerField()
+
+
+def run(page_sizes=(10, 100, 1000)):
+    summary = JSONBWithoutKeys(F("full_metadata"), LARGE_METADATA_KEYS)
+    for page_size in page_sizes:
+        pks = list(
+            LegacyRole.objects.order_by("created").values_list("pk", flat=True)[:page_size]
+        )
+        sizes = LegacyRole.objects.filter(pk__in=pks).aggregate(
+            full=Sum(OctetLength(Cast("full_metadata", TextField()))),
+            summary=Sum(OctetLength(Cast(summary, TextField()))),
+        )
+        full = sizes["full"] or 0
+        projected = sizes["summary"] or 0
+        saved = 100 * (full - projected) / full if full else 0
+        print(
+            f"page_size={page_size} ({len(pks)} roles): full_metadata {full} bytes, "
+            f"summary {projected} bytes ({saved:.1f}% less)"
+        )
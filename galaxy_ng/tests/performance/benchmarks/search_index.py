@@ -0,0 +1,40 @@
+"""
+Compares the latency of _ui/v1/search/ pages read from SearchIndexEntry with
+the UNION ALL queryset the search view used to build.
+"""
+from django.contrib.postgres.search import SearchQuery
+from django.db.models import F
+
+from galaxy_ng.app.models import SearchIndexEntry
+from galaxy_ng.app.utils.search_index import QUERYSET_VALUES, get_union_queryset, rank
+
+from . import report_latencies
+
+# (label, keywords, sort, offset) of the compared requests
+CASES = [
+    ("default sort", None, ["-download_count", "-last_updated"], 0),
+    ("default sort, deep page", None, ["-download_count", "-last_updated"], 10000),
+    ("keywords", "linux", ["-download_count", "-relevance"], 0),
+    ("keywords, deep page", "linux", ["-download_count", "-relevance"], 1000),
+]
+
+
+def run(iterations=100, page_size=10):
+    for label, keywords, sort, offset in CASES:
+        query = SearchQuery(keywords, search_type="websearch") if keywords else None
+
+        def union_page(query=query, sort=sort, offset=offset):
+            qs = get_union_queryset(query=query)
+            return list(qs.order_by(*sort)[offset:offset + page_size])
+
+        def index_page(query=query, sort=sort, offset=offset):
+            qs = SearchIndexEntry.objects.annotate(
+                search=F("search_vector"),
+                relevance=rank("search_vector", query),
+            )
+            if query:
+                qs = qs.filter(search_vector=query)
+            qs = qs.values(*QUERYSET_VALUES).order_by(*sort)
+            return list(qs[offset:offset + page_size])
+
+        report_latencies(label, (("union", union_page), ("index", index_page)), iterations)
@@ -0,0 +1,105 @@
+"""
+Measures the throughput of upstream_role_iterator against a local stub of
+the old-galaxy v1 api, serially and with the given concurrency levels.
+Nothing is written to the database.
+"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from galaxy_ng.app.utils.galaxy import upstream_role_iterator
+
+
+class StubUpstreamHandler(BaseHTTPRequestHandler):
+    """Serves a fake old-galaxy v1 api with a fixed latency per request."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency)
+        parsed = urlparse(self.path)
+        path = parsed.path.rstrip("/")
+
+        if path == "/api/v1/roles":
+            page = int(parse_qs(parsed.query).get("page", ["1"])[0])
+            first = (page - 1) * server.page_size + 1
+            last = min(first + server.page_size, server.roles + 1)
+            next_link = None
+            if last <= server.roles:
+                next_link = f"/api/v1/roles/?page={page + 1}"
+            return self.send_json({
+                "count": server.roles,
+                "next_link": next_link,
+                "results": [{"id": role_id} for role_id in range(first, last)],
+            })
+
+        match = re.match(r"^/api/v1/roles/(\d+)(/versions)?$", path)
+        if match:
+            role_id = int(match.group(1))
+            if match.group(2):
+                return self.send_json({
+                    "next_link": None,
+                    "results": [{"name": "1.0.0", "release_date": "2020-01-01T00:00:00Z"}],
+                })
+            return self.send_json({
+                "id": role_id,
+                "name": f"role{role_id}",
+                "github_user": f"user{role_id % server.namespaces}",
+                "summary_fields": {"namespace": {"id": role_id % server.namespaces}},
+            })
+
+        match = re.match(r"^/api/v1/namespaces/(\d+)(/owners)?$", path)
+        if match:
+            ns_id = int(match.group(1))
+            if match.group(2):
+                return self.send_json({"next_link": None, "results": [{"username": "owner"}]})
+            return self.send_json({
+                "id": ns_id,
+                "name": f"user{ns_id}",
+                "summary_fields": {},
+            })
+
+        return self.send_json({"detail": "Not found."}, status=404)
+
+
+def run(roles=200, page_size=10, namespaces=20, latency=0.05, concurrency=(1, 4, 8, 16)):
+    """`latency` is the time in seconds the stub server waits before each response."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubUpstreamHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.roles = roles
+    server.page_size = page_size
+    server.namespaces = namespaces
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    baseurl = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"Stub upstream at {baseurl}: {roles} roles, {latency * 1000:.0f}ms latency")
+
+    try:
+        for workers in concurrency:
+            start = time.perf_counter()
+            count = sum(1 for _ in upstream_role_iterator(baseurl=baseurl, concurrency=workers))
+            elapsed = time.perf_counter() - start
+            print(
+                f"concurrency={workers}: {count} roles in {elapsed:.2f}s "
+                f"({count / elapsed:.1f} roles/s)"
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -1,6 +1,8 @@
 import urllib
 
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from pulp_ansible.app.models import (
     AnsibleDistribution,
     AnsibleRepository,
@@ -10,6 +12,7 @@ from pulp_ansible.app.models import (
 )
 from galaxy_ng.app import models
 from galaxy_ng.app.constants import DeploymentMode
+from galaxy_ng.app.utils import highest_versions
 from .base import BaseTestCase, get_current_ui_url
 
 
@@ -231,6 +234,12 @@ class TestUiCollectionViewSet(BaseTestCase):
         c1 = next(i for i in response.data['data'] if i['name'] == self.collection1.name)
         self.assertEqual(c1['latest_version']['version'], '1.0.0')
 
+    def test_list_latest_version_from_index(self):
+        for repo in (self.repo1, self.repo2, self.repo3):
+            highest_versions.update_repository_version(repo.latest_version(), full=True)
+        self.test_list_count()
+        self.test_list_latest_version()
+
     def test_detail_latest_version(self):
         response = self.client.get(self.repo1_collection1_detail_url)
         self.assertEqual(response.data['latest_version']['version'], '1.0.1')
@@ -240,6 +249,35 @@ class TestUiCollectionViewSet(BaseTestCase):
         for c in response.data['data']:
             self.assertIn("my_permissions", c["namespace"]["related_fields"])
 
+    def test_list_query_count_does_not_grow_with_page_size(self):
+        for i in range(10):
+            collection = Collection.objects.create(namespace=self.namespace, name=f"paged{i}")
+            _get_create_version_in_repo(self.namespace, collection, self.repo3, version="1.0.0")
+
+        def count_queries(limit):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(f"{self.repo3_list_url}?limit={limit}")
+            self.assertEqual(len(response.data['data']), limit)
+            self.assertEqual(response.data['data'][0]['namespace']['name'], self.namespace.name)
+            return len(context.captured_queries)
+
+        self.assertEqual(count_queries(2), count_queries(10))
+
+    def test_detail_query_count_does_not_grow_with_versions(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.repo1_collection1_detail_url)
+            for version in response.data['all_versions']:
+                self.assertEqual(version['sign_state'], 'unsigned')
+            return len(context.captured_queries)
+
+        queries = count_queries()
+        for i in range(2, 6):
+            _get_create_version_in_repo(
+                self.namespace, self.collection1, self.repo1, version=f"1.0.{i}"
+            )
+        self.assertEqual(count_queries(), queries)
+
 
 @override_settings(GALAXY_DEPLOYMENT_MODE=DeploymentMode.STANDALONE.value)
 class TestUiCollectionRemoteViewSet(BaseTestCase):
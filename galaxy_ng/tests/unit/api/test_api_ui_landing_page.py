@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from galaxy_ng.app.api.ui.v1.views.landing_page import LandingPageView
+from galaxy_ng.app.models import Namespace
+from galaxy_ng.app.tasks import settings_cache
+
+from .base import BaseTestCase
+
+
+class FakeRedis:
+    """Just enough of the redis string commands used by the landing page cache."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class TestLandingPageView(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.conn = FakeRedis()
+        patcher = mock.patch.object(settings_cache, "conn", self.conn)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _get(self):
+        return LandingPageView().get(APIRequestFactory().get("/")).data
+
+    def _partner_count(self, data):
+        return data["estate"]["items"][1]["count"]
+
+    def _count_get_data(self):
+        return mock.patch.object(
+            LandingPageView, "get_data", autospec=True, side_effect=LandingPageView.get_data
+        )
+
+    def test_payload_is_cached(self):
+        with self._count_get_data() as get_data:
+            self.assertEqual(self._get(), self._get())
+        self.assertEqual(get_data.call_count, 1)
+
+    @override_settings(GALAXY_LANDING_PAGE_CACHE_TIMEOUT=0)
+    def test_cache_can_be_disabled(self):
+        with self._count_get_data() as get_data:
+            self._get()
+            self._get()
+        self.assertEqual(get_data.call_count, 2)
+        self.assertEqual(self.conn.data, {})
+
+    def test_payload_is_built_without_redis(self):
+        with mock.patch.object(settings_cache, "conn", None), \
+                self._count_get_data() as get_data:
+            self._get()
+            self._get()
+        self.assertEqual(get_data.call_count, 2)
+
+    def test_namespace_changes_drop_the_cache(self):
+        self.assertEqual(self._partner_count(self._get()), Namespace.objects.count())
+        with self.captureOnCommitCallbacks(execute=True):
+            Namespace.objects.create(name="landing_partner", company="Landing Partner")
+        self.assertEqual(self._partner_count(self._get()), Namespace.objects.count())
+
+    def test_random_partner(self):
+        Namespace.objects.all().delete()
+        self.assertEqual(LandingPageView().get_data()["recommendations"], {})
+
+        Namespace.objects.create(name="landing_partner", company="Landing Partner")
+        action = LandingPageView().get_data()["recommendations"]["recs"][0]["action"]
+        self.assertEqual(action["title"], "Check out our partner Landing Partner")
@@ -0,0 +1,69 @@
+import threading
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from galaxy_ng.app.api.v3.viewsets.collection import (
+    CollectionArtifactDownloadView,
+    get_content_app_session,
+)
+from galaxy_ng.app.common import metrics
+from galaxy_ng.app.constants import DeploymentMode
+
+URL = (
+    "http://localhost:24816/pulp/content/inbound-foo/foo-bar-1.0.0.tar.gz"
+    "?expires=1&validate_token=a:b"
+)
+
+
+class TestCollectionArtifactDownloadOffload(SimpleTestCase):
+
+    def test_accel_redirect_response(self):
+        response = CollectionArtifactDownloadView._get_accel_redirect_response(
+            "/_galaxy_content/", URL
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["X-Accel-Redirect"],
+            "/_galaxy_content/pulp/content/inbound-foo/foo-bar-1.0.0.tar.gz"
+            "?expires=1&validate_token=a:b",
+        )
+        self.assertNotIn("Content-Type", response)
+
+    @override_settings(GALAXY_DOWNLOAD_CHUNK_SIZE=65536)
+    def test_stream_releases_the_connection(self):
+        response = Mock()
+        response.raw.stream.return_value = iter([b"a", b"b"])
+        self.assertEqual(list(CollectionArtifactDownloadView._stream(response)), [b"a", b"b"])
+        response.raw.stream.assert_called_once_with(amt=65536)
+        response.close.assert_called_once()
+
+    @override_settings(
+        GALAXY_DEPLOYMENT_MODE=DeploymentMode.INSIGHTS.value,
+        GALAXY_DOWNLOAD_ACCEL_REDIRECT_LOCATION="/_galaxy_content/",
+        ANSIBLE_COLLECT_DOWNLOAD_LOG=False,
+        ANSIBLE_COLLECT_DOWNLOAD_COUNT=False,
+    )
+    def test_accel_redirect_counts_the_download(self):
+        view = CollectionArtifactDownloadView()
+        view.kwargs = {"distro_base_path": "inbound-foo", "filename": "foo-bar-1.0.0.tar.gz"}
+        distribution = Mock()
+        distribution.content_guard.cast.return_value.preauthenticate_url.return_value = URL
+
+        with patch.object(view, "_get_ansible_distribution", return_value=distribution), \
+                patch.object(metrics, "collection_artifact_download_successes") as successes:
+            response = view.get(APIRequestFactory().get("/"))
+
+        self.assertIn("X-Accel-Redirect", response)
+        successes.inc.assert_called_once()
+
+    def test_content_app_session_per_thread(self):
+        session = get_content_app_session()
+        self.assertIs(get_content_app_session(), session)
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(get_content_app_session()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], session)
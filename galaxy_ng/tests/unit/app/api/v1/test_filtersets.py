@@ -0,0 +1,57 @@
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from galaxy_ng.app.api.v1.filtersets import LegacyRoleFilter, prefix_search_query
+from galaxy_ng.app.api.v1.models import LegacyNamespace, LegacyRole
+
+
+class TestLegacyRoleSearchFilters(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        namespace = LegacyNamespace.objects.create(name="geerlingguy")
+        for name, description in (
+            ("apache", "Apache 2.x for RHEL"),
+            ("nginx", "Nginx installation for Linux"),
+            ("mysql", "MySQL server behind nginx"),
+        ):
+            LegacyRole.objects.create(
+                namespace=namespace, name=name, full_metadata={"description": description}
+            )
+
+    def _filter(self, params):
+        request = Request(APIRequestFactory().get("/api/v1/roles/", params))
+        filterset = LegacyRoleFilter(
+            request.query_params,
+            queryset=LegacyRole.objects.order_by("created"),
+            request=request,
+        )
+        return [role.name for role in filterset.qs]
+
+    def test_keywords_match_the_search_vector(self):
+        self.assertEqual(self._filter({"keywords": "rhel"}), ["apache"])
+
+    def test_keywords_match_name_substrings(self):
+        self.assertEqual(self._filter({"keywords": "pach"}), ["apache"])
+        self.assertEqual(self._filter({"keywords": "eerling"}), ["apache", "nginx", "mysql"])
+
+    def test_keywords_match_description_substrings(self):
+        self.assertEqual(self._filter({"keywords": "stallat"}), ["nginx"])
+        self.assertEqual(self._filter({"keywords": "ehind"}), ["mysql"])
+
+    def test_autocomplete_matches_word_prefixes(self):
+        self.assertEqual(self._filter({"autocomplete": "Linu"}), ["nginx"])
+        self.assertEqual(self._filter({"autocomplete": "$$"}), [])
+
+    def test_results_are_ranked(self):
+        self.assertEqual(self._filter({"keywords": "nginx"}), ["nginx", "mysql"])
+
+    def test_order_by_takes_precedence_over_rank(self):
+        self.assertEqual(
+            self._filter({"keywords": "nginx", "order_by": "name"}), ["mysql", "nginx"]
+        )
+
+    def test_prefix_search_query(self):
+        self.assertIsNone(prefix_search_query("!!"))
+        self.assertEqual(self._filter({"autocomplete": "nginx linu"}), ["nginx"])
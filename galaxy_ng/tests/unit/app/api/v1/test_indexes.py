@@ -0,0 +1,87 @@
+from django.db import connection
+from django.test import TestCase
+from pulpcore.plugin.models import Task
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from galaxy_ng.app.api.v1.filtersets import LegacyRoleFilter, LegacyRoleImportFilter
+from galaxy_ng.app.api.v1.models import LegacyNamespace, LegacyRole, LegacyRoleImport
+
+
+class TestLegacyRoleIndexes(TestCase):
+    """The hot role lookups are answered by an index instead of a table scan."""
+
+    def setUp(self):
+        super().setUp()
+        namespace = LegacyNamespace.objects.create(name="geerlingguy")
+        for name in ("apache", "nginx", "mysql"):
+            LegacyRole.objects.create(
+                namespace=namespace,
+                name=name,
+                full_metadata={
+                    "github_user": "geerlingguy",
+                    "github_repo": f"ansible-role-{name}",
+                    "tags": ["web", name],
+                },
+            )
+        task = Task.objects.create(name="legacy_role_import", state="completed")
+        LegacyRoleImport.objects.create(
+            task=task, github_user="geerlingguy", github_repo="ansible-role-apache"
+        )
+
+        # the tables are tiny, make the planner pick an index whenever one applies
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def test_find_real_role_lookup(self):
+        queryset = LegacyRole.objects.filter(
+            full_metadata__github_user="geerlingguy",
+            full_metadata__github_repo="ansible-role-apache",
+        )
+        self.assertEqual(queryset.count(), 1)
+        self.assertUsesIndex(queryset, "galaxy_legacyrole_github_idx")
+
+    def test_delete_by_url_params_lookup(self):
+        queryset = LegacyRole.objects.filter(full_metadata__github_repo="ansible-role-nginx")
+        self.assertEqual(queryset.count(), 1)
+        self.assertUsesIndex(queryset, "galaxy_legacyrole_github_idx")
+
+    def test_tags_filter(self):
+        queryset = LegacyRoleFilter().tags_filter(LegacyRole.objects.all(), "tags", "mysql")
+        self.assertEqual(queryset.count(), 1)
+        self.assertUsesIndex(queryset, "galaxy_legacyrole_tags_idx")
+
+    def test_import_github_user_filter(self):
+        queryset = LegacyRoleImportFilter(
+            {"github_user": "geerlingguy"}, queryset=LegacyRoleImport.objects.all()
+        ).qs
+        self.assertEqual(queryset.count(), 1)
+        self.assertUsesIndex(queryset, "galaxy_legacyroleimport_github_user")
+
+    def test_keywords_search(self):
+        queryset = LegacyRoleFilter(
+            {"keywords": "nginx"},
+            queryset=LegacyRole.objects.all(),
+            request=Request(APIRequestFactory().get("/api/v1/roles/", {"keywords": "nginx"})),
+        ).qs
+        self.assertEqual([role.name for role in queryset], ["nginx"])
+        self.assertUsesIndex(queryset, "galaxy_legacyrole_name_trgm")
+        self.assertUsesIndex(queryset, "galaxy_legacyns_name_trgm")
+        self.assertUsesIndex(queryset, "galaxy_legacyrole_desc_trgm")
+        self.assertUsesIndex(queryset, "galaxy_lega_search__13e661_gin")
+
+    def test_autocomplete_search(self):
+        queryset = LegacyRoleFilter(
+            {"autocomplete": "ngin"},
+            queryset=LegacyRole.objects.all(),
+            request=Request(APIRequestFactory().get("/api/v1/roles/", {"autocomplete": "ngin"})),
+        ).qs
+        self.assertEqual([role.name for role in queryset], ["nginx"])
+        self.assertUsesIndex(queryset, "galaxy_legacyrole_name_trgm")
+        self.assertUsesIndex(queryset, "galaxy_legacyns_name_trgm")
+        self.assertUsesIndex(queryset, "galaxy_legacyrole_desc_trgm")
+        self.assertUsesIndex(queryset, "galaxy_lega_search__13e661_gin")
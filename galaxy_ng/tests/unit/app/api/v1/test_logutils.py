@@ -0,0 +1,71 @@
+import logging
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from pulpcore.plugin.models import Task
+
+from galaxy_ng.app.api.v1.logutils import LegacyRoleImportHandler
+from galaxy_ng.app.api.v1.models import LegacyRoleImport
+
+
+def _record(i):
+    return logging.makeLogRecord({"msg": f"line {i}", "levelname": "INFO", "levelno": 20})
+
+
+class TestLegacyRoleImportHandler(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.task = Task.objects.create(name="legacy_role_import", state="running")
+        LegacyRoleImport.objects.create(task=self.task)
+        self.handler = LegacyRoleImportHandler(flush_size=50, flush_interval=3600)
+
+    def _emit(self, task, count):
+        with patch.object(Task, "current", return_value=task):
+            for i in range(count):
+                self.handler.emit(_record(i))
+
+    def test_records_are_appended_in_batches(self):
+        with CaptureQueriesContext(connection) as context:
+            self._emit(self.task, 120)
+            self.handler.flush()
+        self.assertEqual(len(context.captured_queries), 3)
+
+        messages = LegacyRoleImport.objects.get(task=self.task).messages
+        self.assertEqual([m["message"] for m in messages], [f"line {i}" for i in range(120)])
+        self.assertEqual(messages[0]["state"], "running")
+        self.assertEqual(messages[0]["level"], "INFO")
+
+    def test_flush_interval(self):
+        self.handler.flush_interval = 0
+        self._emit(self.task, 3)
+        self.assertEqual(len(LegacyRoleImport.objects.get(task=self.task).messages), 3)
+
+    def test_flush_level(self):
+        self._emit(self.task, 3)
+        self.assertEqual(LegacyRoleImport.objects.get(task=self.task).messages, [])
+
+        warning = logging.makeLogRecord({"msg": "careful", "levelname": "WARNING", "levelno": 30})
+        with patch.object(Task, "current", return_value=self.task):
+            self.handler.emit(warning)
+        messages = LegacyRoleImport.objects.get(task=self.task).messages
+        self.assertEqual(
+            [m["message"] for m in messages], ["line 0", "line 1", "line 2", "careful"]
+        )
+
+    def test_tasks_without_import_are_written_once(self):
+        other = Task.objects.create(name="legacy_sync_from_upstream", state="running")
+        with CaptureQueriesContext(connection) as context:
+            self._emit(other, 200)
+            self.handler.flush()
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_get_messages_from_offset(self):
+        self._emit(self.task, 120)
+        self.handler.flush()
+        messages = LegacyRoleImport.get_messages(self.task.pk, offset=100)
+        self.assertEqual([m["message"] for m in messages], [f"line {i}" for i in range(100, 120)])
+        self.assertEqual(LegacyRoleImport.get_messages(self.task.pk, offset=500), [])
+        self.assertIsNone(LegacyRoleImport.get_messages(Task().pk))
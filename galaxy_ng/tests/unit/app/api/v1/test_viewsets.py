@@ -0,0 +1,110 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from galaxy_ng.app.api.v1.models import (
+    LegacyNamespace,
+    LegacyRole,
+    LegacyRoleDownloadCount,
+)
+from galaxy_ng.app.api.v1.serializers import LegacyRoleSerializer
+from galaxy_ng.app.api.v1.viewsets.namespaces import LegacyNamespacesViewSet
+from galaxy_ng.app.api.v1.viewsets.roles import LegacyRolesViewSet
+from galaxy_ng.app.constants import DeploymentMode
+from galaxy_ng.app.models import Namespace
+from galaxy_ng.app.utils.rbac import add_user_to_v3_namespace
+
+User = get_user_model()
+
+
+@override_settings(GALAXY_DEPLOYMENT_MODE=DeploymentMode.STANDALONE.value)
+class TestLegacyRolesViewSet(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(username="admin", is_superuser=True)
+        provider = Namespace.objects.create(name="provider")
+        for i in range(3):
+            namespace = LegacyNamespace.objects.create(name=f"legacy{i}", namespace=provider)
+            for j in range(10):
+                role = LegacyRole.objects.create(
+                    namespace=namespace,
+                    name=f"role{j}",
+                    full_metadata={
+                        "github_user": namespace.name,
+                        "versions": [],
+                        "readme": "x" * 10000,
+                        "readme_html": "<p>x</p>" * 1000,
+                    },
+                )
+                if j % 2:
+                    LegacyRoleDownloadCount.objects.create(legacyrole=role, count=j)
+
+    def _list(self, page_size):
+        request = APIRequestFactory().get("/api/v1/roles/", {"page_size": page_size})
+        force_authenticate(request, user=self.user)
+        response = LegacyRolesViewSet.as_view({"get": "list"})(request)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        counts = []
+        for page_size in (1, 10, 30):
+            with CaptureQueriesContext(connection) as context:
+                response = self._list(page_size)
+            self.assertEqual(len(response.data["results"]), page_size)
+            counts.append(len(context.captured_queries))
+        self.assertEqual(len(set(counts)), 1, counts)
+
+    def test_same_data_as_unjoined_queryset(self):
+        results = self._list(30).data["results"]
+        roles = LegacyRole.objects.order_by("created")
+        self.assertEqual(results, LegacyRoleSerializer(roles, many=True).data)
+        self.assertEqual(
+            sorted(role["download_count"] for role in results),
+            sorted([0] * 15 + [1, 3, 5, 7, 9] * 3),
+        )
+
+    def test_list_does_not_load_the_readmes(self):
+        role = LegacyRole.objects.with_summary_metadata().first()
+        self.assertIn("full_metadata", role.get_deferred_fields())
+        self.assertEqual(set(role.summary_metadata), {"github_user", "versions"})
+
+        role.refresh_from_db(fields=["full_metadata"])
+        self.assertEqual(len(role.full_metadata["readme"]), 10000)
+
+
+@override_settings(GALAXY_DEPLOYMENT_MODE=DeploymentMode.STANDALONE.value)
+class TestLegacyNamespacesViewSet(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(username="admin", is_superuser=True)
+        for i in range(10):
+            provider = Namespace.objects.create(name=f"provider{i}")
+            owner = User.objects.create(username=f"owner{i}")
+            add_user_to_v3_namespace(owner, provider)
+            LegacyNamespace.objects.create(name=f"legacy{i}", namespace=provider)
+
+    def _list(self, page_size):
+        request = APIRequestFactory().get("/api/v1/namespaces/", {"page_size": page_size})
+        force_authenticate(request, user=self.user)
+        response = LegacyNamespacesViewSet.as_view({"get": "list"})(request)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        counts = []
+        for page_size in (1, 5, 10):
+            with CaptureQueriesContext(connection) as context:
+                response = self._list(page_size)
+            results = response.data["results"]
+            self.assertEqual(len(results), page_size)
+            self.assertEqual(
+                [ns["summary_fields"]["owners"][0]["username"] for ns in results],
+                [f"owner{i}" for i in range(page_size)],
+            )
+            counts.append(len(context.captured_queries))
+        self.assertEqual(len(set(counts)), 1, counts)
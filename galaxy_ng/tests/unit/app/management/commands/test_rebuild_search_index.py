@@ -0,0 +1,51 @@
+from django.core.management import call_command
+from django.test import TestCase
+
+from galaxy_ng.app.api.v1.models import LegacyNamespace, LegacyRole, LegacyRoleDownloadCount
+from galaxy_ng.app.models import SearchIndexEntry
+
+
+class TestRebuildSearchIndexCommand(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.namespace = LegacyNamespace.objects.create(name="foo")
+        self.role = LegacyRole.objects.create(
+            namespace=self.namespace,
+            name="bar",
+            full_metadata={
+                "description": "a role about databases",
+                "tags": ["database"],
+                "platforms": [{"name": "Ubuntu"}],
+                "versions": [{"version": "1.0.0"}],
+            },
+        )
+
+    def test_signals_maintain_role_entries(self):
+        entry = SearchIndexEntry.objects.get(role=self.role)
+        self.assertEqual(entry.content_type, "role")
+        self.assertEqual(entry.namespace_name, "foo")
+        self.assertEqual(entry.latest_version, "1.0.0")
+        self.assertEqual(entry.tag_names, ["database"])
+        self.assertEqual(entry.download_count, 0)
+
+        LegacyRoleDownloadCount.objects.create(legacyrole=self.role, count=10)
+        entry.refresh_from_db()
+        self.assertEqual(entry.download_count, 10)
+
+        self.role.delete()
+        self.assertFalse(SearchIndexEntry.objects.exists())
+
+    def test_rebuild_search_index(self):
+        SearchIndexEntry.objects.all().delete()
+
+        call_command("rebuild-search-index")
+
+        entry = SearchIndexEntry.objects.get(role=self.role)
+        self.assertEqual(entry.name, "bar")
+        self.assertEqual(entry.description_text, "a role about databases")
+
+    def test_rebuild_twice_and_expect_same_results(self):
+        call_command("rebuild-search-index")
+        call_command("rebuild-search-index")
+        self.assertEqual(SearchIndexEntry.objects.filter(role=self.role).count(), 1)
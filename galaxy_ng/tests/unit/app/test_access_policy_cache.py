@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from pulp_ansible.app.models import AnsibleDistribution, AnsibleRepository
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from galaxy_ng.app.access_control.access_policy import AccessPolicyBase
+from galaxy_ng.app.access_control.request_cache import get_rbac_cache
+from galaxy_ng.tests.unit.api.base import BaseTestCase
+
+
+class FakeView:
+
+    def __init__(self, obj, **kwargs):
+        self.obj = obj
+        self.kwargs = kwargs
+
+    def get_object(self):
+        return self.obj
+
+
+class TestRequestRBACCache(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        group = self._create_group("rh-identity", "owners", users=[self.user])
+        self.namespace = self._create_namespace("owned", groups=[group])
+        self.other_namespace = self._create_namespace("other")
+
+        repository = AnsibleRepository.objects.create(name="private-repo", private=True)
+        AnsibleDistribution.objects.create(
+            name="private-repo", base_path="private-repo", repository=repository
+        )
+
+    def _request(self):
+        request = Request(APIRequestFactory().get("/"))
+        request.user = self.user
+        return request
+
+    def test_same_result_as_user_has_perm(self):
+        rbac = get_rbac_cache(self._request())
+        for perm in (
+            "galaxy.upload_to_namespace",
+            "galaxy.change_namespace",
+            "galaxy.delete_namespace",
+        ):
+            for obj in (None, self.namespace, self.other_namespace):
+                self.assertEqual(rbac.has_perm(perm, obj), self.user.has_perm(perm, obj))
+
+        self.assertTrue(rbac.has_object_role(self.namespace))
+        self.assertFalse(rbac.has_object_role(self.other_namespace))
+
+    def test_cache_is_shared_by_the_request(self):
+        request = self._request()
+        self.assertIs(get_rbac_cache(request), get_rbac_cache(request))
+        self.assertIsNot(get_rbac_cache(request), get_rbac_cache(self._request()))
+
+    def test_query_count_does_not_grow_with_statements(self):
+        policy = AccessPolicyBase()
+        repo_view = FakeView(None, distro_base_path="private-repo")
+        collection_view = FakeView(SimpleNamespace(namespace="owned"))
+
+        def count_queries(statements):
+            request = self._request()
+            with CaptureQueriesContext(connection) as context:
+                for _ in range(statements):
+                    self.assertFalse(
+                        policy.v3_can_view_repo_content(request, repo_view, "list")
+                    )
+                    self.assertTrue(
+                        policy.can_update_collection(request, collection_view, "update")
+                    )
+            return len(context.captured_queries)
+
+        self.assertEqual(count_queries(1), count_queries(10))
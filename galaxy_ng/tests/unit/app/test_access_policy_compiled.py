@@ -0,0 +1,122 @@
+from itertools import product
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase
+from rest_access_policy import AccessPolicy, AccessPolicyException
+
+from galaxy_ng.app.access_control.access_policy import (
+    ACCESS_POLICY_REGISTRY,
+    AccessPolicyBase,
+    CompiledAccessPolicy,
+)
+
+STATEMENTS = [
+    {"action": ["list", "retrieve"], "principal": "authenticated", "effect": "allow"},
+    {"action": "*", "principal": "admin", "effect": "allow"},
+    {"action": "<safe_methods>", "principal": "anonymous", "effect": "allow",
+     "condition": "is_enabled"},
+    {"action": "<method:post>", "principal": "group:writers", "effect": "allow"},
+    {"action": "destroy", "principal": "id:7", "effect": "allow",
+     "condition": ["is_enabled", "has_flag:remove"]},
+    {"action": "update", "principal": "*", "effect": "deny",
+     "condition_expression": "is_enabled and not has_flag:update"},
+    {"action": ["create", "update"], "principal": "staff", "effect": "allow"},
+]
+
+
+class ConditionsPolicy(AccessPolicyBase):
+
+    def get_user_group_values(self, user):
+        return list(user.groups)
+
+    def is_enabled(self, request, view, action):
+        return request.enabled
+
+    def has_flag(self, request, view, action, flag):
+        return flag in request.flags
+
+
+def make_user(pk, superuser=False, staff=False, anonymous=False, groups=()):
+    return SimpleNamespace(
+        pk=pk,
+        is_superuser=superuser,
+        is_staff=staff,
+        is_anonymous=anonymous,
+        groups=groups,
+    )
+
+
+class TestCompiledAccessPolicy(TestCase):
+
+    def test_same_result_as_rest_access_policy(self):
+        policy = ConditionsPolicy()
+        compiled = CompiledAccessPolicy({"statements": STATEMENTS})
+        users = [
+            make_user(None, anonymous=True),
+            make_user(1),
+            make_user(2, superuser=True),
+            make_user(3, staff=True),
+            make_user(7),
+            make_user(8, groups=["writers"]),
+        ]
+        actions = ["list", "retrieve", "create", "update", "destroy", "custom"]
+        methods = ["GET", "POST", "PUT", "DELETE"]
+        flags = [set(), {"remove"}, {"update"}]
+
+        for user, action, method, enabled, request_flags in product(
+            users, actions, methods, [True, False], flags
+        ):
+            request = SimpleNamespace(
+                user=user, method=method, enabled=enabled, flags=request_flags
+            )
+            expected = AccessPolicy._evaluate_statements(
+                policy, [dict(s) for s in STATEMENTS], request, None, action
+            )
+            self.assertEqual(
+                compiled.evaluate(policy, request, None, action),
+                expected,
+                (user, action, method, enabled, request_flags),
+            )
+
+    def test_registry_compiles_once(self):
+        class Policy(AccessPolicyBase):
+            NAME = "CollectionViewSet"
+
+        view = SimpleNamespace()
+        compiled = ACCESS_POLICY_REGISTRY.get(Policy, view)
+        self.assertIsInstance(compiled, CompiledAccessPolicy)
+        self.assertIs(ACCESS_POLICY_REGISTRY.get(Policy, view), compiled)
+        self.assertIs(Policy.get_access_policy(view), compiled)
+
+    def test_conditions_are_resolved_once_per_policy_class(self):
+        compiled = CompiledAccessPolicy({"statements": STATEMENTS})
+        request = SimpleNamespace(user=make_user(7), method="DELETE", enabled=True, flags=set())
+
+        with mock.patch.object(
+            ConditionsPolicy, "_get_condition_method", autospec=True
+        ) as get_condition_method:
+            for _ in range(3):
+                compiled.evaluate(ConditionsPolicy(), request, None, "destroy")
+        get_condition_method.assert_not_called()
+
+        statement = compiled.statements_for("destroy", "DELETE")[-1]
+        checks = statement.get_condition_checks(ConditionsPolicy())
+        self.assertEqual(
+            checks,
+            (
+                ("is_enabled", ConditionsPolicy.is_enabled, ()),
+                ("has_flag:remove", ConditionsPolicy.has_flag, ("remove",)),
+            ),
+        )
+        self.assertIs(statement.get_condition_checks(ConditionsPolicy()), checks)
+
+    def test_condition_must_return_bool(self):
+        class Policy(ConditionsPolicy):
+            def is_enabled(self, request, view, action):
+                return None
+
+        compiled = CompiledAccessPolicy({"statements": STATEMENTS})
+        request = SimpleNamespace(user=make_user(None, anonymous=True), method="GET")
+        with self.assertRaisesMessage(AccessPolicyException, "is_enabled"):
+            compiled.evaluate(Policy(), request, None, "list")
@@ -1,7 +1,12 @@
+import base64
+import json
 from unittest.mock import Mock
 
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from pulp_ansible.app.models import AnsibleDistribution, AnsibleRepository
 from pulpcore.plugin.models.role import Role
 
@@ -55,3 +60,40 @@ class TestRHIdentityAuth(BaseTestCase):
 
         # assert objects do not exist: repo
         self.assertFalse(AnsibleRepository.objects.filter(name=synclist_name))
+
+    def _authenticate(self, x_rh_identity):
+        request = Mock()
+        request.META = {"HTTP_X_RH_IDENTITY": x_rh_identity}
+        with self.captureOnCommitCallbacks(execute=True):
+            user, _ = RHIdentityAuthentication().authenticate(request)
+        return user
+
+    @override_settings(GALAXY_RH_IDENTITY_CACHE_TIMEOUT=300)
+    def test_authenticate_cached_identity(self):
+        cache.clear()
+        x_rh_identity = rh_auth_utils.user_x_rh_identity("user_testing_cache", "13579")
+        user = self._authenticate(x_rh_identity)
+
+        # only the user is loaded, nothing is provisioned again
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self._authenticate(x_rh_identity), user)
+        self.assertEqual(len(context.captured_queries), 1)
+
+        # a changed attribute provisions again
+        token = json.loads(base64.b64decode(x_rh_identity))
+        token["identity"]["user"]["email"] = "changed@example.com"
+        x_rh_identity = base64.b64encode(json.dumps(token).encode())
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self._authenticate(x_rh_identity).email, "changed@example.com")
+        self.assertGreater(len(context.captured_queries), 1)
+
+    @override_settings(GALAXY_RH_IDENTITY_CACHE_TIMEOUT=300)
+    def test_authenticate_cached_identity_of_deleted_user(self):
+        cache.clear()
+        x_rh_identity = rh_auth_utils.user_x_rh_identity("user_testing_deleted", "97531")
+        self._authenticate(x_rh_identity)
+        User.objects.filter(username="user_testing_deleted").delete()
+
+        user = self._authenticate(x_rh_identity)
+        self.assertEqual(user.username, "user_testing_deleted")
+        self.assertTrue(user.groups.filter(name="rh-identity-account:97531").exists())
@@ -0,0 +1,80 @@
+from unittest import mock
+
+import redis
+from django.test import TestCase, override_settings
+
+from galaxy_ng.app.api.v1.models import LegacyNamespace, LegacyRole, LegacyRoleDownloadCount
+from galaxy_ng.app.tasks import download_counts
+
+
+class FakeRedis:
+    """Just enough of the redis hash commands used by the download counters."""
+
+    def __init__(self):
+        self.data = {}
+
+    def hincrby(self, key, field, amount):
+        hash_ = self.data.setdefault(key, {})
+        hash_[str(field)] = str(int(hash_.get(str(field), 0)) + amount)
+
+    def exists(self, key):
+        return key in self.data
+
+    def rename(self, key, new_key):
+        if key not in self.data:
+            raise redis.ResponseError("no such key")
+        self.data[new_key] = self.data.pop(key)
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.data.get(key, {}).pop(field, None)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+class TestDownloadCounts(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        namespace = LegacyNamespace.objects.create(name="foo")
+        self.role = LegacyRole.objects.create(namespace=namespace, name="bar")
+
+    def _count(self):
+        counter = LegacyRoleDownloadCount.objects.filter(legacyrole=self.role).first()
+        return counter.count if counter else 0
+
+    @override_settings(GALAXY_BUFFER_DOWNLOAD_COUNTS=False)
+    def test_direct_write_when_buffering_is_disabled(self):
+        download_counts.count_role_download(self.role)
+        download_counts.count_role_download(self.role)
+        self.assertEqual(self._count(), 2)
+
+    @override_settings(GALAXY_BUFFER_DOWNLOAD_COUNTS=True)
+    def test_direct_write_when_redis_is_unreachable(self):
+        conn = mock.Mock()
+        conn.hincrby.side_effect = redis.ConnectionError("down")
+        with mock.patch.object(download_counts.settings_cache, "conn", conn):
+            download_counts.count_role_download(self.role)
+        self.assertEqual(self._count(), 1)
+
+    @override_settings(GALAXY_BUFFER_DOWNLOAD_COUNTS=True)
+    def test_buffered_counts_are_flushed(self):
+        conn = FakeRedis()
+        with mock.patch.object(download_counts.settings_cache, "conn", conn), \
+                mock.patch.object(download_counts.settings_cache, "acquire_lock") as lock, \
+                mock.patch.object(download_counts.settings_cache, "release_lock"):
+            lock.return_value = "token"
+            for _ in range(3):
+                download_counts.count_role_download(self.role)
+            self.assertEqual(self._count(), 0)
+
+            download_counts.flush_download_counts()
+            self.assertEqual(self._count(), 3)
+
+            # nothing left to flush, the counter must not change
+            download_counts.flush_download_counts()
+            self.assertEqual(self._count(), 3)
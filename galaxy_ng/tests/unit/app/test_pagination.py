@@ -0,0 +1,157 @@
+import datetime
+
+import pytest
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db.models import F
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from galaxy_ng.app.api.pagination import (
+    KeysetLimitOffsetPagination,
+    decode_cursor,
+    encode_cursor,
+)
+from galaxy_ng.app.api.v1.models import LegacyNamespace, LegacyRole
+from galaxy_ng.app.api.v1.viewsets.roles import LegacyRolesSetPagination
+from galaxy_ng.app.models import SearchIndexEntry
+from galaxy_ng.app.utils.search_index import rank
+
+
+class TestKeysetPagination(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.factory = APIRequestFactory()
+        namespace = LegacyNamespace.objects.create(name="foo")
+        for name in ["a", "b", "c", "d", "e"]:
+            LegacyRole.objects.create(namespace=namespace, name=name)
+        self.queryset = LegacyRole.objects.all().order_by("name")
+
+    def _request(self, url):
+        return Request(self.factory.get(url))
+
+    def _walk(self, paginator_class, url, page_size_param, queryset=None):
+        queryset = self.queryset if queryset is None else queryset
+        names = []
+        url = f"{url}?cursor=&{page_size_param}=2"
+        while url:
+            paginator = paginator_class()
+            page = paginator.paginate_queryset(queryset, self._request(url))
+            self.assertTrue(paginator.cursor_mode)
+            names.extend(paginator.get_keyset_value(row, "name") for row in page)
+            url = paginator.next_cursor and paginator.get_cursor_link(paginator.next_cursor)
+        return names
+
+    def test_cursor_roundtrip(self):
+        token = encode_cursor([10, "foo", 3])
+        self.assertEqual(decode_cursor(token, 3), [10, "foo", 3])
+        with pytest.raises(NotFound):
+            decode_cursor(token, 2)
+        with pytest.raises(NotFound):
+            decode_cursor("not-a-cursor", 3)
+
+    def test_page_number_cursor_walks_every_row_once(self):
+        names = self._walk(LegacyRolesSetPagination, "/api/v1/roles/", "page_size")
+        self.assertEqual(names, ["a", "b", "c", "d", "e"])
+
+    def test_limit_offset_cursor_walks_every_row_once(self):
+        names = self._walk(KeysetLimitOffsetPagination, "/api/_ui/v1/search/", "limit")
+        self.assertEqual(names, ["a", "b", "c", "d", "e"])
+
+    def test_cursor_keeps_microseconds(self):
+        # all the roles are created within the same millisecond
+        start = timezone.now().replace(microsecond=0)
+        for i, role in enumerate(LegacyRole.objects.order_by("name")):
+            role.created = start + datetime.timedelta(microseconds=(5 - i) * 100)
+            role.save(update_fields=["created"])
+
+        queryset = LegacyRole.objects.order_by("created")
+        names = self._walk(LegacyRolesSetPagination, "/api/v1/roles/", "page_size", queryset)
+        self.assertEqual(names, ["e", "d", "c", "b", "a"])
+
+    def test_cursor_walks_relevance_ordering(self):
+        for name, text, download_count in (
+            ("a", "linux linux", 0),
+            ("b", "linux", 0),
+            ("c", "linux web", 0),
+            ("d", "linux linux linux", 0),
+            ("e", "linux", 1),
+            ("f", "linux", 0),
+        ):
+            SearchIndexEntry.objects.create(
+                content_type="role",
+                namespace_name="foo",
+                name=name,
+                description_text=text,
+                download_count=download_count,
+                last_updated=timezone.now(),
+            )
+        SearchIndexEntry.objects.update(search_vector=SearchVector(F("description_text")))
+
+        query = SearchQuery("linux", search_type="websearch")
+        queryset = SearchIndexEntry.objects.annotate(
+            relevance=rank("search_vector", query)
+        ).values("pk", "name", "relevance", "download_count").order_by(
+            "-download_count", "-relevance"
+        )
+        expected = [row["name"] for row in queryset.order_by("-download_count", "-relevance", "pk")]
+
+        names = self._walk(
+            KeysetLimitOffsetPagination, "/api/_ui/v1/search/", "limit", queryset
+        )
+        self.assertEqual(names, expected)
+
+    def test_cursor_walks_sql_search_default_ordering(self):
+        now = timezone.now()
+        for i, name in enumerate(["a", "b", "c", "d", "e"]):
+            SearchIndexEntry.objects.create(
+                content_type="role",
+                namespace_name="foo",
+                name=name,
+                download_count=i % 2,
+                last_updated=now - datetime.timedelta(microseconds=i),
+            )
+        queryset = SearchIndexEntry.objects.values("pk", "name").order_by(
+            "-download_count", "-last_updated"
+        )
+
+        names = self._walk(
+            KeysetLimitOffsetPagination, "/api/_ui/v1/search/", "limit", queryset
+        )
+        self.assertEqual(names, ["b", "d", "a", "c", "e"])
+
+    def test_cursor_rejects_ordering_without_keyset(self):
+        paginator = LegacyRolesSetPagination()
+        paginator.page_size = 2
+        with pytest.raises(ValidationError):
+            paginator.paginate_queryset(
+                LegacyRole.objects.order_by(F("name").desc()),
+                self._request("/api/v1/roles/?cursor="),
+            )
+        page = paginator.paginate_queryset(
+            LegacyRole.objects.order_by(F("name").desc()),
+            self._request("/api/v1/roles/"),
+        )
+        self.assertEqual([role.name for role in page], ["e", "d"])
+
+    def test_cursor_mode_keeps_response_shape(self):
+        paginator = LegacyRolesSetPagination()
+        paginator.page_size = 2
+        page = paginator.paginate_queryset(
+            self.queryset, self._request("/api/v1/roles/?cursor=")
+        )
+        data = paginator.get_paginated_response([role.name for role in page]).data
+        self.assertEqual(set(data.keys()), {"count", "next", "previous", "results"})
+        self.assertEqual(data["count"], 5)
+        self.assertIn("cursor=", data["next"])
+
+    def test_estimated_count(self):
+        paginator = LegacyRolesSetPagination()
+        paginator.page_size = 2
+        paginator.paginate_queryset(
+            self.queryset, self._request("/api/v1/roles/?estimate_count=true")
+        )
+        self.assertIsInstance(paginator.page.paginator.count, int)
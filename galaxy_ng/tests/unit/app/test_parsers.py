@@ -0,0 +1,137 @@
+import io
+import tracemalloc
+
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from galaxy_ng.app.common.parsers import AnsibleGalaxy29MultiPartParser, CRLFFixingStream
+
+BOUNDARY = b'--------------------------abcdef'
+SHA256 = b'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855'
+
+
+def make_body(content, crlf=True):
+    return b'\r\n'.join([
+        b'--' + BOUNDARY,
+        b'Content-Disposition: form-data; name="sha256"',
+        (b'\r\n' if crlf else b'') + SHA256,
+        b'--' + BOUNDARY,
+        b'Content-Disposition: file; name="file"; filename="foo-bar-1.0.0.tar.gz"',
+        b'Content-Type: application/octet-stream',
+        b'',
+        content,
+        b'--' + BOUNDARY + b'--',
+        b'',
+    ])
+
+
+class TrickleStream(io.BytesIO):
+    """Returns at most a few bytes per read, like a slow client."""
+
+    def read(self, size=-1):
+        return super().read(3 if size is None or size < 0 else min(size, 3))
+
+
+class SyntheticStream:
+    """A multipart body of `size` bytes generated while it is read."""
+
+    def __init__(self, size):
+        self._head, tail = make_body(b'', crlf=False).split(b'\r\n--' + BOUNDARY + b'--')
+        self._tail = b'\r\n--' + BOUNDARY + b'--' + tail
+        self._remaining = size
+        self.length = len(self._head) + size + len(self._tail)
+
+    def read(self, size=-1):
+        if self._head:
+            data, self._head = self._head[:size], self._head[size:]
+            return data
+        if not self._remaining:
+            data, self._tail = self._tail[:size], self._tail[size:]
+            return data
+        size = min(size, self._remaining)
+        self._remaining -= size
+        return bytes(size)
+
+
+def read_all(stream, size):
+    chunks = []
+    while chunk := stream.read(size):
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+class TestCRLFFixingStream(TestCase):
+
+    def test_adds_missing_crlf(self):
+        for size in (1, 7, 64, 65536, -1):
+            fixes = []
+            stream = CRLFFixingStream(
+                TrickleStream(make_body(b'data', crlf=False)),
+                on_fix=lambda fixes=fixes: fixes.append(1),
+            )
+            self.assertEqual(read_all(stream, size), make_body(b'data'))
+            self.assertEqual(fixes, [1])
+
+    def test_well_formed_body_is_unchanged(self):
+        fixes = []
+        stream = CRLFFixingStream(
+            io.BytesIO(make_body(b'data')), on_fix=lambda fixes=fixes: fixes.append(1)
+        )
+        self.assertEqual(read_all(stream, 1024), make_body(b'data'))
+        self.assertEqual(fixes, [])
+
+    def test_memory_does_not_grow_with_artifact_size(self):
+        size = 1024 ** 3
+        stream = CRLFFixingStream(SyntheticStream(size))
+
+        tracemalloc.start()
+        try:
+            read = 0
+            while chunk := stream.read(1024 ** 2):
+                read += len(chunk)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertGreater(read, size)
+        self.assertLess(peak, 8 * 1024 ** 2)
+
+
+class TestAnsibleGalaxy29MultiPartParser(TestCase):
+
+    def test_parse_malformed_body(self):
+        content = b'\x1f\x8b' + bytes(4096)
+        for crlf in (True, False):
+            request = Request(
+                APIRequestFactory().generic(
+                    'POST',
+                    '/',
+                    data=make_body(content, crlf=crlf),
+                    content_type=f'multipart/form-data; boundary={BOUNDARY.decode()}',
+                ),
+                parsers=[AnsibleGalaxy29MultiPartParser()],
+            )
+            self.assertEqual(request.data['sha256'], SHA256.decode())
+            self.assertEqual(request.FILES['file'].read(), content)
+
+    def test_memory_does_not_grow_with_artifact_size(self):
+        size = 64 * 1024 ** 2
+        stream = SyntheticStream(size)
+        request = APIRequestFactory().post('/')
+        request.META['CONTENT_LENGTH'] = str(stream.length)
+        content_type = f'multipart/form-data; boundary={BOUNDARY.decode()}'
+
+        tracemalloc.start()
+        try:
+            data, files = AnsibleGalaxy29MultiPartParser().parse(
+                stream, media_type=content_type, parser_context={'request': request}
+            )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(data['sha256'], SHA256.decode())
+        self.assertEqual(files['file'].size, size)
+        # the upload handlers spool the file part to disk
+        self.assertLess(peak, 8 * 1024 ** 2)
@@ -0,0 +1,83 @@
+from unittest.mock import Mock, patch
+
+from crum import set_current_request
+from django.test import TestCase, override_settings
+
+from galaxy_ng.app.tasks import settings_cache
+from galaxy_ng.app.tasks.settings_cache import SettingsSnapshot
+
+
+class FakeRequest:
+    pass
+
+
+@override_settings(GALAXY_DYNAMIC_SETTINGS_CHECK_INTERVAL=3600)
+class TestSettingsSnapshot(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.snapshot = SettingsSnapshot()
+        self.version = "1"
+        self.data = {"GALAXY_REQUIRE_CONTENT_APPROVAL": "false"}
+        for name, mock in (
+            ("get_settings_version", Mock(side_effect=lambda: self.version)),
+            ("get_settings_from_cache", Mock(side_effect=lambda: dict(self.data))),
+            ("get_settings_from_db", Mock(return_value={})),
+        ):
+            patcher = patch.object(settings_cache, name, mock)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+        self.addCleanup(set_current_request, None)
+        self.parse = Mock(
+            side_effect=lambda data, source: data.get("GALAXY_REQUIRE_CONTENT_APPROVAL")
+        )
+
+    def get(self, default=True):
+        return self.snapshot.get("GALAXY_REQUIRE_CONTENT_APPROVAL", default, self.parse)
+
+    def test_keys_are_parsed_once_per_generation(self):
+        for _ in range(5):
+            self.assertEqual(self.get(), "false")
+        self.assertEqual(self.parse.call_count, 1)
+        self.assertEqual(self.get_settings_from_cache.call_count, 1)
+
+        self.version = "2"
+        self.data = {"GALAXY_REQUIRE_CONTENT_APPROVAL": "true"}
+        self.snapshot.checked_at = None
+        self.assertEqual(self.get(), "true")
+        self.assertEqual(self.parse.call_count, 2)
+
+    def test_version_is_checked_once_per_request(self):
+        set_current_request(FakeRequest())
+        for _ in range(5):
+            self.get()
+        self.assertEqual(self.get_settings_version.call_count, 1)
+
+        self.version = "2"
+        self.data = {"GALAXY_REQUIRE_CONTENT_APPROVAL": "true"}
+        self.assertEqual(self.get(), "false")
+
+        set_current_request(FakeRequest())
+        self.assertEqual(self.get(), "true")
+        self.assertEqual(self.get_settings_version.call_count, 2)
+
+    def test_invalidate_reloads_within_the_request(self):
+        set_current_request(FakeRequest())
+        self.get()
+        self.data = {"GALAXY_REQUIRE_CONTENT_APPROVAL": "true"}
+        self.snapshot.invalidate()
+        self.assertEqual(self.get(), "true")
+
+    def test_changed_static_value_is_parsed_again(self):
+        self.get(default=True)
+        self.get(default=False)
+        self.assertEqual(self.parse.call_count, 2)
+
+    def test_without_redis_data_is_reloaded_at_every_check(self):
+        self.version = None
+        set_current_request(FakeRequest())
+        self.get()
+        self.get()
+        set_current_request(FakeRequest())
+        self.get()
+        self.assertEqual(self.get_settings_from_cache.call_count, 2)
@@ -0,0 +1,50 @@
+import datetime
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+from social_django.models import UserSocialAuth
+
+from galaxy_ng.app.auth.token import ExpiringTokenAuthentication
+from galaxy_ng.app.models import User
+
+
+@override_settings(GALAXY_TOKEN_EXPIRATION=60)
+class TestExpiringTokenAuthentication(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(username="token_user")
+        self.token = Token.objects.create(user=self.user)
+        self.auth = ExpiringTokenAuthentication()
+
+    def test_single_query(self):
+        with CaptureQueriesContext(connection) as context:
+            user, token = self.auth.authenticate_credentials(self.token.key)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual((user, token), (self.user, self.token))
+
+    def test_deleted_token(self):
+        self.auth.authenticate_credentials(self.token.key)
+        Token.objects.filter(user=self.user).delete()
+        with self.assertRaisesMessage(exceptions.AuthenticationFailed, "Invalid token"):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_deactivated_user(self):
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaisesMessage(exceptions.AuthenticationFailed, "inactive"):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_expired_keycloak_token(self):
+        Token.objects.filter(pk=self.token.pk).update(
+            created=timezone.now() - datetime.timedelta(minutes=120)
+        )
+        self.auth.authenticate_credentials(self.token.key)
+
+        UserSocialAuth.objects.create(user=self.user, provider="keycloak", uid="token_user")
+        with self.assertRaisesMessage(exceptions.AuthenticationFailed, "expired"):
+            self.auth.authenticate_credentials(self.token.key)
@@ -1,6 +1,11 @@
 import uuid
+from unittest import mock
 
 from django.test import TestCase
+from django.utils.dateparse import parse_datetime
+from galaxy_ng.app.models import UpstreamSyncCursor
+from galaxy_ng.app.utils.galaxy import SyncCheckpoint
+from galaxy_ng.app.utils.galaxy import backoff_delay
 from galaxy_ng.app.utils.galaxy import upstream_role_iterator
 from galaxy_ng.app.utils.galaxy import uuid_to_int
 from galaxy_ng.app.utils.galaxy import int_to_uuid
@@ -34,6 +39,123 @@ class TestGalaxyUtils(TestCase):
         assert count == limit
 
 
+class FakeResponse:
+
+    def __init__(self, data, status_code=200):
+        self.data = data
+        self.status_code = status_code
+
+    def json(self):
+        return self.data
+
+
+class TestParallelRoleIterator(TestCase):
+
+    baseurl = 'http://upstream'
+
+    def fake_fetch(self, url):
+        self.fetched.append(url)
+        path = url.replace(self.baseurl, '')
+        if path in ('/api/v1/roles/', '/api/v1/roles/?order_by=-modified'):
+            return FakeResponse({'next_link': '/api/v1/roles/?page=2', 'results': [
+                {'id': 1, 'modified': '2024-01-05T00:00:00Z'},
+                {'id': 2, 'modified': '2024-01-04T00:00:00Z'},
+                {'id': 3, 'modified': '2024-01-03T00:00:00Z'},
+            ]})
+        if path == '/api/v1/roles/?page=2':
+            return FakeResponse({'next_link': None, 'results': [
+                {'id': 4, 'modified': '2024-01-01T00:00:00Z'},
+                {'id': 5, 'modified': '2023-12-01T00:00:00Z'},
+            ]})
+        if path == '/api/v1/roles/3/':
+            return FakeResponse({'detail': 'Not found.'}, status_code=404)
+        if path.startswith('/api/v1/roles/') and path.endswith('/versions'):
+            return FakeResponse({'next_link': None, 'results': [{'name': '1.0.0'}]})
+        if path.startswith('/api/v1/roles/'):
+            role_id = int(path.split('/')[4])
+            return FakeResponse({
+                'id': role_id,
+                'summary_fields': {'namespace': {'id': 10}},
+            })
+        if path == '/api/v1/namespaces/10/':
+            return FakeResponse({'id': 10, 'name': 'foo', 'summary_fields': {}})
+        if path == '/api/v1/namespaces/10/owners/':
+            return FakeResponse({'next_link': None, 'results': [{'username': 'bar'}]})
+        raise AssertionError(f'unexpected url {url}')
+
+    def setUp(self):
+        super().setUp()
+        self.fetched = []
+        patcher = mock.patch('galaxy_ng.app.utils.galaxy.safe_fetch', side_effect=self.fake_fetch)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_roles_are_yielded_in_upstream_order(self):
+        results = list(upstream_role_iterator(baseurl=self.baseurl, concurrency=4))
+        assert [role['id'] for _, role, _ in results] == [1, 2, 4, 5]
+        assert all(versions == [{'name': '1.0.0'}] for _, _, versions in results)
+        assert results[0][0]['summary_fields']['owners'] == [{'username': 'bar'}]
+
+    def test_namespace_is_fetched_once(self):
+        list(upstream_role_iterator(baseurl=self.baseurl, concurrency=4))
+        assert self.fetched.count(self.baseurl + '/api/v1/namespaces/10/') == 1
+
+    def test_limit(self):
+        results = list(upstream_role_iterator(baseurl=self.baseurl, concurrency=4, limit=2))
+        assert [role['id'] for _, role, _ in results] == [1, 2]
+
+    def test_checkpoint_resumes_interrupted_sync(self):
+        iterator = upstream_role_iterator(
+            baseurl=self.baseurl,
+            concurrency=2,
+            checkpoint=SyncCheckpoint('roles', self.baseurl),
+        )
+        assert next(iterator)[1]['id'] == 1
+        assert next(iterator)[1]['id'] == 2
+        iterator.close()
+
+        cursor = UpstreamSyncCursor.objects.get(source='roles', baseurl=self.baseurl)
+        assert cursor.completed_ids == [1]
+        assert cursor.last_success_at is None
+
+        results = list(upstream_role_iterator(
+            baseurl=self.baseurl,
+            concurrency=2,
+            checkpoint=SyncCheckpoint('roles', self.baseurl),
+        ))
+        assert [role['id'] for _, role, _ in results] == [2, 4, 5]
+
+        cursor.refresh_from_db()
+        assert cursor.page_url is None
+        assert cursor.last_success_at is not None
+
+    def test_missing_roles_are_marked_done(self):
+        checkpoint = SyncCheckpoint('roles', self.baseurl)
+        with mock.patch.object(checkpoint, 'item_done', wraps=checkpoint.item_done) as item_done:
+            list(upstream_role_iterator(
+                baseurl=self.baseurl, concurrency=2, checkpoint=checkpoint
+            ))
+        assert [c.args[0] for c in item_done.call_args_list] == [1, 2, 3, 4, 5]
+
+    def test_incremental_sync_stops_at_unchanged_roles(self):
+        UpstreamSyncCursor.objects.create(
+            source='roles',
+            baseurl=self.baseurl,
+            last_success_at=parse_datetime('2024-01-02T00:00:00Z'),
+        )
+        checkpoint = SyncCheckpoint('roles', self.baseurl, incremental=True)
+        results = list(upstream_role_iterator(
+            baseurl=self.baseurl, concurrency=2, checkpoint=checkpoint
+        ))
+        assert [role['id'] for _, role, _ in results] == [1, 2]
+        assert self.baseurl + '/api/v1/roles/4/' not in self.fetched
+
+    def test_backoff_delay_is_bounded(self):
+        for attempt in range(10):
+            delay = backoff_delay(attempt)
+            assert 0 < delay <= 60
+
+
 class UUIDConversionTestCase(TestCase):
 
     def test_uuid_to_int_and_back(self):
@@ -0,0 +1,57 @@
+from django.test import TestCase
+from pulp_ansible.app.models import AnsibleRepository, Collection, CollectionVersion
+
+from galaxy_ng.app.models import HighestCollectionVersion
+from galaxy_ng.app.utils import highest_versions
+
+
+class TestHighestVersions(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.repo = AnsibleRepository.objects.create(name="the_repo", retain_repo_versions=10)
+        self.foo = Collection.objects.create(namespace="ns", name="foo")
+        self.bar = Collection.objects.create(namespace="ns", name="bar")
+
+    def _add(self, collection, version):
+        cv = CollectionVersion.objects.create(
+            namespace=collection.namespace,
+            name=collection.name,
+            collection=collection,
+            version=version,
+        )
+        with self.repo.new_version() as new_version:
+            new_version.add_content(CollectionVersion.objects.filter(pk=cv.pk))
+        return cv
+
+    def _indexed(self, repository_version):
+        return dict(
+            HighestCollectionVersion.objects.filter(
+                repository_version=repository_version
+            ).values_list("collection_id", "collection_version__version")
+        )
+
+    def test_find_highest_versions(self):
+        rows = [
+            ("foo", 1, "1.10.0"),
+            ("foo", 2, "1.9.0"),
+            ("foo", 3, "2.0.0-beta.1"),
+            ("bar", 4, "0.1.0"),
+        ]
+        self.assertEqual(highest_versions.find_highest_versions(rows), {"foo": 3, "bar": 4})
+
+    def test_incremental_update_matches_full_rebuild(self):
+        self._add(self.foo, "1.0.0")
+        self._add(self.bar, "1.0.0")
+        highest_versions.update_repository_version(self.repo.latest_version(), full=True)
+
+        for version in ("1.10.0", "1.9.0"):
+            self._add(self.foo, version)
+            highest_versions.update_repository_version(self.repo.latest_version())
+
+        latest = self.repo.latest_version()
+        incremental = self._indexed(latest)
+        self.assertEqual(incremental, {self.foo.pk: "1.10.0", self.bar.pk: "1.0.0"})
+
+        highest_versions.update_repository_version(latest, full=True)
+        self.assertEqual(self._indexed(latest), incremental)
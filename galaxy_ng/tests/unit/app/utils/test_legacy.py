@@ -0,0 +1,71 @@
+from django.test import TestCase
+
+from galaxy_ng.app.api.v1.models import LegacyNamespace
+from galaxy_ng.app.api.v1.models import LegacyRole
+from galaxy_ng.app.api.v1.models import LegacyRoleDownloadCount
+from galaxy_ng.app.utils.legacy import LegacyRoleSyncWriter
+from galaxy_ng.app.utils.legacy import metadata_hash
+from galaxy_ng.app.utils.legacy import metadata_value_md5
+
+
+class TestLegacyRoleSyncWriter(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.namespace = LegacyNamespace.objects.create(name='foo')
+
+    def test_metadata_hash_ignores_key_order(self):
+        assert metadata_hash({'a': 1, 'b': [1, 2]}) == metadata_hash({'b': [1, 2], 'a': 1})
+        assert metadata_hash({'a': 1}) != metadata_hash({'a': 2})
+
+    def test_insert_update_and_skip(self):
+        unchanged = LegacyRole.objects.create(
+            namespace=self.namespace, name='unchanged', full_metadata={'description': 'same'}
+        )
+        changed = LegacyRole.objects.create(
+            namespace=self.namespace, name='changed', full_metadata={'description': 'old'}
+        )
+        LegacyRoleDownloadCount.objects.create(legacyrole=changed, count=1)
+
+        writer = LegacyRoleSyncWriter(batch_size=2)
+        writer.add(self.namespace, 'unchanged', {'description': 'same'}, 5)
+        writer.add(self.namespace, 'changed', {'description': 'new'}, 10)
+        writer.add(self.namespace, 'created', {'description': 'brand new'}, 15)
+        writer.flush()
+
+        assert writer.stats == {'inserted': 1, 'updated': 1, 'skipped': 1}
+
+        changed.refresh_from_db()
+        assert changed.full_metadata == {'description': 'new'}
+        created = LegacyRole.objects.get(namespace=self.namespace, name='created')
+        assert created.full_metadata == {'description': 'brand new'}
+
+        counts = dict(
+            LegacyRoleDownloadCount.objects.values_list('legacyrole__name', 'count')
+        )
+        assert counts == {'unchanged': 5, 'changed': 10, 'created': 15}
+        assert LegacyRole.objects.get(pk=unchanged.pk).full_metadata == {'description': 'same'}
+
+    def test_readmes_are_compared_by_digest(self):
+        metadata = {'description': 'same', 'readme': '# foo', 'readme_html': '<h1>foo</h1>'}
+        LegacyRole.objects.create(namespace=self.namespace, name='same', full_metadata=metadata)
+        LegacyRole.objects.create(namespace=self.namespace, name='readme', full_metadata=metadata)
+
+        writer = LegacyRoleSyncWriter()
+        writer.add(self.namespace, 'same', dict(metadata), 1)
+        writer.add(self.namespace, 'readme', dict(metadata, readme='# bar'), 1)
+        writer.flush()
+
+        assert writer.stats == {'inserted': 0, 'updated': 1, 'skipped': 1}
+        role = LegacyRole.objects.get(namespace=self.namespace, name='readme')
+        assert role.full_metadata['readme'] == '# bar'
+
+    def test_existing_roles_are_loaded_without_readmes(self):
+        LegacyRole.objects.create(
+            namespace=self.namespace, name='role', full_metadata={'readme': '# foo'}
+        )
+        role = LegacyRole.objects.filter(name='role').with_metadata_digests().get()
+        assert 'full_metadata' in role.get_deferred_fields()
+        assert role.summary_metadata == {}
+        assert role.readme_md5 == metadata_value_md5('# foo')
+        assert role.readme_html_md5 is None
@@ -0,0 +1,100 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from galaxy_ng.app.api.v1.models import LegacyNamespace
+from galaxy_ng.app.tasks import settings_cache
+from galaxy_ng.app.utils.rbac import (
+    NAMESPACE_OWNERS_CACHE_KEY,
+    add_group_to_v3_namespace,
+    add_user_to_group,
+    add_user_to_v3_namespace,
+    filter_v3_namespaces_owned_by,
+    get_v3_namespace_owners,
+    get_v3_namespaces_owners,
+)
+from galaxy_ng.tests.unit.api.base import BaseTestCase
+
+
+class TestNamespaceOwners(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.alice = self._create_user("alice")
+        self.bob = self._create_user("bob")
+        self.carol = self._create_user("carol")
+        group = self._create_group("rh-identity", "owners", users=[self.alice, self.bob])
+        self.group = group
+
+        self.grouped = self._create_namespace("grouped", groups=[group])
+        self.direct = self._create_namespace("direct")
+        add_user_to_v3_namespace(self.carol, self.direct)
+        add_user_to_v3_namespace(self.alice, self.direct)
+        self.both = self._create_namespace("both", groups=[group])
+        add_user_to_v3_namespace(self.alice, self.both)
+        self.unowned = self._create_namespace("unowned")
+
+    def test_owners(self):
+        namespaces = [self.grouped, self.direct, self.both, self.unowned]
+        owners = get_v3_namespaces_owners(namespaces)
+
+        self.assertEqual(set(owners[self.grouped.pk]), {self.alice, self.bob})
+        self.assertEqual(set(owners[self.direct.pk]), {self.alice, self.carol})
+        self.assertEqual(set(owners[self.both.pk]), {self.alice, self.bob})
+        self.assertEqual(len(owners[self.both.pk]), 2)
+        self.assertEqual(owners[self.unowned.pk], [])
+
+        for namespace in namespaces:
+            self.assertEqual(get_v3_namespace_owners(namespace), owners[namespace.pk])
+
+    def test_query_count_does_not_grow_with_namespaces(self):
+        namespaces = [self.grouped, self.direct, self.both, self.unowned]
+
+        with CaptureQueriesContext(connection) as one:
+            get_v3_namespaces_owners(namespaces[:1])
+        with CaptureQueriesContext(connection) as many:
+            get_v3_namespaces_owners(namespaces)
+
+        self.assertEqual(len(one.captured_queries), len(many.captured_queries))
+
+    def test_filter_owned_by(self):
+        for ns in (self.grouped, self.direct, self.both, self.unowned):
+            LegacyNamespace.objects.create(name=ns.name, namespace=ns)
+        LegacyNamespace.objects.create(name="unlinked")
+
+        def owned_by(username):
+            qs = filter_v3_namespaces_owned_by(
+                LegacyNamespace.objects.all(), username, field="namespace_id"
+            )
+            return sorted(ns.name for ns in qs)
+
+        self.assertEqual(owned_by("alice"), ["both", "direct", "grouped"])
+        self.assertEqual(owned_by("bob"), ["both", "grouped"])
+        self.assertEqual(owned_by("carol"), ["direct"])
+        self.assertEqual(owned_by("nobody"), [])
+
+        # the outer column must be compared as-is so its index can be used
+        sql = str(filter_v3_namespaces_owned_by(
+            LegacyNamespace.objects.all(), "alice", field="namespace_id"
+        ).query)
+        self.assertNotIn("::text", sql)
+
+    def _deleted_keys(self, conn):
+        return {key for call in conn.delete.call_args_list for key in call.args}
+
+    @override_settings(GALAXY_NAMESPACE_OWNERS_CACHE_TTL=60)
+    def test_group_changes_invalidate_the_cache(self):
+        with mock.patch.object(settings_cache, "conn") as conn:
+            add_group_to_v3_namespace(self.group, self.direct)
+        self.assertIn(
+            NAMESPACE_OWNERS_CACHE_KEY.format(pk=self.direct.pk), self._deleted_keys(conn)
+        )
+
+        with mock.patch.object(settings_cache, "conn") as conn:
+            add_user_to_group(self.carol, self.group)
+        self.assertTrue({
+            NAMESPACE_OWNERS_CACHE_KEY.format(pk=ns.pk)
+            for ns in (self.grouped, self.direct, self.both)
+        } <= self._deleted_keys(conn))
@@ -0,0 +1,76 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from pulp_ansible.app.models import AnsibleRepository, Collection, CollectionVersion
+
+from galaxy_ng.app.api.ui.v1.serializers import CollectionVersionSerializer
+from galaxy_ng.app.utils.repositories import get_latest_repository_names
+
+
+class TestLatestRepositoryNames(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        collection = Collection.objects.create(namespace="ns", name="foo")
+        self.versions = [
+            CollectionVersion.objects.create(
+                namespace="ns", name="foo", collection=collection, version=f"1.0.{i}"
+            )
+            for i in range(4)
+        ]
+
+    def _repo(self, name, versions):
+        repo = AnsibleRepository.objects.create(name=name, retain_repo_versions=10)
+        with repo.new_version() as new_version:
+            new_version.add_content(
+                CollectionVersion.objects.filter(pk__in=[cv.pk for cv in versions])
+            )
+        return repo
+
+    def test_latest_version_membership(self):
+        first, second, third, fourth = self.versions
+        repo_a = self._repo("a", [first, second])
+        self._repo("b", [first, third])
+        self._repo("c-synclist", [first])
+
+        with repo_a.new_version() as new_version:
+            new_version.remove_content(CollectionVersion.objects.filter(pk=second.pk))
+
+        with CaptureQueriesContext(connection) as queries:
+            names = get_latest_repository_names([cv.pk for cv in self.versions])
+        self.assertEqual(len(queries.captured_queries), 1)
+
+        self.assertEqual(names[first.pk], ["a", "b"])
+        self.assertEqual(names[second.pk], [])
+        self.assertEqual(names[third.pk], ["b"])
+        self.assertEqual(names[fourth.pk], [])
+
+    def test_serializer_queries_do_not_grow_with_repositories(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                data = CollectionVersionSerializer(
+                    CollectionVersion.objects.all(), many=True
+                ).data
+            return len(queries.captured_queries), data
+
+        self._repo("a", self.versions)
+        count, data = count_queries()
+        self.assertTrue(all(item["repository_list"] == ["a"] for item in data))
+
+        for name in ("b", "c", "d"):
+            self._repo(name, self.versions)
+        self.assertEqual(count_queries()[0], count)
+
+    def test_serializer_queries_do_not_grow_with_page_size(self):
+        self._repo("a", self.versions)
+
+        def count_queries(page_size):
+            page = CollectionVersion.objects.order_by("pk")[:page_size]
+            with CaptureQueriesContext(connection) as queries:
+                data = CollectionVersionSerializer(page, many=True).data
+            self.assertEqual(len(data), page_size)
+            return len(queries.captured_queries)
+
+        count = count_queries(1)
+        self.assertEqual(count_queries(2), count)
+        self.assertEqual(count_queries(len(self.versions)), count)
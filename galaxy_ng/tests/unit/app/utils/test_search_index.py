@@ -0,0 +1,53 @@
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase
+from pulp_ansible.app.models import Collection, CollectionVersion, Tag
+
+from galaxy_ng.app.utils import search_index
+
+
+class TestCollectionEntriesOnCommit(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.foo = Collection.objects.create(namespace="ns", name="foo")
+        self.bar = Collection.objects.create(namespace="ns", name="bar")
+        patcher = mock.patch.object(
+            search_index,
+            "update_collection_entries",
+            wraps=search_index.update_collection_entries,
+        )
+        self.update = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _create(self, collection, version, tags=()):
+        cv = CollectionVersion.objects.create(
+            namespace=collection.namespace,
+            name=collection.name,
+            collection=collection,
+            version=version,
+        )
+        for tag in tags:
+            cv.tags.add(Tag.objects.get_or_create(name=tag)[0])
+        return cv
+
+    def test_collections_are_refreshed_once_per_transaction(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for version in ("1.0.0", "1.1.0", "2.0.0"):
+                self._create(self.foo, version, tags=["linux", "database"])
+            self._create(self.bar, "1.0.0", tags=["linux"])
+
+        self.update.assert_called_once_with({("ns", "foo"), ("ns", "bar")})
+
+    def test_rolled_back_savepoint_drops_its_batch(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self._create(self.foo, "1.0.0")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            self._create(self.bar, "1.0.0")
+
+        self.update.assert_called_once_with({("ns", "bar")})
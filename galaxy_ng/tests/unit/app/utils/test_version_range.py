@@ -0,0 +1,62 @@
+import pytest
+import semantic_version
+from django.test import TestCase
+from pulp_ansible.app.models import Collection, CollectionVersion
+
+from galaxy_ng.app.utils.version_range import filter_version_range
+
+VERSIONS = [
+    "0.9.0",
+    "1.0.0-alpha",
+    "1.0.0-rc.2",
+    "1.0.0-rc.10",
+    "1.0.0",
+    "1.1.0",
+    "1.1.1-beta.1",
+    "1.1.1",
+    "1.2.0",
+    "1.10.0",
+    "2.0.0-rc.1",
+    "2.0.0",
+    "2.1.0+build.5",
+]
+
+SPECS = [
+    ">=1.0.0",
+    ">1.1.0,<2.0.0",
+    "<=1.1.1",
+    "==1.1.1",
+    "!=1.1.1",
+    "^1.1.0",
+    "~1.1.0",
+    "~=1.1",
+    ">=1.0.0-rc.2",
+    "<1.0.0-rc.10",
+    "==1.0.0-rc.10",
+    "==2.1.0+build.5",
+    "*",
+]
+
+
+class TestFilterVersionRange(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        collection = Collection.objects.create(namespace="ns", name="foo")
+        for version in VERSIONS:
+            CollectionVersion.objects.create(
+                namespace="ns", name="foo", collection=collection, version=version
+            )
+
+    def test_same_result_as_simple_spec(self):
+        for value in SPECS:
+            spec = semantic_version.SimpleSpec(value)
+            expected = sorted(
+                str(v) for v in spec.filter(semantic_version.Version(v) for v in VERSIONS)
+            )
+            filtered = filter_version_range(CollectionVersion.objects.all(), value)
+            self.assertEqual(sorted(filtered.values_list("version", flat=True)), expected, value)
+
+    def test_invalid_range(self):
+        with pytest.raises(ValueError, match="not_a_semver_version"):
+            filter_version_range(CollectionVersion.objects.all(), "not_a_semver_version")